@@ -0,0 +1,76 @@
+"""
+    test_amazon_scraper.py
+
+    Tests of the HTTP fetch mode of AmazonUPCProcessor without a browser, against
+    the recorded pages served by the ReplayServer.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from amazon_scraper import AmazonUPCProcessor
+from utils.replay_server import ReplayServer, page_file_name
+
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+UPC_CODE = "000000000017"
+
+
+class HttpModeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.pages_dir = os.path.join(self.directory, 'pages')
+        shutil.copytree(PAGES_DIR, self.pages_dir)
+
+        self.server = ReplayServer(self.pages_dir)
+        self.server.start()
+        self.processor = AmazonUPCProcessor(
+            os.path.join(self.directory, 'data.csv'),
+            os.path.join(self.directory, 'results.json'),
+            os.path.join(self.directory, 'proxies.json'),
+            fetch_mode="http",
+            browser_fallback=False,
+            base_url=self.server.base_url,
+            csv_file=None,
+            request_rate=1000,
+            max_block_retries=1,
+            selector_stats_file=os.path.join(self.directory, 'selector_stats.json'),
+            log_file_name="test_amazon_scraper.log"
+        )
+        self.processor.start_http_fetcher("test-agent")
+
+    def tearDown(self) -> None:
+        self.processor.http_fetcher.close()
+        self.processor.close_results()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def write_page(self, url: str, html: str) -> None:
+        """Replace the recorded page of a URL."""
+        with open(os.path.join(self.pages_dir, page_file_name(url)), 'w', encoding='utf-8') as page_file:
+            page_file.write(html)
+
+    def test_recorded_pages_are_saved(self) -> None:
+        self.assertTrue(self.processor.process_upc(UPC_CODE, "17", "G1", "20"))
+
+        records = self.processor.results_store.read_all()
+        self.assertEqual([(item["UPC"], item["ASIN"], item["Price"]) for item in records], [("17", "B000TEST01", "34.56")])
+
+    def test_unparseable_search_page_leaves_upc_pending(self) -> None:
+        self.write_page(f"/s?k={UPC_CODE}", "<!-- -->")
+
+        self.assertFalse(self.processor.process_upc(UPC_CODE, "17", "G1", "20"))
+        self.assertEqual(self.processor.results_store.record_count, 0)
+
+    def test_unparseable_product_page_leaves_upc_pending(self) -> None:
+        self.write_page("/dp/B000TEST01", "<!-- -->")
+
+        self.assertFalse(self.processor.process_upc(UPC_CODE, "17", "G1", "20"))
+        self.assertEqual(self.processor.results_store.record_count, 0)
+        self.assertEqual(self.processor.product_details, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
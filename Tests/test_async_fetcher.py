@@ -0,0 +1,85 @@
+"""
+    test_async_fetcher.py
+
+    Tests of the concurrent page downloads with a stand-in fetcher: order, the
+    concurrency bound, the per-page timeout and the rate-limit wait before it.
+"""
+
+import time
+import threading
+import unittest
+
+from utils.async_fetcher import fetch_pages_concurrently
+from utils.http_fetcher import FetchedPage
+
+
+class FakeFetcher:
+    """Returns a page per URL after the given delay and counts the downloads running at once."""
+
+    def __init__(self, delays: dict, turn_delay: float = 0.0) -> None:
+        self.delays = delays
+        self.turn_delay = turn_delay
+        self.paced = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most_running = 0
+
+    def wait_turn(self) -> None:
+        time.sleep(self.turn_delay)
+
+    def fetch(self, url: str, paced: bool = True) -> FetchedPage:
+        self.paced.append(paced)
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.delays.get(url, 0.05))
+        with self.lock:
+            self.running -= 1
+        return FetchedPage(url=url, html=f"<html>{url}</html>")
+
+
+class FetchPagesConcurrentlyTest(unittest.TestCase):
+    def test_pages_keep_the_order_of_the_urls(self) -> None:
+        urls = [f"https://www.amazon.com/dp/B00000000{index}" for index in range(4)]
+        fetcher = FakeFetcher({urls[0]: 0.2, urls[1]: 0.01})
+
+        started = time.monotonic()
+        pages = fetch_pages_concurrently(fetcher, urls, max_concurrency=4)
+
+        self.assertEqual([page.url for page in pages], urls)
+        # The slowest page sets the total time, not the sum of all pages
+        self.assertLess(time.monotonic() - started, 0.35)
+
+    def test_concurrency_is_bounded(self) -> None:
+        urls = [f"https://www.amazon.com/dp/B00000000{index}" for index in range(6)]
+        fetcher = FakeFetcher({})
+
+        fetch_pages_concurrently(fetcher, urls, max_concurrency=2)
+
+        self.assertEqual(fetcher.most_running, 2)
+
+    def test_slow_page_times_out(self) -> None:
+        urls = ["https://www.amazon.com/dp/B00000000A", "https://www.amazon.com/dp/B00000000B"]
+        fetcher = FakeFetcher({urls[0]: 1.0})
+
+        pages = fetch_pages_concurrently(fetcher, urls, timeout=0.2)
+
+        self.assertIsNone(pages[0])
+        self.assertEqual(pages[1].url, urls[1])
+
+    def test_rate_limit_wait_is_not_part_of_the_timeout(self) -> None:
+        urls = [f"https://www.amazon.com/dp/B00000000{index}" for index in range(3)]
+        fetcher = FakeFetcher({}, turn_delay=0.3)
+
+        pages = fetch_pages_concurrently(fetcher, urls, timeout=0.2)
+
+        self.assertEqual([page.url for page in pages], urls)
+        # The turn was taken before the request, so the fetch itself is not paced again
+        self.assertEqual(fetcher.paced, [False] * 3)
+
+    def test_no_urls(self) -> None:
+        self.assertEqual(fetch_pages_concurrently(FakeFetcher({}), []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
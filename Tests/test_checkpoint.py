@@ -0,0 +1,86 @@
+"""
+    test_checkpoint.py
+
+    Tests of the resume checkpoint: the bitmap survives a reload, and the checkpoint
+    starts over when it belongs to another or a changed input file.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.checkpoint import Checkpoint
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.input_file_path = os.path.join(self.directory, 'data.csv')
+        self.checkpoint_file_path = os.path.join(self.directory, 'results.checkpoint')
+        with open(self.input_file_path, 'w', encoding='utf-8') as input_file:
+            input_file.write("zoro_no,upc_code,sales_price\nG1,012345678905,10\n")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_new_checkpoint_is_fresh_and_empty(self) -> None:
+        checkpoint = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+
+        self.assertTrue(checkpoint.fresh)
+        self.assertEqual(checkpoint.completed, 0)
+        self.assertFalse(checkpoint.is_done(0))
+
+    def test_rows_survive_reload(self) -> None:
+        checkpoint = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+        for row_id in (0, 7, 8, 1000):
+            checkpoint.mark_done(row_id)
+        checkpoint.mark_done(7)
+
+        reloaded = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+
+        self.assertFalse(reloaded.fresh)
+        self.assertEqual(reloaded.completed, 4)
+        self.assertEqual([row_id for row_id in range(1001) if reloaded.is_done(row_id)], [0, 7, 8, 1000])
+        self.assertFalse(reloaded.is_done(5000))
+
+    def test_unsaved_rows_are_not_written(self) -> None:
+        checkpoint = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+        checkpoint.mark_done(0)
+        checkpoint.mark_done(1, save=False)
+
+        reloaded = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+        self.assertEqual((reloaded.is_done(0), reloaded.is_done(1)), (True, False))
+
+        checkpoint.save()
+        self.assertTrue(Checkpoint(self.checkpoint_file_path, self.input_file_path).is_done(1))
+
+    def test_changed_input_starts_over(self) -> None:
+        Checkpoint(self.checkpoint_file_path, self.input_file_path).mark_done(0)
+        with open(self.input_file_path, 'a', encoding='utf-8') as input_file:
+            input_file.write("G2,012345678912,20\n")
+
+        checkpoint = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+
+        self.assertTrue(checkpoint.fresh)
+        self.assertFalse(checkpoint.is_done(0))
+
+    def test_other_input_starts_over(self) -> None:
+        Checkpoint(self.checkpoint_file_path, self.input_file_path).mark_done(0)
+        other_file_path = os.path.join(self.directory, 'other.csv')
+        shutil.copy(self.input_file_path, other_file_path)
+
+        self.assertFalse(Checkpoint(self.checkpoint_file_path, other_file_path).is_done(0))
+
+    def test_damaged_checkpoint_starts_over(self) -> None:
+        with open(self.checkpoint_file_path, 'wb') as checkpoint_file:
+            checkpoint_file.write(b"not a header\n\xff")
+
+        checkpoint = Checkpoint(self.checkpoint_file_path, self.input_file_path)
+
+        self.assertTrue(checkpoint.fresh)
+        self.assertFalse(checkpoint.is_done(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
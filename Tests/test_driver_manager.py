@@ -0,0 +1,96 @@
+"""
+    test_driver_manager.py
+
+    Tests of the browser lifecycle with stand-in browsers: warm spares, replacing a
+    blocked browser, the page budget and shutdown.
+"""
+
+import time
+import threading
+import unittest
+
+from utils.driver_manager import DriverManager, ManagedDriver
+
+
+class FakeBrowser:
+    """Stands in for a Chrome driver and remembers whether it was quit."""
+
+    def __init__(self) -> None:
+        self.quit_called = threading.Event()
+
+    def quit(self) -> None:
+        self.quit_called.set()
+
+
+class DriverManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.proxies = iter(["a:1", "b:2", "c:3", "d:4", "e:5"])
+        self.launched = []
+        self.manager = DriverManager(self.create_browser, lambda: next(self.proxies), spares=1, page_budget=2)
+
+    def tearDown(self) -> None:
+        self.manager.shutdown()
+
+    def create_browser(self, proxy: str) -> ManagedDriver:
+        browser = ManagedDriver(driver=FakeBrowser(), proxy=proxy)
+        self.launched.append(browser)
+        return browser
+
+    def wait_for_spares(self, count: int) -> None:
+        """Wait until the background launches have readied `count` spares."""
+        deadline = time.monotonic() + 2
+        while len(self.manager.spares) < count or self.manager.launching:
+            self.assertLess(time.monotonic(), deadline, "The spare browsers were not launched in time.")
+            time.sleep(0.01)
+
+    def test_start_warms_a_spare(self) -> None:
+        browser = self.manager.start("main:0")
+        self.wait_for_spares(1)
+
+        self.assertEqual(browser.proxy, "main:0")
+        self.assertEqual([spare.proxy for spare in self.manager.spares], ["a:1"])
+
+    def test_replace_swaps_in_the_spare(self) -> None:
+        old = self.manager.start("main:0")
+        self.wait_for_spares(1)
+
+        browser = self.manager.replace("blocked")
+
+        self.assertEqual(browser.proxy, "a:1")
+        self.assertTrue(old.driver.quit_called.wait(2))
+        self.wait_for_spares(1)
+        self.assertEqual([spare.proxy for spare in self.manager.spares], ["b:2"])
+        self.assertEqual(self.manager.replacements, 1)
+
+    def test_replace_avoids_the_blocked_proxy(self) -> None:
+        self.manager.start("main:0")
+        self.wait_for_spares(1)
+
+        browser = self.manager.replace("blocked", avoid_proxy="a:1")
+
+        # The only spare uses the blocked proxy, so a new browser is launched
+        self.assertEqual(browser.proxy, "b:2")
+
+    def test_page_budget(self) -> None:
+        self.manager.start()
+        self.manager.count_page()
+        self.assertFalse(self.manager.budget_used())
+
+        self.manager.count_page()
+        self.assertTrue(self.manager.budget_used())
+
+        self.manager.page_budget = 0
+        self.assertFalse(self.manager.budget_used())
+
+    def test_shutdown_quits_every_browser(self) -> None:
+        self.manager.start()
+        self.wait_for_spares(1)
+
+        self.manager.shutdown()
+
+        self.assertTrue(all(browser.driver.quit_called.is_set() for browser in self.launched))
+        self.assertIsNone(self.manager.current)
+
+
+if __name__ == "__main__":
+    unittest.main()
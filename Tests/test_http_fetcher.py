@@ -0,0 +1,97 @@
+"""
+    test_http_fetcher.py
+
+    Tests of the HTTP fetch mode against the local ReplayServer: recorded pages are
+    returned, block pages and 503 responses count as blocks and slow the scheduler
+    down, a 404 means there is no such page and an empty page is a failure.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.http_fetcher import HttpFetcher, is_block_page
+from utils.rate_limiter import RequestScheduler
+from utils.replay_server import BLOCK_PAGE, ReplayServer, page_file_name
+
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+PRODUCT_PATH = "/Example-Torque-Wrench/dp/B000TEST01/ref=sr_1_1"
+
+
+class HttpFetcherReplayTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pages_dir = tempfile.mkdtemp()
+        for file_name in os.listdir(PAGES_DIR):
+            shutil.copy(os.path.join(PAGES_DIR, file_name), self.pages_dir)
+
+        self.server = ReplayServer(self.pages_dir)
+        self.server.start()
+        # A fast scheduler, so the tests do not wait for the rate limit
+        self.scheduler = RequestScheduler(initial_rate=1000, max_rate=1000, base_backoff=0, max_backoff=0)
+        self.fetcher = HttpFetcher("test-agent", timeout=5, scheduler=self.scheduler)
+
+    def tearDown(self) -> None:
+        self.fetcher.close()
+        self.server.stop()
+        shutil.rmtree(self.pages_dir)
+
+    def test_recorded_page_is_returned(self) -> None:
+        page = self.fetcher.fetch(self.server.base_url + PRODUCT_PATH)
+
+        self.assertIsNotNone(page)
+        self.assertIn("Example Torque Wrench", page.html)
+        # Absolute amazon.com links are served as local links
+        self.assertNotIn("https://www.amazon.com", page.html)
+        self.assertEqual((self.fetcher.requests_count, self.fetcher.blocked_count), (1, 0))
+        self.assertEqual(self.server.served, 1)
+
+    def test_recorded_block_page_counts_as_block(self) -> None:
+        with open(os.path.join(self.pages_dir, page_file_name("/dp/B000BLOCK1")), 'wb') as page_file:
+            page_file.write(BLOCK_PAGE)
+
+        page = self.fetcher.fetch(self.server.base_url + "/dp/B000BLOCK1")
+
+        self.assertIsNone(page)
+        self.assertEqual(self.fetcher.blocked_count, 1)
+        self.assertEqual(self.fetcher.failed_count, 0)
+        self.assertLess(self.scheduler.rate("direct"), 1000)
+
+    def test_503_counts_as_block(self) -> None:
+        self.server.block_rate = 1.0
+
+        page = self.fetcher.fetch(self.server.base_url + PRODUCT_PATH)
+
+        self.assertIsNone(page)
+        self.assertEqual(self.server.blocked, 1)
+        self.assertEqual(self.fetcher.blocked_count, 1)
+        self.assertEqual(self.fetcher.failed_count, 0)
+        self.assertLess(self.scheduler.rate("direct"), 1000)
+
+    def test_404_is_no_page(self) -> None:
+        page = self.fetcher.fetch(self.server.base_url + "/dp/B000MISSING")
+
+        self.assertIsNone(page)
+        self.assertEqual(self.server.not_found, 1)
+        self.assertEqual((self.fetcher.blocked_count, self.fetcher.failed_count), (0, 0))
+        # A missing page says nothing about the proxy, the rate is left alone
+        self.assertEqual(self.scheduler.rate("direct"), 1000)
+
+    def test_empty_page_is_a_failure(self) -> None:
+        open(os.path.join(self.pages_dir, page_file_name("/dp/B000EMPTY1")), 'wb').close()
+
+        page = self.fetcher.fetch(self.server.base_url + "/dp/B000EMPTY1")
+
+        self.assertIsNone(page)
+        self.assertEqual(self.server.served, 1)
+        self.assertEqual((self.fetcher.blocked_count, self.fetcher.failed_count), (0, 1))
+
+    def test_is_block_page(self) -> None:
+        self.assertTrue(is_block_page(BLOCK_PAGE.decode('utf-8')))
+        with open(os.path.join(PAGES_DIR, 'dp_B000TEST01.html'), 'r', encoding='utf-8') as page_file:
+            self.assertFalse(is_block_page(page_file.read()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+    test_js_extractor.py
+
+    Tests of turning the JSON payloads of the extraction scripts into typed page
+    data and selector statistics, with a stand-in driver that returns a fixed payload.
+"""
+
+import json
+import unittest
+
+from utils.js_extractor import (
+    PRODUCT_PAGE_XPATHS, SEARCH_PAGE_SCRIPT, SEARCH_PAGE_XPATHS, extract_product_page, extract_search_page, run_script,
+)
+from utils.page_parser import BSR_XPATHS, PRICE_XPATHS, SELLER_XPATH
+from utils.selector_registry import SelectorRegistry
+
+
+class FakeDriver:
+    """Returns the given payload as JSON from every script and records the calls."""
+
+    def __init__(self, payload) -> None:
+        self.payload = payload
+        self.calls = []
+
+    def execute_script(self, script: str, *args) -> str:
+        self.calls.append((script, args))
+        return json.dumps(self.payload)
+
+
+class RunScriptTest(unittest.TestCase):
+    def test_payload_must_be_an_object(self) -> None:
+        with self.assertRaises(ValueError):
+            run_script(FakeDriver(["not", "an", "object"]), SEARCH_PAGE_SCRIPT, SEARCH_PAGE_XPATHS)
+        with self.assertRaises(ValueError):
+            run_script(FakeDriver(None), SEARCH_PAGE_SCRIPT, SEARCH_PAGE_XPATHS)
+
+
+class ExtractSearchPageTest(unittest.TestCase):
+    def test_cards_are_typed(self) -> None:
+        driver = FakeDriver({
+            "url": "https://www.amazon.com/s?k=000000000017",
+            "no_results": False,
+            "cards": [
+                {"url": "https://www.amazon.com/dp/B000TEST01", "asin": "B000TEST01", "title": "Tool", "price": "$34.56"},
+                {"url": "https://www.amazon.com/dp/B000TEST02", "asin": "", "title": None, "price": None},
+            ],
+        })
+
+        search_data, page_url = extract_search_page(driver)
+
+        self.assertEqual(page_url, "https://www.amazon.com/s?k=000000000017")
+        self.assertFalse(search_data.no_results)
+        self.assertEqual(search_data.product_urls, [card.url for card in search_data.cards])
+        self.assertEqual(
+            [(card.asin, card.title, card.price) for card in search_data.cards],
+            [("B000TEST01", "Tool", "34.56"), ("N/A", "N/A", "N/A")]
+        )
+        # The XPaths are passed to the script, a single call reads the page
+        self.assertEqual(driver.calls, [(SEARCH_PAGE_SCRIPT, (SEARCH_PAGE_XPATHS,))])
+
+    def test_no_results_page(self) -> None:
+        search_data, _ = extract_search_page(FakeDriver({"url": "", "no_results": True, "cards": []}))
+
+        self.assertTrue(search_data.no_results)
+        self.assertEqual(search_data.cards, [])
+
+
+def probe_payload(prices: list, seller, bsr_texts: list) -> dict:
+    """Return a probe payload with the given text for every selector of the product fields."""
+    return {
+        "url": "https://www.amazon.com/dp/B000TEST01",
+        "template": "hardlines_tools en_US",
+        "fields": {
+            "price": [{"text": text, "ms": 2.0} for text in prices],
+            "seller": [{"text": seller, "ms": 1.0}],
+            "bsr": [{"text": text, "ms": 1.0} for text in bsr_texts],
+        },
+    }
+
+
+class ExtractProductPageTest(unittest.TestCase):
+    def test_first_valid_price_and_bsr(self) -> None:
+        prices = [None, "See price in cart", "$34.56", "$30.00"] + [None] * (len(PRICE_XPATHS) - 4)
+        bsr_texts = [None, "#12,345 in Tools & Home Improvement (See Top 100)"] + [None] * (len(BSR_XPATHS) - 2)
+        driver = FakeDriver(probe_payload(prices, "Example Tools Store", bsr_texts))
+
+        product_data, page_url = extract_product_page(driver)
+
+        self.assertEqual(page_url, "https://www.amazon.com/dp/B000TEST01")
+        self.assertEqual(
+            (product_data.price, product_data.seller, product_data.bsr, product_data.first_category),
+            ("34.56", "Example Tools Store", "12,345", "Tools & Home Improvement")
+        )
+        self.assertEqual(product_data.template, "hardlines_tools")
+        self.assertEqual(driver.calls[0][1], (PRODUCT_PAGE_XPATHS,))
+
+    def test_missing_fields(self) -> None:
+        driver = FakeDriver(probe_payload([None] * len(PRICE_XPATHS), None, [None] * len(BSR_XPATHS)))
+
+        product_data, _ = extract_product_page(driver)
+
+        self.assertEqual((product_data.price, product_data.seller, product_data.bsr), ("N/A", "N/A", "N/A"))
+
+    def test_selectors_are_recorded_up_to_the_first_hit(self) -> None:
+        registry = SelectorRegistry()
+        prices = [None, "See price in cart", "$34.56", "$30.00"] + [None] * (len(PRICE_XPATHS) - 4)
+        driver = FakeDriver(probe_payload(prices, None, [None] * len(BSR_XPATHS)))
+
+        extract_product_page(driver, registry)
+
+        price_stats = registry.stats["price"]["hardlines_tools"]
+        self.assertEqual(list(price_stats), PRICE_XPATHS[:3])
+        self.assertEqual([price_stats[xpath].hits for xpath in PRICE_XPATHS[:3]], [0, 0, 1])
+        self.assertAlmostEqual(price_stats[PRICE_XPATHS[2]].seconds, 0.002)
+        # A field without a hit records a miss for every selector
+        self.assertEqual(registry.stats["seller"]["hardlines_tools"][SELLER_XPATH].misses, 1)
+        self.assertEqual(len(registry.stats["bsr"]["hardlines_tools"]), len(BSR_XPATHS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+    test_lean_profile.py
+
+    Tests of the blocked URL patterns of the lean browser profile and of applying
+    them to a stand-in driver.
+"""
+
+import unittest
+
+from utils.lean_profile import BLOCKED_RESOURCES, apply_lean_profile, blocked_url_patterns
+
+
+class FakeDriver:
+    """Records the DevTools commands, or fails like a driver without DevTools support."""
+
+    def __init__(self, supports_cdp: bool = True) -> None:
+        self.supports_cdp = supports_cdp
+        self.commands = []
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        if not self.supports_cdp:
+            raise AttributeError("'WebDriver' object has no attribute 'execute_cdp_cmd'")
+        self.commands.append((command, params))
+        return {}
+
+
+class BlockedUrlPatternsTest(unittest.TestCase):
+    def test_all_groups_are_blocked_by_default(self) -> None:
+        patterns = blocked_url_patterns()
+
+        self.assertEqual(len(patterns), sum(len(group) for group in BLOCKED_RESOURCES.values()))
+        self.assertIn("*.woff2", patterns)
+
+    def test_allowlisted_group_is_not_blocked(self) -> None:
+        patterns = blocked_url_patterns(allowlist=["image"])
+
+        self.assertFalse(set(patterns) & set(BLOCKED_RESOURCES["image"]))
+        self.assertIn("*.mp4", patterns)
+
+    def test_allowlisted_fragment_unblocks_matching_patterns(self) -> None:
+        patterns = blocked_url_patterns(["image", "ads"], allowlist=["*.svg", "amazon-adsystem.com"])
+
+        self.assertNotIn("*.svg", patterns)
+        self.assertNotIn("*amazon-adsystem.com*", patterns)
+        self.assertIn("*.png", patterns)
+        self.assertIn("*doubleclick.net*", patterns)
+
+
+class ApplyLeanProfileTest(unittest.TestCase):
+    def test_patterns_are_sent_to_chrome(self) -> None:
+        driver = FakeDriver()
+
+        patterns = apply_lean_profile(driver, groups=["font"])
+
+        self.assertEqual(patterns, BLOCKED_RESOURCES["font"])
+        self.assertEqual(driver.commands, [
+            ("Network.enable", {}),
+            ("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES["font"]}),
+        ])
+
+    def test_driver_without_devtools(self) -> None:
+        self.assertEqual(apply_lean_profile(FakeDriver(supports_cdp=False)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
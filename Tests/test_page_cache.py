@@ -0,0 +1,123 @@
+"""
+    test_page_cache.py
+
+    Tests of the on-disk page cache: URL normalization, TTL expiry, shared page files,
+    the running size total and LRU eviction.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.page_cache import PageCache, normalize_url
+
+
+def page(size: int, fill: str = "a") -> str:
+    """Return a page whose compressed size grows with `size` (random-looking content)."""
+    return "".join(chr(ord(fill) + (index * 7919) % 26) for index in range(size)) + fill
+
+
+class PageCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.caches = []
+
+    def tearDown(self) -> None:
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.directory)
+
+    def open_cache(self, **kwargs) -> PageCache:
+        """Open the test cache and close it after the test."""
+        cache = PageCache(self.directory, **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def aggregate_bytes(self, cache: PageCache) -> int:
+        """Add up the sizes of the distinct page files, like the recount at open."""
+        return cache.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM entries)"
+        ).fetchone()[0]
+
+    def page_files(self) -> list:
+        """Return the names of the stored page files."""
+        return [name for _, _, names in os.walk(os.path.join(self.directory, "blobs")) for name in names]
+
+    def test_normalize_url(self) -> None:
+        self.assertEqual(
+            normalize_url("https://WWW.amazon.com/Some-Title/dp/B000TEST01/ref=sr_1_1?keywords=x&qid=1"),
+            "www.amazon.com/dp/B000TEST01"
+        )
+        self.assertEqual(
+            normalize_url("https://www.amazon.com/s?qid=5&k=0123&ref=nb"),
+            "www.amazon.com/s?k=0123"
+        )
+
+    def test_page_is_cached_per_zip_code(self) -> None:
+        cache = self.open_cache()
+        cache.put("https://www.amazon.com/dp/B000TEST01?th=1", "10001", "<html>1</html>", "https://final")
+
+        cached = cache.get("https://www.amazon.com/x/dp/B000TEST01", "10001")
+
+        self.assertEqual((cached.url, cached.html), ("https://final", "<html>1</html>"))
+        self.assertIsNone(cache.get("https://www.amazon.com/dp/B000TEST01", "90210"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_expired_page_is_dropped(self) -> None:
+        cache = self.open_cache(ttl_seconds=60)
+        cache.put("https://www.amazon.com/dp/B000TEST01", "10001", "<html>1</html>")
+
+        with mock.patch('utils.page_cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get("https://www.amazon.com/dp/B000TEST01", "10001"))
+
+        self.assertEqual(cache.total_bytes(), 0)
+        self.assertEqual(self.page_files(), [])
+
+    def test_identical_pages_share_one_file(self) -> None:
+        cache = self.open_cache()
+        cache.put("https://www.amazon.com/dp/B000TEST01", "10001", page(500))
+        single = cache.total_bytes()
+
+        cache.put("https://www.amazon.com/dp/B000TEST02", "10001", page(500))
+        self.assertEqual(cache.total_bytes(), single)
+
+        # Replacing one entry keeps the file used by the other
+        cache.put("https://www.amazon.com/dp/B000TEST01", "10001", page(500, "b"))
+        self.assertEqual(cache.total_bytes(), self.aggregate_bytes(cache))
+        self.assertIsNotNone(cache.get("https://www.amazon.com/dp/B000TEST02", "10001"))
+
+    def test_least_recently_used_pages_are_evicted(self) -> None:
+        cache = self.open_cache()
+        cache.put("https://www.amazon.com/dp/B00000000A", "10001", page(2000, "a"))
+        cache.max_bytes = cache.total_bytes() * 2 + cache.total_bytes() // 2
+        cache.put("https://www.amazon.com/dp/B00000000B", "10001", page(2000, "b"))
+        time.sleep(0.01)
+        # A is used again, so B is now the least recently used page
+        cache.get("https://www.amazon.com/dp/B00000000A", "10001")
+
+        cache.put("https://www.amazon.com/dp/B00000000C", "10001", page(2000, "c"))
+
+        self.assertIsNone(cache.get("https://www.amazon.com/dp/B00000000B", "10001"))
+        self.assertIsNotNone(cache.get("https://www.amazon.com/dp/B00000000A", "10001"))
+        self.assertIsNotNone(cache.get("https://www.amazon.com/dp/B00000000C", "10001"))
+        self.assertLessEqual(cache.total_bytes(), cache.max_bytes)
+        self.assertEqual(cache.total_bytes(), self.aggregate_bytes(cache))
+
+    def test_total_is_shared_and_recounted_at_open(self) -> None:
+        cache = self.open_cache()
+        other = self.open_cache()
+        cache.put("https://www.amazon.com/dp/B00000000A", "10001", page(300, "a"))
+        other.put("https://www.amazon.com/dp/B00000000B", "10001", page(300, "b"))
+
+        self.assertEqual(cache.total_bytes(), self.aggregate_bytes(cache))
+
+        cache.connection.execute("UPDATE totals SET value = 1")
+        cache.connection.commit()
+        self.assertEqual(self.open_cache().total_bytes(), self.aggregate_bytes(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+    test_page_parser.py
+
+    Tests of the single-pass parsers on the recorded pages in Tests/pages, the same
+    files the ReplayServer serves.
+"""
+
+import os
+import unittest
+
+from utils.page_parser import get_bsr_number, get_first_category, parse_product_page, parse_search_page
+from utils.selector_registry import SelectorRegistry
+
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+def read_page(file_name: str) -> str:
+    """Return the HTML of a recorded page."""
+    with open(os.path.join(PAGES_DIR, file_name), 'r', encoding='utf-8') as page_file:
+        return page_file.read()
+
+
+class ParseProductPageTest(unittest.TestCase):
+    def test_fields_of_recorded_page(self) -> None:
+        data = parse_product_page(read_page('dp_B000TEST01.html'))
+
+        self.assertEqual(data.price, "34.56")
+        self.assertEqual(data.seller, "Example Tools Store")
+        self.assertEqual(data.bsr, "12,345")
+        self.assertEqual(data.first_category, "Tools & Home Improvement")
+        self.assertEqual(data.template, "hardlines_tools")
+
+    def test_registry_does_not_change_result(self) -> None:
+        page_source = read_page('dp_B000TEST01.html')
+
+        self.assertEqual(parse_product_page(page_source, SelectorRegistry()), parse_product_page(page_source))
+
+    def test_missing_fields_are_na(self) -> None:
+        data = parse_product_page("<html><body><div id='dp'></div></body></html>")
+
+        self.assertEqual((data.price, data.seller, data.bsr, data.first_category), ("N/A",) * 4)
+        self.assertEqual(data.template, "default")
+
+    def test_empty_page_raises_value_error(self) -> None:
+        for page_source in ("", "   ", "<!-- -->"):
+            with self.subTest(page_source=page_source):
+                with self.assertRaises(ValueError):
+                    parse_product_page(page_source)
+                with self.assertRaises(ValueError):
+                    parse_search_page(page_source, "https://www.amazon.com/s?k=1")
+
+    def test_bsr_helpers(self) -> None:
+        text = "#1,024 in Industrial & Scientific (See Top 100)"
+
+        self.assertEqual(get_bsr_number(text), "1,024")
+        self.assertEqual(get_first_category(text), "Industrial & Scientific")
+        self.assertIsNone(get_bsr_number("no rank"))
+
+
+class ParseSearchPageTest(unittest.TestCase):
+    def test_cards_of_recorded_page(self) -> None:
+        data = parse_search_page(read_page('s_000000000017.html'), "https://www.amazon.com/s?k=000000000017")
+
+        self.assertFalse(data.no_results)
+        self.assertEqual(len(data.cards), 1)
+        card = data.cards[0]
+        self.assertEqual(card.asin, "B000TEST01")
+        self.assertEqual(card.price, "34.56")
+        self.assertEqual(card.title, "Example Torque Wrench, 1/2 in. Drive")
+        self.assertEqual(
+            data.product_urls,
+            ["https://www.amazon.com/Example-Torque-Wrench/dp/B000TEST01/ref=sr_1_1?keywords=000000000017"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
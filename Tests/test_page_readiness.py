@@ -0,0 +1,96 @@
+"""
+    test_page_readiness.py
+
+    Tests of the readiness XPaths on recorded pages, and of the readiness wait with
+    a stand-in driver that evaluates the XPaths with lxml.
+"""
+
+import os
+import unittest
+
+from lxml import html as lxml_html
+from selenium.common.exceptions import JavascriptException
+
+from utils.page_readiness import BLOCK_PAGE_XPATH, READINESS_XPATHS, PageReadiness
+from utils.replay_server import BLOCK_PAGE
+
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+def read_page(file_name: str) -> str:
+    """Return the HTML of a recorded page."""
+    with open(os.path.join(PAGES_DIR, file_name), 'r', encoding='utf-8') as page_file:
+        return page_file.read()
+
+
+def is_ready(page_source: str, page_type: str) -> bool:
+    """Return True if the readiness XPath of the page type matches the page."""
+    return bool(lxml_html.fromstring(page_source).xpath(READINESS_XPATHS[page_type]))
+
+
+class FakeDriver:
+    """Answers the readiness script by evaluating its XPath on a document with lxml."""
+
+    def __init__(self, page_source: str, failures: int = 0) -> None:
+        self.tree = lxml_html.fromstring(page_source)
+        self.failures = failures
+        self.calls = 0
+
+    def execute_script(self, script: str, *args) -> bool:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise JavascriptException("javascript error: Cannot read properties of null")
+        return bool(self.tree.xpath(args[0]))
+
+
+class ReadinessXPathTest(unittest.TestCase):
+    def test_product_page_with_buybox_is_ready(self) -> None:
+        self.assertTrue(is_ready(read_page('dp_B000TEST01.html'), "product"))
+
+    def test_product_page_without_details_table_is_ready(self) -> None:
+        page_source = (
+            "<html><body><div id='dp'><span id='productTitle'>Title</span>"
+            "<div id='outOfStock'>Currently unavailable.</div></div></body></html>"
+        )
+        self.assertTrue(is_ready(page_source, "product"))
+
+    def test_product_page_without_title_or_buybox_is_not_ready(self) -> None:
+        self.assertFalse(is_ready("<html><body><div id='dp'><div id='prodDetails'></div></div></body></html>", "product"))
+
+    def test_search_page_is_ready(self) -> None:
+        self.assertTrue(is_ready(read_page('s_000000000017.html'), "search"))
+        self.assertTrue(is_ready("<html><body><span>No results for</span></body></html>", "search"))
+
+    def test_block_page_ends_the_wait(self) -> None:
+        self.assertTrue(lxml_html.fromstring(BLOCK_PAGE).xpath(BLOCK_PAGE_XPATH))
+
+
+class WaitForTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.readiness = PageReadiness(timeouts={"product": 1}, poll_frequency=0.01)
+
+    def test_ready_page_does_not_wait(self) -> None:
+        self.readiness.driver = FakeDriver(read_page('dp_B000TEST01.html'))
+
+        self.assertLess(self.readiness.wait_for("product"), 0.5)
+        self.assertEqual(self.readiness.timeouts_hit["product"], 0)
+
+    def test_script_error_during_navigation_is_retried(self) -> None:
+        self.readiness.driver = FakeDriver(read_page('dp_B000TEST01.html'), failures=3)
+
+        self.assertLess(self.readiness.wait_for("product"), 0.5)
+        self.assertEqual(self.readiness.driver.calls, 4)
+        self.assertEqual(self.readiness.timeouts_hit["product"], 0)
+
+    def test_timeout_is_counted(self) -> None:
+        self.readiness.driver = FakeDriver("<html><body><div id='dp'></div></body></html>")
+
+        self.readiness.wait_for("product")
+
+        self.assertEqual(self.readiness.timeouts_hit["product"], 1)
+        self.assertEqual(self.readiness.summary()["product"]["timeouts"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+    test_price_utils.py
+
+    Tests of the vectorized pricing functions, compared with `get_price_difference`
+    computed one product at a time.
+"""
+
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.price_utils import (
+    NO_SURCHARGE_TIER, SURCHARGE_TIER, UNKNOWN_TIER, get_price_difference, margin_percentages,
+    markup_tiers, price_differences, reprice_records, to_price_array
+)
+
+
+PRICES = ["12.99", "75", "0", "60.5", "N/A", "100", "3.10", "49.99", "250.00", "8"]
+ZORO_PRICES = ["9.5", "50", "10", "50.01", "20", "N/A", "0.99", "49.99", "199.95", "-1"]
+
+
+class PriceArrayTest(unittest.TestCase):
+    def test_price_differences_match_scalar_function(self) -> None:
+        differences = price_differences(PRICES, ZORO_PRICES)
+
+        for price, zoro_price, difference in zip(PRICES, ZORO_PRICES, differences):
+            with self.subTest(price=price, zoro_price=zoro_price):
+                expected = get_price_difference(price, zoro_price)
+                if expected == 'N/A':
+                    self.assertTrue(math.isnan(difference))
+                else:
+                    self.assertAlmostEqual(difference, expected, places=9)
+
+    def test_numeric_columns_match_scalar_function(self) -> None:
+        prices = np.array([10.0, 80.0, 50.0])
+        zoro_prices = pd.Series([5.0, 51.0, 50.0])
+
+        np.testing.assert_allclose(
+            price_differences(prices, zoro_prices),
+            [get_price_difference(str(p), str(z)) for p, z in zip(prices, zoro_prices)]
+        )
+
+    def test_to_price_array_cleans_text(self) -> None:
+        np.testing.assert_array_equal(
+            to_price_array(["$1,234.50", " 7 ", "N/A", "", None, ".5"]),
+            [1234.5, 7.0, np.nan, np.nan, np.nan, 0.5]
+        )
+
+    def test_markup_tiers(self) -> None:
+        np.testing.assert_array_equal(
+            markup_tiers(["50", "50.01", "N/A"]),
+            [NO_SURCHARGE_TIER, SURCHARGE_TIER, UNKNOWN_TIER]
+        )
+
+    def test_margin_percentages(self) -> None:
+        margins = margin_percentages(["100", "0", "N/A"], ["10", "10", "10"])
+
+        self.assertAlmostEqual(margins[0], get_price_difference("100", "10"))
+        self.assertTrue(np.isnan(margins[1:]).all())
+
+    def test_custom_markup(self) -> None:
+        np.testing.assert_allclose(
+            price_differences(["100", "100"], ["10", "60"], markup=1.5, surcharge=10, surcharge_threshold=50),
+            [100 - 10 * 1.5, 100 - 70 * 1.5]
+        )
+
+    def test_reprice_records_looks_up_zoro_prices(self) -> None:
+        records = pd.DataFrame({"Zoro_No": ["G1", "G2", "G3"], "Price": ["20", "N/A", "70"]})
+        zoro_prices = pd.Series(["1", "10", "60"], index=["G1", "G1", "G3"])
+
+        repriced = reprice_records(records, zoro_prices)
+
+        # The last Zoro price of a duplicated Zoro number wins
+        np.testing.assert_array_equal(repriced["Zoro price"], [10.0, np.nan, 60.0])
+        self.assertAlmostEqual(repriced["Price difference"][0], get_price_difference("20", "10"))
+        self.assertAlmostEqual(repriced["Price difference"][2], get_price_difference("70", "60"))
+        self.assertTrue(np.isnan(repriced["Price difference"][1]))
+        self.assertNotIn("Zoro price", records.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+    test_proxy_pool.py
+
+    Tests of the proxy pool: the circuit breaker transitions, choosing around open
+    circuits, saving the scores and merging the changes of several processes.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from utils.proxy_pool import CLOSED, HALF_OPEN, OPEN, ProxyPool
+
+
+class ProxyPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.scores_file_path = os.path.join(self.directory, 'proxy_scores.json')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_circuit_opens_after_consecutive_errors(self) -> None:
+        pool = ProxyPool(["a:1"], failure_threshold=3, cooldown=60)
+
+        pool.record("a:1", "block")
+        pool.record("a:1", "failure")
+        self.assertEqual(pool.health["a:1"].state, CLOSED)
+
+        pool.record("a:1", "block")
+        self.assertTrue(pool.is_open("a:1"))
+        self.assertEqual(pool.health["a:1"].cooldown, 60)
+
+    def test_success_resets_the_consecutive_errors(self) -> None:
+        pool = ProxyPool(["a:1"], failure_threshold=2)
+
+        pool.record("a:1", "failure")
+        pool.record("a:1", "success")
+        pool.record("a:1", "failure")
+
+        self.assertEqual(pool.health["a:1"].state, CLOSED)
+
+    def test_half_open_after_cooldown(self) -> None:
+        pool = ProxyPool(["a:1"], failure_threshold=1, cooldown=60)
+        pool.record("a:1", "block")
+        opened_at = pool.health["a:1"].opened_at
+
+        self.assertFalse(pool.is_available("a:1", opened_at + 59))
+        self.assertTrue(pool.is_available("a:1", opened_at + 60))
+        self.assertEqual(pool.health["a:1"].state, HALF_OPEN)
+
+    def test_successful_trial_closes_the_circuit(self) -> None:
+        pool = ProxyPool(["a:1"], failure_threshold=1, cooldown=60)
+        pool.record("a:1", "block")
+        pool.is_available("a:1", time.time() + 60)
+
+        pool.record("a:1", "success", latency=1.0)
+
+        self.assertEqual((pool.health["a:1"].state, pool.health["a:1"].cooldown), (CLOSED, 0.0))
+
+    def test_failed_trial_doubles_the_cooldown(self) -> None:
+        pool = ProxyPool(["a:1"], failure_threshold=3, cooldown=60, max_cooldown=100)
+        for _ in range(3):
+            pool.record("a:1", "failure")
+
+        pool.is_available("a:1", time.time() + 60)
+        # A single failed trial reopens the circuit, below the failure threshold
+        pool.record("a:1", "failure")
+        self.assertEqual((pool.health["a:1"].state, pool.health["a:1"].cooldown), (OPEN, 100))
+
+    def test_choose_skips_open_circuits(self) -> None:
+        pool = ProxyPool(["a:1", "b:2"], failure_threshold=1)
+        pool.record("a:1", "block")
+
+        self.assertEqual({pool.choose() for _ in range(20)}, {"b:2"})
+        # With every circuit open, the proxy whose cooldown ends first is used
+        pool.record("b:2", "block")
+        pool.health["b:2"].opened_at -= 1
+        self.assertEqual(pool.choose(), "b:2")
+
+    def test_unknown_outcome_is_rejected(self) -> None:
+        pool = ProxyPool(["a:1"])
+
+        pool.record(None, "success")
+        with self.assertRaises(ValueError):
+            pool.record("a:1", "timeout")
+
+    def test_scores_are_saved_and_loaded(self) -> None:
+        pool = ProxyPool(["a:1", "b:2"], self.scores_file_path)
+        pool.record("a:1", "success", latency=2.0)
+        pool.record("b:2", "block")
+        pool.save()
+
+        loaded = ProxyPool(["a:1", "b:2", "c:3"], self.scores_file_path)
+
+        self.assertEqual(loaded.health["a:1"].latency, 2.0)
+        self.assertEqual(loaded.health["b:2"].blocks, 1)
+        self.assertEqual(loaded.health["c:3"].requests, 0)
+        self.assertGreater(loaded.score("a:1"), loaded.score("b:2"))
+
+    def test_changes_hold_only_the_requests_of_this_process(self) -> None:
+        pool = ProxyPool(["a:1", "b:2"], self.scores_file_path)
+        pool.record("a:1", "success", latency=1.0)
+        pool.save()
+
+        worker = ProxyPool(["a:1", "b:2"], self.scores_file_path)
+        worker.record("a:1", "block")
+
+        changes = worker.changes()
+        self.assertEqual(set(changes), {"a:1"})
+        self.assertEqual((changes["a:1"]["successes"], changes["a:1"]["blocks"]), (0, 1))
+
+    def test_coordinator_merges_the_changes_of_workers(self) -> None:
+        pool = ProxyPool(["a:1", "b:2"], self.scores_file_path)
+        pool.record("a:1", "success", latency=1.0)
+        pool.save()
+
+        workers = [ProxyPool(["a:1", "b:2"], self.scores_file_path, failure_threshold=1) for _ in range(2)]
+        workers[0].record("a:1", "success", latency=3.0)
+        workers[1].record("a:1", "block")
+        workers[1].record("b:2", "failure")
+
+        coordinator = ProxyPool(["a:1", "b:2"], self.scores_file_path)
+        for worker in workers:
+            coordinator.merge(worker.changes())
+
+        health = coordinator.health["a:1"]
+        self.assertEqual((health.successes, health.blocks, health.failures), (2, 1, 0))
+        # The worker without successes does not reset the latency, its circuit state is taken over
+        self.assertEqual(health.latency, workers[0].health["a:1"].latency)
+        self.assertEqual(health.state, OPEN)
+        self.assertEqual(coordinator.health["b:2"].failures, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+    test_quick_mode.py
+
+    Tests of the quick search mode: products are saved from the search result cards,
+    and only the product pages of cards without a price are loaded.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from amazon_scraper import AmazonUPCProcessor
+from utils.page_parser import SearchCard, SearchPageData
+
+
+SEARCH_URL = "https://www.amazon.com/s?k=000000000017"
+
+
+def search_data(*cards: SearchCard) -> SearchPageData:
+    """Return a search page with the given cards."""
+    return SearchPageData(no_results=False, product_urls=[card.url for card in cards], cards=list(cards))
+
+
+class QuickSearchModeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.processor = self.make_processor("quick")
+
+    def tearDown(self) -> None:
+        self.processor.close_results()
+        shutil.rmtree(self.directory)
+
+    def make_processor(self, search_mode: str) -> AmazonUPCProcessor:
+        """Create a processor that saves into the temporary directory."""
+        return AmazonUPCProcessor(
+            os.path.join(self.directory, 'data.csv'),
+            os.path.join(self.directory, f'results_{search_mode}.json'),
+            os.path.join(self.directory, 'proxies.json'),
+            csv_file=None,
+            search_mode=search_mode,
+            log_file_name="test_quick_mode.log"
+        )
+
+    def test_priced_cards_are_saved_without_loading_products(self) -> None:
+        card = SearchCard(url="https://www.amazon.com/dp/B000TEST01", asin="B000TEST01", title="Tool", price="34.56")
+
+        with mock.patch.object(self.processor, 'get_details_of_products') as get_details_of_products:
+            self.processor.handle_search_data(search_data(card), SEARCH_URL, "000000000017", "17", "G1", "20")
+
+        get_details_of_products.assert_not_called()
+        records = self.processor.results_store.read_all()
+        self.assertEqual(
+            [(item["ASIN"], item["Price"], item["Seller"], item["BSR"]) for item in records],
+            [("B000TEST01", "34.56", "N/A", "N/A")]
+        )
+        self.assertEqual(self.processor.cards_used, 1)
+
+    def test_cards_without_price_load_their_product_page(self) -> None:
+        cards = [
+            SearchCard(url="https://www.amazon.com/dp/B000TEST01", asin="B000TEST01", title="Tool", price="34.56"),
+            SearchCard(url="https://www.amazon.com/dp/B000TEST02", asin="B000TEST02", title="Other", price="N/A"),
+        ]
+
+        with mock.patch.object(self.processor, 'get_details_of_products', return_value=True) as get_details_of_products:
+            self.processor.handle_search_data(search_data(*cards), SEARCH_URL, "000000000017", "17", "G1", "20")
+
+        get_details_of_products.assert_called_once_with(["https://www.amazon.com/dp/B000TEST02"], "17", "G1", "20")
+        # The priced card waits for the loaded products, they are saved together
+        self.assertEqual([item["ASIN"] for item in self.processor.product_details], ["B000TEST01"])
+
+    def test_full_mode_loads_every_product(self) -> None:
+        processor = self.make_processor("full")
+        card = SearchCard(url="https://www.amazon.com/dp/B000TEST01", asin="B000TEST01", title="Tool", price="34.56")
+
+        with mock.patch.object(processor, 'get_details_of_products', return_value=True) as get_details_of_products:
+            processor.handle_search_data(search_data(card), SEARCH_URL, "000000000017", "17", "G1", "20")
+        processor.close_results()
+
+        get_details_of_products.assert_called_once_with([card.url], "17", "G1", "20")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+    test_rate_limiter.py
+
+    Tests of the token bucket and the AIMD request scheduler, run on a virtual clock
+    and against the simulated throttling server of `simulate_block_rate`.
+"""
+
+import random
+import unittest
+
+from utils.rate_limiter import RequestScheduler, TokenBucket, simulate_block_rate
+
+
+class VirtualClock:
+    """A clock that only moves when the scheduler sleeps."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_paces_to_rate(self) -> None:
+        clock = VirtualClock()
+        bucket = TokenBucket(rate=2.0, capacity=1.0, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+
+        clock.sleep(10)
+        # An idle bucket only refills up to its capacity
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+    def test_paused_bucket_refills_after_pause(self) -> None:
+        clock = VirtualClock()
+        bucket = TokenBucket(rate=2.0, capacity=1.0, clock=clock)
+        bucket.tokens = 0.0
+        bucket.updated_at = 3.0
+
+        self.assertAlmostEqual(bucket.reserve(), 3.5)
+        clock.sleep(3.5)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+
+class RequestSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = VirtualClock()
+        self.scheduler = RequestScheduler(
+            initial_rate=1.0, base_backoff=4.0, max_backoff=16.0, clock=self.clock, sleep=self.clock.sleep
+        )
+        self.scheduler.logger.disabled = True
+
+    def tearDown(self) -> None:
+        self.scheduler.logger.disabled = False
+
+    def test_block_cuts_rate_and_backs_off(self) -> None:
+        self.scheduler.wait("proxy")
+        backoffs = [self.scheduler.on_block("proxy") for _ in range(4)]
+
+        self.assertEqual(self.scheduler.rate("proxy"), 1.0 * 0.5 ** 4)
+        # Half of the doubling backoff is jitter, capped at max_backoff
+        for backoff, full in zip(backoffs, [4.0, 8.0, 16.0, 16.0]):
+            self.assertGreaterEqual(backoff, full / 2)
+            self.assertLessEqual(backoff, full)
+
+        # After the backoff the bucket starts empty, so the next token takes one interval
+        interval = 1 / self.scheduler.rate("proxy")
+        started = self.clock()
+        self.scheduler.wait("proxy")
+        self.assertAlmostEqual(self.clock() - started, backoffs[-1] + interval)
+
+        started = self.clock()
+        self.scheduler.wait("proxy")
+        self.assertAlmostEqual(self.clock() - started, interval)
+
+    def test_requests_queued_during_backoff_are_spaced(self) -> None:
+        self.scheduler.wait("proxy")
+        backoff = self.scheduler.on_block("proxy")
+
+        delays = [self.scheduler.wait("proxy") for _ in range(3)]
+
+        self.assertAlmostEqual(delays[0], backoff + 2.0)
+        self.assertAlmostEqual(delays[1], 2.0)
+        self.assertAlmostEqual(delays[2], 2.0)
+
+    def test_success_raises_rate_slower_near_block_ceiling(self) -> None:
+        self.scheduler.on_success("proxy")
+        self.assertAlmostEqual(self.scheduler.rate("proxy"), 1.02)
+
+        self.scheduler.on_block("proxy")
+        for _ in range(25):
+            self.scheduler.on_success("proxy")
+        # 0.51 + 25 * 0.02 reaches 90% of the ceiling of 1.02, then the step is 0.002
+        self.assertLess(self.scheduler.rate("proxy"), 1.0)
+        self.assertGreater(self.scheduler.rate("proxy"), 0.918)
+
+    def test_rate_stays_within_limits(self) -> None:
+        for _ in range(20):
+            self.scheduler.on_block("proxy")
+        self.assertEqual(self.scheduler.rate("proxy"), self.scheduler.min_rate)
+
+        for _ in range(1000):
+            self.scheduler.on_success("other")
+        self.assertEqual(self.scheduler.rate("other"), self.scheduler.max_rate)
+
+    def test_identities_are_independent(self) -> None:
+        self.scheduler.on_block("blocked")
+
+        self.assertEqual(self.scheduler.wait("healthy"), 0.0)
+        self.assertEqual(self.scheduler.rate("healthy"), 1.0)
+        self.assertEqual(self.scheduler.summary()["blocked"]["blocks"], 1)
+
+
+class SimulateBlockRateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(7)
+
+    def test_settles_under_threshold(self) -> None:
+        for threshold in (0.5, 1.0, 2.0):
+            with self.subTest(threshold=threshold):
+                result = simulate_block_rate(threshold, requests=3000)
+
+                self.assertLess(result["achieved_rate"], threshold)
+                self.assertGreater(result["achieved_rate"], 0.6 * threshold)
+                self.assertLess(result["block_rate"], 0.05)
+
+    def test_recovers_from_random_blocks(self) -> None:
+        result = simulate_block_rate(1.0, requests=3000, background_block_rate=0.02)
+
+        self.assertLess(result["block_rate"], 0.05)
+        self.assertGreater(result["achieved_rate"], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+    test_results_store.py
+
+    Tests of the JSON Lines results store: UPC deduplication, syncing every
+    `fsync_every` records, and rebuilding the index after a reopen.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.results_store import JsonlResultsStore
+
+
+def record(upc: str, asin: str) -> dict:
+    """Return a minimal product record."""
+    return {"UPC": upc, "ASIN": asin, "Price": "9.99"}
+
+
+class JsonlResultsStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.results_file_path = os.path.join(self.directory, 'results.json')
+        self.stores = []
+
+    def tearDown(self) -> None:
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.directory)
+
+    def open_store(self, **kwargs) -> JsonlResultsStore:
+        """Open a store on the test results file and close it after the test."""
+        store = JsonlResultsStore(self.results_file_path, **kwargs)
+        self.stores.append(store)
+        return store
+
+    def test_products_of_a_new_upc_are_written_together(self) -> None:
+        store = self.open_store()
+
+        written = store.append_many([record("1", "A1"), record("1", "A2"), record("2", "A3")])
+
+        self.assertEqual(written, 3)
+        self.assertEqual(store.record_count, 3)
+        self.assertTrue(store.contains_upc(1))
+        self.assertTrue(store.contains_asin("A2"))
+
+    def test_stored_upc_is_skipped(self) -> None:
+        store = self.open_store()
+        store.append_many([record("1", "A1")])
+
+        written = store.append_many([record("1", "A9"), record("2", "A2")])
+
+        self.assertEqual(written, 1)
+        self.assertEqual([item["ASIN"] for item in store.read_all()], ["A1", "A2"])
+        self.assertFalse(store.contains_asin("A9"))
+
+    def test_fsync_every(self) -> None:
+        store = self.open_store(fsync_every=3)
+
+        with mock.patch('utils.results_store.os.fsync') as fsync:
+            store.append_many([record("1", "A1")])
+            store.append_many([record("2", "A2")])
+            self.assertEqual(fsync.call_count, 0)
+
+            store.append_many([record("3", "A3")])
+            # The records file and the index are synced together
+            self.assertEqual(fsync.call_count, 2)
+
+            store.append_many([record("4", "A4"), record("5", "A5")])
+            self.assertEqual(fsync.call_count, 2)
+
+            store.flush()
+            self.assertEqual(fsync.call_count, 4)
+
+    def test_reopen_keeps_index(self) -> None:
+        store = self.open_store()
+        store.append_many([record("1", "A1"), record("2", "N/A")])
+        store.close()
+
+        reopened = self.open_store()
+
+        self.assertEqual(reopened.record_count, 2)
+        self.assertEqual(reopened.last_upc, "2")
+        self.assertTrue(reopened.contains_upc("2"))
+        self.assertFalse(reopened.contains_asin("N/A"))
+        self.assertEqual(reopened.append_many([record("2", "A5")]), 0)
+
+    def test_unindexed_tail_is_indexed(self) -> None:
+        store = self.open_store()
+        store.append_many([record("1", "A1")])
+        store.close()
+        # A record that reached the records file but not the index, then a torn line
+        with open(store.records_file_path, 'a', encoding='utf-8') as records_file:
+            records_file.write(json.dumps(record("2", "A2")) + "\n" + '{"UPC": "3"')
+
+        reopened = self.open_store()
+
+        self.assertTrue(reopened.contains_upc("2"))
+        self.assertFalse(reopened.contains_upc("3"))
+        reopened.append_many([record("4", "A4")])
+        self.assertEqual([item["UPC"] for item in reopened.read_all()], ["1", "2", "4"])
+
+    def test_legacy_json_array_is_imported(self) -> None:
+        with open(self.results_file_path, 'w', encoding='utf-8') as json_file:
+            json.dump([record("1", "A1"), record("2", "A2")], json_file)
+
+        store = self.open_store()
+
+        self.assertEqual(store.record_count, 2)
+        self.assertEqual(store.append_many([record("1", "A3")]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+    test_selector_registry.py
+
+    Tests of the selector registry: recording up to the first hit, ranking by hit
+    rate per template, and merging the changes of several processes.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from lxml import html as lxml_html
+
+from utils.page_parser import PRICE_XPATHS, _PRICE_QUERIES, _probe_texts
+from utils.selector_registry import SelectorRegistry, template_from_class
+
+
+class SelectorRegistryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.stats_file_path = os.path.join(self.directory, 'selector_stats.json')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_template_from_class(self) -> None:
+        self.assertEqual(template_from_class("hardlines_tools en_US"), "hardlines_tools")
+        self.assertEqual(template_from_class(None), "default")
+
+    def test_record_until_hit_skips_later_selectors(self) -> None:
+        registry = SelectorRegistry()
+
+        registry.record_until_hit("price", "books", [("a", False, 0.0), ("b", True, 0.0), ("c", False, 0.0)])
+
+        stats = registry.stats["price"]["books"]
+        self.assertEqual((stats["a"].hits, stats["a"].misses), (0, 1))
+        self.assertEqual((stats["b"].hits, stats["b"].misses), (1, 0))
+        self.assertNotIn("c", stats)
+
+    def test_lxml_probe_stops_at_first_hit(self) -> None:
+        registry = SelectorRegistry()
+        # The second and the last price selector match, only the second counts
+        tree = lxml_html.fromstring(
+            "<html><body><span class='a-price aok-align-center reinventPricePriceToPayMargin priceToPay'>"
+            "<span class='a-offscreen'>$5.00</span></span><span id='kindle-price'>$4.00</span></body></html>"
+        )
+
+        texts = _probe_texts("price", PRICE_XPATHS, _PRICE_QUERIES, tree, registry, "books")
+
+        self.assertEqual(texts, [None, "$5.00"])
+        stats = registry.stats["price"]["books"]
+        self.assertEqual(set(stats), set(PRICE_XPATHS[:2]))
+        self.assertEqual(stats[PRICE_XPATHS[1]].hits, 1)
+
+    def test_ordered_by_hit_rate_per_template(self) -> None:
+        registry = SelectorRegistry()
+        for _ in range(5):
+            registry.record_until_hit("price", "books", [("a", False, 0.0), ("b", True, 0.0)])
+            registry.record_until_hit("price", "grocery", [("a", True, 0.0)])
+
+        self.assertEqual(registry.ordered("price", "books", ["a", "b", "c"]), ["b", "c", "a"])
+        self.assertEqual(registry.ordered("price", "grocery", ["a", "b"]), ["a", "b"])
+        # An unknown template uses the statistics of all templates
+        self.assertEqual(registry.ordered("price", "toys", ["b", "a"]), ["b", "a"])
+
+    def test_ordered_skips_unmatched_selectors(self) -> None:
+        registry = SelectorRegistry()
+        for _ in range(3):
+            registry.record("seller", "books", "a", False)
+
+        self.assertEqual(registry.ordered("seller", "books", ["a", "b"], skip_unmatched_after=3), ["b"])
+        self.assertEqual(registry.ordered("seller", "books", ["a", "b"], skip_unmatched_after=4), ["b", "a"])
+        self.assertEqual(registry.never_matched(min_tries=3), {"seller": ["a"]})
+
+    def test_workers_merge_their_changes(self) -> None:
+        registry = SelectorRegistry(self.stats_file_path)
+        registry.record("price", "books", "a", True, 0.5)
+        registry.save()
+
+        workers = [SelectorRegistry(self.stats_file_path) for _ in range(2)]
+        workers[0].record("price", "books", "a", False, 0.25)
+        workers[1].record("price", "books", "a", True, 0.25)
+        workers[1].record("bsr", "books", "b", True)
+
+        coordinator = SelectorRegistry(self.stats_file_path)
+        for worker in workers:
+            coordinator.merge(worker.changes())
+        coordinator.save()
+
+        with open(self.stats_file_path, 'r', encoding='utf-8') as stats_file:
+            saved = json.load(stats_file)
+        self.assertEqual(saved["price"]["books"]["a"], {"hits": 2, "misses": 1, "seconds": 1.0})
+        self.assertEqual(saved["bsr"]["books"]["b"]["hits"], 1)
+        # The loaded statistics are not part of the changes
+        self.assertEqual(workers[0].changes(), {"price": {"books": {"a": {"hits": 0, "misses": 1, "seconds": 0.25}}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+    test_session_store.py
+
+    Tests of the saved ZIP code sessions: expiry, damaged files, and restoring them
+    in a stand-in driver.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.session_store import SessionStore, to_selenium_cookie
+
+
+COOKIES = [
+    {"name": "session-id", "value": "123", "domain": ".amazon.com", "path": "/", "expiry": 1893456000.5, "size": 13},
+]
+
+
+class FakeDriver:
+    """Keeps the injected cookies and shows the given delivery location in the header."""
+
+    def __init__(self, location: str, rejected_cookies: tuple = ()) -> None:
+        self.location = location
+        self.rejected_cookies = rejected_cookies
+        self.cookies = []
+        self.visited = []
+
+    def get(self, url: str) -> None:
+        self.visited.append(url)
+
+    def add_cookie(self, cookie: dict) -> None:
+        if cookie["name"] in self.rejected_cookies:
+            raise ValueError("invalid cookie domain")
+        self.cookies.append(cookie)
+
+    def refresh(self) -> None:
+        pass
+
+    def execute_script(self, script: str, *args) -> str:
+        return self.location
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.store = SessionStore(self.directory, ttl_seconds=60)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_to_selenium_cookie(self) -> None:
+        self.assertEqual(
+            to_selenium_cookie(COOKIES[0]),
+            {"name": "session-id", "value": "123", "domain": ".amazon.com", "path": "/", "expiry": 1893456000}
+        )
+
+    def test_saved_session_is_loaded(self) -> None:
+        self.store.save("10001", COOKIES)
+
+        self.assertEqual(self.store.load("10001"), COOKIES)
+        self.assertIsNone(self.store.load("90210"))
+
+    def test_expired_session_is_not_loaded(self) -> None:
+        self.store.save("10001", COOKIES)
+
+        with mock.patch('utils.session_store.time.time', return_value=time.time() + 61):
+            self.assertIsNone(self.store.load("10001"))
+
+    def test_damaged_session_is_ignored(self) -> None:
+        with open(os.path.join(self.directory, '10001.json'), 'w', encoding='utf-8') as session_file:
+            session_file.write("{")
+
+        self.assertIsNone(self.store.load("10001"))
+
+    def test_restore_accepted_session(self) -> None:
+        self.store.save("10001", COOKIES + [{"name": "broken", "value": ""}])
+        driver = FakeDriver("New York 10001", rejected_cookies=("broken",))
+
+        self.assertTrue(self.store.restore(driver, "https://www.amazon.com", "10001"))
+        self.assertEqual(driver.visited, ["https://www.amazon.com"])
+        self.assertEqual([cookie["name"] for cookie in driver.cookies], ["session-id"])
+        self.assertEqual(self.store.restored, 1)
+
+    def test_rejected_session_is_invalidated(self) -> None:
+        self.store.save("10001", COOKIES)
+
+        self.assertFalse(self.store.restore(FakeDriver("Update location"), "https://www.amazon.com", "10001"))
+        self.assertIsNone(self.store.load("10001"))
+        self.assertEqual(self.store.rejected, 1)
+
+    def test_restore_without_saved_session(self) -> None:
+        driver = FakeDriver("New York 10001")
+
+        self.assertFalse(self.store.restore(driver, "https://www.amazon.com", "10001"))
+        self.assertEqual(driver.visited, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+    test_upc_reader.py
+
+    Tests of the streamed input rows: UPC codes padded to 12 digits from xlsx, CSV
+    and Parquet files, skipped rows and chunking.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+from openpyxl import Workbook
+
+from utils.upc_reader import UpcRow, read_upc_rows
+
+
+# UPC codes as they come from the sheets: numbers, text with leading zeros, and a missing one
+ROWS = [
+    ["Z001", 12345678901, 10.5],
+    ["Z002", "000000000017", "7.25"],
+    ["Z003", None, 3.0],
+    ["Z004", 98765, None],
+]
+
+EXPECTED = [
+    UpcRow(0, "012345678901", "12345678901", "Z001", 10.5),
+    UpcRow(1, "000000000017", "000000000017", "Z002", 7.25),
+    UpcRow(3, "000000098765", "98765", "Z004", float("nan")),
+]
+
+
+class ReadUpcRowsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def assertRows(self, rows: list) -> None:
+        """Compare the rows with EXPECTED, a missing sales price being NaN."""
+        self.assertEqual([row[:4] for row in rows], [row[:4] for row in EXPECTED])
+        self.assertEqual([row.sales_price for row in rows[:2]], [10.5, 7.25])
+        self.assertTrue(pd.isna(rows[2].sales_price))
+
+    def test_xlsx_rows(self) -> None:
+        file_path = os.path.join(self.directory, 'input.xlsx')
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["zoro_no", "upc_code", "sales_price", "notes"])
+        for row in ROWS:
+            sheet.append(row + ["x"])
+        workbook.save(file_path)
+
+        self.assertRows(list(read_upc_rows(file_path, chunk_size=2)))
+
+    def test_csv_rows_keep_leading_zeros(self) -> None:
+        file_path = os.path.join(self.directory, 'input.csv')
+        pd.DataFrame(ROWS, columns=["zoro_no", "upc_code", "sales_price"]).to_csv(file_path, index=False)
+
+        self.assertRows(list(read_upc_rows(file_path, chunk_size=3)))
+
+    def test_parquet_rows(self) -> None:
+        file_path = os.path.join(self.directory, 'input.parquet')
+        frame = pd.DataFrame(ROWS, columns=["zoro_no", "upc_code", "sales_price"])
+        frame["upc_code"] = frame["upc_code"].map(lambda code: None if code is None else str(code))
+        frame["sales_price"] = pd.to_numeric(frame["sales_price"])
+        frame.to_parquet(file_path)
+
+        self.assertRows(list(read_upc_rows(file_path, chunk_size=2)))
+
+    def test_float_upc_codes_lose_the_decimal_part(self) -> None:
+        file_path = os.path.join(self.directory, 'input.parquet')
+        pd.DataFrame({"zoro_no": ["Z001"], "upc_code": [98765.0], "sales_price": [1.0]}).to_parquet(file_path)
+
+        row = next(read_upc_rows(file_path))
+
+        self.assertEqual((row.upc_code, row.upc_code_original), ("000000098765", "98765"))
+
+    def test_unsupported_file_type(self) -> None:
+        with self.assertRaises(ValueError):
+            next(read_upc_rows(os.path.join(self.directory, 'input.txt')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+    test_worker_pool.py
+
+    Tests of the worker pool without browsers: the sink that forwards the records of
+    a worker, the statistics a worker sends, and the rows the coordinator hands out.
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import unittest
+
+from worker_pool import BrowserWorker, QueueResultsSink, WorkerPool
+
+
+def drain(result_queue: queue.Queue) -> list:
+    """Return the messages waiting on a queue."""
+    messages = []
+    while not result_queue.empty():
+        messages.append(result_queue.get_nowait())
+    return messages
+
+
+class QueueResultsSinkTest(unittest.TestCase):
+    def test_records_are_sent_in_one_message(self) -> None:
+        result_queue = queue.Queue()
+        sink = QueueResultsSink(result_queue)
+
+        self.assertEqual(sink.append_many(iter([{"UPC": "17"}, {"UPC": "17"}])), 2)
+        self.assertEqual(sink.append_many([]), 0)
+        sink.send_run_stats({"selectors": {}, "proxies": {}})
+
+        self.assertEqual(drain(result_queue), [
+            ("records", [{"UPC": "17"}, {"UPC": "17"}]),
+            ("stats", {"selectors": {}, "proxies": {}}),
+        ])
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.input_file_path = os.path.join(self.directory, 'data.csv')
+        with open(self.input_file_path, 'w', encoding='utf-8') as input_file:
+            input_file.write("zoro_no,upc_code,sales_price\nG1,17,20\nG2,,5\nG3,0123,7.5\n")
+
+        self.processor_args = [
+            self.input_file_path,
+            os.path.join(self.directory, 'results.json'),
+            os.path.join(self.directory, 'proxies.json'),
+        ]
+        self.processor_kwargs = {
+            "csv_file": None,
+            "selector_stats_file": os.path.join(self.directory, 'selector_stats.json'),
+            "log_file_name": "test_worker_pool.log",
+        }
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_rows_are_followed_by_one_stop_per_worker(self) -> None:
+        pool = WorkerPool(*self.processor_args, workers=2, **self.processor_kwargs)
+        task_queue = queue.Queue()
+
+        pool._feed_rows(task_queue, threading.Event())
+        pool.coordinator.close_results()
+
+        items = drain(task_queue)
+        self.assertEqual([(row.row_id, row.upc_code) for row in items[:2]], [(0, "000000000017"), (2, "000000000123")])
+        self.assertEqual(items[2:], [None, None])
+
+    def test_feeding_stops_when_the_workers_are_gone(self) -> None:
+        pool = WorkerPool(*self.processor_args, workers=2, **self.processor_kwargs)
+        stop_event = threading.Event()
+        stop_event.set()
+        task_queue = queue.Queue()
+
+        pool._feed_rows(task_queue, stop_event)
+        pool.coordinator.close_results()
+
+        self.assertTrue(task_queue.empty())
+
+    def test_worker_sends_its_changes_instead_of_saving(self) -> None:
+        result_queue = queue.Queue()
+        worker = BrowserWorker(
+            None, *self.processor_args, results_store=QueueResultsSink(result_queue), **self.processor_kwargs
+        )
+        worker.selector_registry.record("price", "books", "a", True, 0.5)
+
+        worker.save_run_stats()
+
+        self.assertFalse(os.path.exists(self.processor_kwargs["selector_stats_file"]))
+        message, stats = result_queue.get_nowait()
+        self.assertEqual(message, "stats")
+        self.assertEqual(stats["selectors"], {"price": {"books": {"a": {"hits": 1, "misses": 0, "seconds": 0.5}}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
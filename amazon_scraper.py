@@ -4,23 +4,88 @@ import os
 import re
 import time
 import logging
-import pandas as pd
+from collections import defaultdict
+from contextlib import contextmanager
 import undetected_chromedriver as uc
 
 from selenium import webdriver
 from fake_useragent import UserAgent
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from utils.json_to_csv import save_json_to_csv
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, Callable, DefaultDict, Iterator, Optional, Tuple, Union
 
 from utils.setup_logger import LoggerSetup
+from utils.results_store import open_results_store
+from utils.columnar_export import write_records_to_columnar
+from utils.csv_sink import CsvSink
+from utils.proxy_pool import ProxyPool
+from utils.rate_limiter import RequestScheduler
+from utils.driver_manager import DriverManager, ManagedDriver
+from utils.session_store import SessionStore
+from utils.lean_profile import PAGE_BYTES_SCRIPT, apply_lean_profile
+from utils.http_fetcher import FetchedPage, HttpFetcher, is_block_page
+from utils.replay_server import page_file_name
+from utils.page_cache import PageCache
+from utils.checkpoint import Checkpoint
+from utils.upc_reader import UpcRow, read_upc_rows
+from utils.async_fetcher import fetch_pages_concurrently
+from utils.page_readiness import PageReadiness
+from utils.js_extractor import extract_product_page, extract_search_page, probe_fields
+from utils.selector_registry import DEFAULT_TEMPLATE, SelectorRegistry
+from utils.metrics import MetricsRegistry, MetricsServer
+from utils.page_parser import (
+    BSR_XPATHS, LXML_AVAILABLE, PRICE_XPATHS, SELLER_XPATH, ProductPageData, SearchCard, SearchPageData,
+    get_bsr_number, get_first_category, parse_product_page, parse_search_page, valid_price
+)
 from utils.price_utils import format_price, get_price_difference
 
+
+AMAZON_BASE_URL = "https://www.amazon.com"
  
 class AmazonUPCProcessor:
-    def __init__(self, excel_file_path: str, results_file: str, proxies_file_path: str) -> None:
+    def __init__(
+            self, 
+            excel_file_path: str, 
+            results_file: str, 
+            proxies_file_path: str,
+            extraction_mode: str = "lxml",
+            fetch_mode: str = "browser",
+            base_url: str = AMAZON_BASE_URL,
+            detail_concurrency: int = 8,
+            detail_timeout: float = 20,
+            results_store: Optional[Any] = None,
+            log_file_name: str = "amazon_upc_processor.log",
+            readiness_timeouts: Optional[Dict[str, float]] = None,
+            wait_for_network_idle: bool = False,
+            zip_code: str = "10001",
+            cache_dir: Optional[str] = None,
+            cache_ttl: float = 12 * 3600,
+            cache_max_bytes: int = 512 * 1024 * 1024,
+            checkpoint_file: Optional[str] = None,
+            checkpoint_every: int = 50,
+            results_backend: str = "jsonl",
+            columnar_file: Optional[str] = None,
+            csv_file: Optional[str] = 'src/csv/03_amazon_data.csv',
+            use_proxies: bool = False,
+            proxy_scores_file: Optional[str] = None,
+            request_rate: float = 0.5,
+            max_block_retries: int = 2,
+            spare_browsers: int = 1,
+            page_budget: int = 300,
+            session_dir: Optional[str] = None,
+            session_ttl: float = 24 * 3600,
+            lean_profile: bool = False,
+            lean_allowlist: Optional[List[str]] = None,
+            page_load_strategy: str = "eager",
+            search_mode: str = "full",
+            selector_stats_file: Optional[str] = None,
+            browser_fallback: bool = True,
+            record_dir: Optional[str] = None,
+            metrics_port: Optional[int] = None,
+            metrics_file: Optional[str] = None
+            ) -> None:
         """
             Initialize the scraper with specified file paths and setup.
 
@@ -28,6 +93,100 @@ class AmazonUPCProcessor:
                 excel_file_path (str): The path to the Excel file containing product information.
                 results_file (str): The path to the results file where product details will be saved.
                 proxies_file_path (str): The path to the file containing proxy settings.
+                extraction_mode (str): How browser pages are read. "lxml" parses the page 
+                                    source once and uses the live DOM only as a fallback, 
+                                    "dom" always queries the live DOM, "js" reads search 
+                                    and product pages with one script call per page. 
+                                    Default is "lxml".
+                fetch_mode (str): How search and product pages are downloaded. "browser" 
+                                renders them in Chrome, "http" downloads them with a pooled 
+                                HTTP client and falls back to Chrome only on a block page. 
+                                Default is "browser".
+                base_url (str): The Amazon site to scrape. It can point to a local server 
+                                that serves recorded pages. Default is AMAZON_BASE_URL.
+                detail_concurrency (int): Maximum number of product pages of one UPC that are 
+                                        downloaded at the same time in "http" mode. Default is 8.
+                detail_timeout (float): Seconds after which a product page download is given 
+                                        up in "http" mode. Default is 20.
+                results_store (Optional[Any]): The store the product details are saved to. 
+                                            Defaults to a store of `results_backend` next to `results_file`.
+                log_file_name (str): The name of the log file in src/logs/. 
+                                    Default is "amazon_upc_processor.log".
+                readiness_timeouts (Optional[Dict[str, float]]): Maximum seconds to wait for 
+                                    each page type ("home", "search", "product", ...) to be 
+                                    ready. Default is None (the PageReadiness defaults).
+                wait_for_network_idle (bool): Also wait for the network to be idle before a 
+                                    page counts as ready. Default is False.
+                zip_code (str): The delivery ZIP code set on Amazon. Default is "10001".
+                cache_dir (Optional[str]): Directory of the on-disk page cache. Cached search 
+                                    and product pages are parsed without loading them again. 
+                                    Default is None (no cache).
+                cache_ttl (float): Seconds a cached page stays valid. Default is 12 hours.
+                cache_max_bytes (int): Maximum size of the page cache on disk; the least 
+                                    recently used pages are evicted. Default is 512 MB.
+                checkpoint_file (Optional[str]): The file that records the processed rows of 
+                                    the Excel file, used to resume a run. Defaults to the 
+                                    results file path with a `.checkpoint` extension.
+                checkpoint_every (int): Finished rows after which the results are synced to 
+                                    disk and the checkpoint is saved with them. Default is 50.
+                results_backend (str): The results store used when `results_store` is not 
+                                    given: "jsonl" (append-only JSON Lines) or "sqlite" 
+                                    (indexed SQLite database). Default is "jsonl".
+                columnar_file (Optional[str]): A typed Parquet (or `.arrow` IPC) file the 
+                                    results are also exported to at the end of the run. 
+                                    Default is None (no columnar export).
+                csv_file (Optional[str]): The CSV file every new product detail is appended 
+                                    to as soon as it is saved. Default is 
+                                    'src/csv/03_amazon_data.csv'; None disables the CSV.
+                use_proxies (bool): Route the browser through the proxies of the proxies file, 
+                                    chosen by their health. Default is False.
+                proxy_scores_file (Optional[str]): The file the proxy health scores are saved 
+                                    to between runs. Defaults to `proxy_scores.json` next to 
+                                    the proxies file.
+                request_rate (float): Requests per second each proxy (or the direct 
+                                    connection) starts with. The rate is raised after 
+                                    successful requests and cut after blocks. Default is 0.5.
+                max_block_retries (int): How often a blocked page is loaded again after a 
+                                    backoff before it is given up. Default is 2.
+                spare_browsers (int): Browsers kept launched in the background, with the ZIP 
+                                    code set, to replace a dead or blocked one right away. 
+                                    Default is 1.
+                page_budget (int): Pages a browser loads before it is swapped for a fresh 
+                                    one; 0 disables recycling. Default is 300.
+                session_dir (Optional[str]): Directory where the session cookies of every ZIP 
+                                    code are saved and restored into new browsers, so the 
+                                    "Deliver to" popover is only used when no valid session 
+                                    is saved. Default is None (always use the popover).
+                session_ttl (float): Seconds a saved session is reused. Default is 24 hours.
+                lean_profile (bool): Block images, fonts, media and ad/analytics hosts in 
+                                    the browser. Default is False.
+                lean_allowlist (Optional[List[str]]): Resource groups ("image", "font", 
+                                    "media", "ads") or URL pattern fragments the lean 
+                                    profile keeps allowed. Default is None.
+                page_load_strategy (str): When `driver.get` returns: "normal" after every 
+                                    subresource, "eager" once the HTML is parsed, "none" 
+                                    right away. The readiness waits then wait for the 
+                                    elements each page type needs. Default is "eager".
+                search_mode (str): "full" opens every product page to read price, seller, 
+                                    BSR and category. "quick" takes the ASIN and price from 
+                                    the search result cards and opens a product page only 
+                                    when its card shows no price; seller, BSR and category 
+                                    are "N/A". Default is "full".
+                selector_stats_file (Optional[str]): The file the hit rates of the price, 
+                                    seller and BSR selectors are saved to between runs. 
+                                    Defaults to `selector_stats.json` next to the proxies file.
+                browser_fallback (bool): In "http" mode, open pages in Chrome when they can 
+                                    not be downloaded. Without it Chrome is never launched, 
+                                    a page is downloaded again up to `max_block_retries` 
+                                    times and then skipped. Default is True.
+                record_dir (Optional[str]): Save every loaded search and product page to this 
+                                    directory, named for the replay server. Default is None.
+                metrics_port (Optional[int]): Serve the run metrics in the Prometheus text 
+                                    format on http://127.0.0.1:<port>/metrics while the 
+                                    UPC codes are processed. Default is None (no endpoint).
+                metrics_file (Optional[str]): The JSON file the metrics summary is written to 
+                                    at the end of the run. Defaults to the results file 
+                                    path with a `.metrics.json` extension.
 
             This constructor initializes the following attributes:
             - `excel_file_path`: Path to the input Excel file.
@@ -38,6 +197,39 @@ class AmazonUPCProcessor:
             - `logger`: Access to the logger for logging messages.
             - `user_agent`: Instance of UserAgent for managing user-agent strings.
             - `product_details`: List to store details of the products scraped.
+            - `results_store`: The store where the product details are saved.
+            - `extraction_mode`: The extraction mode, "dom" instead of "lxml" when lxml is not installed.
+            - `fetch_mode`: The fetch mode, "browser" when lxml is not installed.
+            - `search_mode`: The search mode, "full" when search cards can not be parsed.
+            - `cards_used`: Products saved from search cards without opening their page.
+            - `http_fetcher`: The HttpFetcher used in "http" mode, created in `start_driver`.
+            - `readiness`: PageReadiness that waits for pages and records the wait and 
+              time-to-extract times.
+            - `page_load_strategy`: The page load strategy of the browsers.
+            - `page_cache`: The PageCache, or None when caching is disabled.
+            - `asin_memo`: Product fields per ASIN scraped in this run, with `page_loads_saved`.
+            - `checkpoint`: Checkpoint with the IDs of the Excel rows that are already processed, 
+              saved every `checkpoint_every` rows (`rows_since_flush`) together with the results.
+            - `columnar_file`: The typed Parquet/Arrow export path, or None.
+            - `csv_sink`: The CsvSink the new product details are appended to, or None.
+            - `proxy`: The proxy the browser currently uses, or None.
+            - `proxy_pool`: The health-scored ProxyPool, or None when proxies are not used.
+            - `request_scheduler`: RequestScheduler with the rate limit and backoff per proxy.
+            - `driver_manager`: DriverManager with the active and the warm spare browsers.
+            - `session_store`: SessionStore with the saved ZIP code sessions, or None.
+            - `lean_profile`, `lean_allowlist`: The resource blocking settings of the browsers.
+            - `page_bytes`: Bytes transferred by every page loaded in the browser.
+            - `selector_registry`: SelectorRegistry with the hit rates of the field selectors 
+              per page template, and `page_template`, the template of the current product page.
+            - `browser_fallback`: Whether Chrome is used at all in "http" mode.
+            - `record_dir`: The directory the loaded pages are recorded to, or None.
+            - `stage_timings`: Seconds spent per pipeline stage ("upc", "search_fetch", 
+              "search_parse", "product_fetch", "product_parse", "save", "restore_session", 
+              "set_zip_code", "price_lookup", "seller_lookup", "bsr_lookup").
+            - `metrics`: MetricsRegistry with the stage histograms and the counters of page 
+              loads, selector misses, blocks, retries and bytes written.
+            - `metrics_port`, `metrics_file`: Where the metrics are served and summarized.
+            - `written_sizes`: The last seen size of every output file, for the bytes written.
         """
         self.excel_file_path = excel_file_path
         self.proxies_file_path = proxies_file_path
@@ -45,12 +237,113 @@ class AmazonUPCProcessor:
         self.driver = None
         
         self.logger_setup = LoggerSetup()  # Create an instance of LoggerSetup
-        self.logger_setup.setup_logger()  # Set up the logger
+        self.logger_setup.setup_logger(log_file_name=log_file_name)  # Set up the logger
         self.logger = self.logger_setup.logger  # Access the logger
 
+        self.metrics = MetricsRegistry()
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file or f"{os.path.splitext(results_file)[0]}.metrics.json"
+        self.metrics_server = None
+        self.define_metrics()
+
         self.user_agent = UserAgent()
         self.product_details = []  # List to store product details
-        # self.proxies = self.load_proxies()
+        self.results_store = (
+            results_store if results_store is not None
+            else open_results_store(self.results_file_path, results_backend)
+        )
+
+        if extraction_mode not in ("lxml", "dom", "js"):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        if extraction_mode == "lxml" and not LXML_AVAILABLE:
+            self.logger.error("lxml is not installed, falling back to the live DOM extraction.")
+            extraction_mode = "dom"
+        self.extraction_mode = extraction_mode
+
+        if fetch_mode == "http" and not LXML_AVAILABLE:
+            self.logger.error("lxml is not installed, pages can not be parsed without the browser.")
+            fetch_mode = "browser"
+        self.fetch_mode = fetch_mode
+
+        if search_mode == "quick" and not LXML_AVAILABLE and extraction_mode != "js":
+            self.logger.error("lxml is not installed, search cards can not be parsed. Using the full search mode.")
+            search_mode = "full"
+        self.search_mode = search_mode
+        self.base_url = base_url.rstrip("/")
+        self.http_fetcher = None
+        self.detail_concurrency = detail_concurrency
+        self.detail_timeout = detail_timeout
+        if page_load_strategy not in ("normal", "eager", "none"):
+            raise ValueError(f"Unknown page load strategy: {page_load_strategy}")
+        self.page_load_strategy = page_load_strategy
+        self.readiness = PageReadiness(
+            readiness_timeouts, network_idle=wait_for_network_idle, require_parsed=page_load_strategy != "none"
+        )
+        self.page_load_started = 0.0
+        self.zip_code = zip_code
+
+        if cache_dir is not None and not LXML_AVAILABLE:
+            self.logger.error("lxml is not installed, cached pages can not be parsed. The cache is disabled.")
+            cache_dir = None
+        self.page_cache = PageCache(cache_dir, cache_ttl, cache_max_bytes) if cache_dir else None
+
+        # ASIN -> (product URL, extracted fields) of the products scraped in this run
+        self.asin_memo: Dict[str, Tuple[str, ProductPageData]] = {}
+        self.page_loads_saved = 0
+
+        checkpoint_file = checkpoint_file or f"{os.path.splitext(self.results_file_path)[0]}.checkpoint"
+        self.checkpoint = Checkpoint(checkpoint_file, self.excel_file_path)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.rows_since_flush = 0
+        if self.checkpoint.fresh:
+            self.seed_checkpoint()
+
+        self.columnar_file = columnar_file
+
+        self.csv_sink = CsvSink(csv_file) if csv_file else None
+        if self.csv_sink:
+            self.csv_sink.sync_with(self.results_store)
+
+        self.proxy = None
+        self.proxy_pool = None
+        if use_proxies:
+            proxy_scores_file = proxy_scores_file or os.path.join(
+                os.path.dirname(self.proxies_file_path), 'proxy_scores.json'
+            )
+            self.proxy_pool = ProxyPool(self.load_proxies(), proxy_scores_file)
+
+        # A start rate above the default ceiling is not cut back by the first success
+        self.request_scheduler = RequestScheduler(initial_rate=request_rate, max_rate=max(request_rate, 5.0))
+        self.max_block_retries = max_block_retries
+
+        self.session_store = SessionStore(session_dir, session_ttl) if session_dir else None
+
+        self.lean_profile = lean_profile
+        self.lean_allowlist = lean_allowlist
+        self.page_bytes: List[int] = []
+        self.cards_used = 0
+
+        selector_stats_file = selector_stats_file or os.path.join(
+            os.path.dirname(self.proxies_file_path), 'selector_stats.json'
+        )
+        self.selector_registry = SelectorRegistry(selector_stats_file, self.metrics)
+        self.page_template = DEFAULT_TEMPLATE
+
+        if not browser_fallback and self.fetch_mode != "http":
+            raise ValueError('Running without the browser needs the "http" fetch mode and lxml.')
+        self.browser_fallback = browser_fallback
+
+        self.record_dir = record_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        self.stage_timings: DefaultDict[str, List[float]] = defaultdict(list)
+
+        # Output file -> size when it was last measured, the growth counts as bytes written
+        self.written_sizes: Dict[str, int] = {}
+        self.record_bytes_written()
+
+        self.driver_manager = DriverManager(self.create_browser, self.rotate_proxy, spare_browsers, page_budget)
     
     def load_proxies(self) -> List[Dict[str, Any]]:
         """
@@ -73,133 +366,569 @@ class AmazonUPCProcessor:
             print(f"Proxies file not found at: {self.proxies_file_path}")
             return []
     
-    def rotate_proxy(self) -> Optional[Dict[str, Any]]:
+    def rotate_proxy(self) -> Optional[str]:
         """
-            Select a random proxy from the list of proxies.
+            Select a proxy from the proxy pool, weighted by health.
 
-            This method checks if there are any available proxies in the internal
-            list. If there are, it randomly selects and returns one proxy. If
-            no proxies are available, it prints a warning message and returns
-            None.
+            Healthy and fast proxies are chosen more often, proxies with an 
+            open circuit breaker are skipped, and the current proxy is only 
+            chosen again when it is the only one.
 
             Returns:
-                Optional[Dict[str, Any]]: A randomly selected proxy represented as a 
-                dictionary, or None if no proxies are available.
+                Optional[str]: The selected proxy ("host:port"), or None if proxies 
+                are not used or none are available.
         """
-        if self.proxies:
-            return random.choice(self.proxies)
-        else:
-            print("No proxies available.")
+        if self.proxy_pool is None:
             return None
 
+        proxy = self.proxy_pool.choose(exclude=self.proxy)
+        if proxy is None:
+            self.logger.error("No proxies available.")
+        return proxy
+
     def start_driver(self) -> None:
         """
-            Initialize the Chrome driver with a Mac OS and desktop user agent.
+            Start the Chrome driver and process all UPC codes.
+
+            This method launches the browser with `launch_driver`, through a 
+            proxy of the proxy pool when proxies are used, and then processes 
+            the UPC codes from the Excel file. Without `browser_fallback` only 
+            the HTTP fetcher is started. The metrics endpoint is started first, 
+            so the browser launch and ZIP code setup are visible on it.
+
+            Returns:
+                None: This method does not return any value.
+        """
+        self.start_metrics_server()
+
+        if self.browser_fallback:
+            self.launch_driver(self.rotate_proxy())
+        else:
+            self.proxy = self.rotate_proxy()
+            self.start_http_fetcher(self.random_desktop_user_agent(), self.proxy)
+
+        # Start process all upc codes with process_upc_code() method
+        self.process_upc_codes()
+
+    def launch_driver(self, proxy: Optional[str] = None) -> None:
+        """
+            Launch the active browser and start warming the spare browsers.
+
+            The browser is created by `create_browser` through the driver 
+            manager, which keeps `spare_browsers` warm spares ready in the 
+            background so a dead, blocked or worn out browser can be replaced 
+            right away.
+
+            Args:
+                proxy (Optional[str]): The proxy ("host:port") the browser and the HTTP 
+                                    fetcher should use. Default is None (no proxy).
 
-            This method configures and starts the Chrome driver for web scraping. 
+            Returns:
+                None: This method does not return any value.
+        """
+        self.use_browser(self.driver_manager.start(proxy))
+
+    def create_browser(self, proxy: Optional[str] = None) -> ManagedDriver:
+        """
+            Initialize a Chrome driver with a Mac OS and desktop user agent.
+
+            This method configures and starts a Chrome driver for web scraping. 
             It randomly selects a user agent string that indicates a Mac OS desktop 
             environment, ensuring it does not include any mobile or tablet identifiers.
-            The method also sets a default zip code for Amazon and prepares to process 
-            UPC codes.
+            With `lean_profile`, images, fonts, media and ad hosts are blocked 
+            before the first page is loaded. The method also sets the delivery zip code for Amazon, from the 
+            saved session when there is a valid one and otherwise through the 
+            'Deliver to' popover; when that option is missing, the browser is 
+            relaunched, up to three times.
 
-            The method will run indefinitely until a valid user agent is found. 
-            Once a valid user agent is selected, the Chrome driver is launched with 
-            the specified user agent, and the window is maximized.
+            It does not touch the active browser, so the driver manager can 
+            call it in the background to prepare spare browsers.
+
+            Args:
+                proxy (Optional[str]): The proxy ("host:port") the browser should use. 
+                                    Default is None (no proxy).
 
             Returns:
-                None: This method does not return any value.
+                ManagedDriver: The launched browser with its proxy and user agent.
+        """
+        for attempt in range(3):
+            user_agent_string = self.random_desktop_user_agent()
+            self.logger.info(f"We are using user agent: {user_agent_string}")
+
+            options = uc.ChromeOptions()
+            options.add_argument(f'--user-agent={user_agent_string}')
+            options.page_load_strategy = self.page_load_strategy
+
+            if proxy:
+                self.logger.info(f"We are using proxy: {proxy}")
+                options.add_argument(f'--proxy-server={proxy}')
+
+            driver = uc.Chrome(options=options)
+            driver.maximize_window()
+
+            if self.lean_profile:
+                apply_lean_profile(driver, allowlist=self.lean_allowlist)
+
+            # Set the zip code to amazon
+            with self.time_stage("restore_session"):
+                zip_code_set = self.restore_session(driver)
+            if not zip_code_set:
+                with self.time_stage("set_zip_code"):
+                    zip_code_set = self.set_zip_code(self.zip_code, driver)
+
+            if zip_code_set or attempt == 2:
+                return ManagedDriver(driver=driver, proxy=proxy, user_agent=user_agent_string)
+
+            driver.quit()
+
+    def random_desktop_user_agent(self) -> str:
+        """
+            Return a random Mac OS desktop user agent.
+
+            Returns:
+                str: A user agent without mobile or tablet identifiers.
         """
         while True:
             user_agent_string = self.user_agent.random
             # Ensure user agent contains Mac OS and is for a desktop (no 'Mobile' or 'Tablet')
             if "Macintosh" in user_agent_string and "Mobile" not in user_agent_string and "Tablet" not in user_agent_string:
-                break
-            
-        self.logger.info(f"We are using user agent: {user_agent_string}")
+                return user_agent_string
 
-        options = uc.ChromeOptions()
-        options.add_argument(f'--user-agent={user_agent_string}')
-        
-        # proxy = self.rotate_proxy()
-        # print(f"We are using proxy: {proxy}\n\n")
-        # if proxy:
-            # options.add_argument(f'--proxy-server={proxy}')
+    def use_browser(self, browser: ManagedDriver) -> None:
+        """
+            Make a browser the active one.
+
+            Args:
+                browser (ManagedDriver): The browser from the driver manager.
 
-        self.driver = uc.Chrome(options=options)
-        self.driver.maximize_window()
+            Returns:
+                None
+        """
+        self.driver = browser.driver
+        self.proxy = browser.proxy
         self.wait = WebDriverWait(self.driver, 3)
+        self.readiness.driver = self.driver
 
-        # Set the zip code to amazon
-        self.set_zip_code("10001")
+        if self.fetch_mode == "http":
+            self.start_http_fetcher(browser.user_agent, browser.proxy)
 
-        # Start process all upc codes with process_upc_code() method
-        self.process_upc_codes()
+    def replace_driver(self, reason: str, avoid_proxy: Optional[str] = None) -> None:
+        """
+            Swap the active browser for a warm spare browser.
 
-    def close_driver(self) -> None:
-        """Close the Chrome driver."""
-        if self.driver:
-            self.driver.quit()
-            time.sleep(2)
-            self.start_driver()
-    
-    def read_excel(self, last_upc: Optional[str]) -> Optional[pd.DataFrame]:
-        """
-            Read data from an Excel file and return a DataFrame based on the last UPC.
-
-            This method checks if the specified Excel file exists. If it does, 
-            it reads the content into a DataFrame, ensuring that the UPC codes are 
-            treated as strings. If a last UPC code is provided, it searches for 
-            this UPC in the DataFrame. If found, it returns all rows starting 
-            from the next UPC code. If the last UPC is not found or if it is 
-            None, the method logs the appropriate message and returns either 
-            the entire DataFrame or an empty DataFrame if no UPC codes are 
-            available.
-
-            Args:
-                last_upc (Optional[str]): The last UPC code to search for in the DataFrame. 
-                                        It should be provided as a string. If None, the 
-                                        entire DataFrame will be returned.
-
-            Returns:
-                Optional[pd.DataFrame]: A DataFrame containing the data from the Excel file. 
-                                        If the file does not exist, it returns None. If the 
-                                        last UPC is found, it returns the DataFrame sliced 
-                                        from the next index; otherwise, it may return the 
-                                        entire DataFrame or an empty DataFrame.
-        """
-        if os.path.exists(self.excel_file_path):
-            df = pd.read_excel(self.excel_file_path, dtype={'upc_code': str})
-            # df = pd.read_excel(self.excel_file_path)
-            print("DF: ", df)
-
-            if last_upc is not None:
-                # Convert last_upc to an integer
-                target_upc_code = int(last_upc)  # The UPC code you are looking for
-                index = df.index[df['upc_code'] == target_upc_code]
-
-                if not index.empty:
-                    # Get the next index if it exists
-                    next_index = index[0] + 1
-                    if next_index < len(df):
-                        # Slice the DataFrame from the next index
-                        df_from_target = df.loc[next_index:]
-                        print("DataFrame starting from the next UPC code:")
-                        print(df_from_target)
-                        return df_from_target
-                    else:
-                        self.logger.info(f"No more UPC codes available after the specified UPC")
-                        return df.iloc[0:0]  # Return an empty DataFrame
-                else:
-                    self.logger.info(f"UPC code {target_upc_code} not found.")
-                    return df
-            else:
-                # No last UPC found, return the whole DataFrame
-                self.logger.info("No last UPC code found, returning all data from Excel.")
-                return df
-        else:
-            self.logger.error(f"Excel file not found at: {self.excel_file_path}")
+            Args:
+                reason (str): Why the browser is replaced, for the log.
+                avoid_proxy (Optional[str]): A proxy the new browser should not use. 
+                                            Default is None.
+
+            Returns:
+                None
+        """
+        self.retries.inc(kind="browser_replaced")
+        self.use_browser(self.driver_manager.replace(reason, avoid_proxy))
+
+    def start_http_fetcher(self, user_agent_string: str, proxy: Optional[str] = None) -> None:
+        """
+            Create the HTTP fetcher with the browser's user agent and cookies.
+
+            The cookies of the browser session carry the delivery ZIP code set 
+            by `set_zip_code`, so pages downloaded over HTTP show the same 
+            location as pages rendered in Chrome. Without a browser, the saved 
+            session of the ZIP code is used when there is one.
+
+            Args:
+                user_agent_string (str): The user agent used by the browser.
+                proxy (Optional[str]): The proxy used by the browser. Default is None.
+
+            Returns:
+                None
+        """
+        if self.http_fetcher is not None:
+            self.http_fetcher.close()
+
+        self.http_fetcher = HttpFetcher(user_agent_string, proxy=proxy, scheduler=self.request_scheduler)
+        if self.driver is not None:
+            self.http_fetcher.load_cookies(self.driver.get_cookies())
+        elif self.session_store is not None:
+            cookies = self.session_store.load(self.zip_code)
+            if cookies:
+                self.http_fetcher.load_cookies(cookies)
+
+    def fetch_page(self, url: str) -> Optional[FetchedPage]:
+        """
+            Get a page from the page cache, or download it over HTTP in "http" mode.
+
+            Args:
+                url (str): The URL of the page.
+
+            Returns:
+                Optional[FetchedPage]: The cached or downloaded page, or None if the browser 
+                                    has to be used (not cached and browser mode, request 
+                                    failed or blocked).
+        """
+        return self.fetch_pages([url])[0]
+
+    def fetch_pages(self, urls: List[str]) -> List[Optional[FetchedPage]]:
+        """
+            Get several pages from the page cache or download them concurrently.
+
+            Cached pages are returned without any network access. In "http" mode 
+            the remaining pages are downloaded at the same time and added to the 
+            cache.
+
+            Args:
+                urls (List[str]): The URLs of the pages.
+
+            Returns:
+                List[Optional[FetchedPage]]: The pages in the order of `urls`. An entry is 
+                                            None if that page has to be opened in the browser.
+        """
+        pages = [self.get_cached_page(url) for url in urls]
+        cached = sum(page is not None for page in pages)
+        if cached:
+            self.page_loads.inc(cached, source="cache")
+
+        if self.fetch_mode != "http" or self.http_fetcher is None:
+            return pages
+
+        missing = [index for index, page in enumerate(pages) if page is None]
+        if not missing:
+            return pages
+
+        blocked_before = self.http_fetcher.blocked_count
+        failed_before = self.http_fetcher.failed_count
+        start = time.monotonic()
+        downloaded = fetch_pages_concurrently(
+            self.http_fetcher, [urls[index] for index in missing], self.detail_concurrency, self.detail_timeout
+        )
+        blocked = self.http_fetcher.blocked_count - blocked_before
+        failed = self.http_fetcher.failed_count - failed_before
+        self.record_proxy_outcomes(downloaded, blocked, failed, time.monotonic() - start)
+        self.page_loads.inc(sum(page is not None for page in downloaded), source="http")
+        if blocked:
+            self.blocks.inc(blocked, source="http")
+        for index, page in zip(missing, downloaded):
+            if page is not None:
+                self.cache_page(urls[index], page.html, page.url)
+            pages[index] = page
+
+        return pages
+
+    def refetch_page(self, url: str) -> Optional[FetchedPage]:
+        """
+            Download a page again when running without the browser.
+
+            The request scheduler makes every retry wait for the backoff of the 
+            block that made the previous download fail.
+
+            Args:
+                url (str): The URL of the page.
+
+            Returns:
+                Optional[FetchedPage]: The page, or None if it failed `max_block_retries` more times.
+        """
+        for attempt in range(self.max_block_retries):
+            self.retries.inc(kind="http_refetch")
+            page = self.fetch_page(url)
+            if page is not None:
+                return page
+
+        self.logger.error(f"The page could not be downloaded without the browser: {url}")
+        return None
+
+    def parse_fetched_page(self, page: FetchedPage, parser: Callable[..., Any], *args: Any) -> Optional[Any]:
+        """
+            Parse a downloaded or cached page, treating HTML that can not be parsed as a missing page.
+
+            Args:
+                page (FetchedPage): The page to parse.
+                parser (Callable[..., Any]): parse_search_page or parse_product_page.
+                *args (Any): Further arguments of the parser after the HTML.
+
+            Returns:
+                Optional[Any]: The parsed page, or None if the HTML is empty or not a document.
+        """
+        try:
+            return parser(page.html, *args)
+        except ValueError as e:
+            self.logger.error(f"The page {page.url} could not be parsed, treating it as missing: {e}")
             return None
 
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        """
+            Record the seconds the body of the `with` statement takes as a pipeline stage.
+
+            Args:
+                stage (str): The name of the stage, for example "search_fetch".
+
+            Returns:
+                Iterator[None]: The context manager.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stage_timings[stage].append(elapsed)
+            self.stage_seconds.observe(elapsed, stage=stage)
+
+    def define_metrics(self) -> None:
+        """
+            Create the histograms and counters of the run in the metrics registry.
+
+            The metrics are kept as attributes, so the hot path records an 
+            event without looking them up by name.
+
+            Returns:
+                None
+        """
+        self.stage_seconds = self.metrics.histogram(
+            "scraper_stage_seconds", "Seconds spent per pipeline stage."
+        )
+        self.page_load_seconds = self.metrics.histogram(
+            "scraper_page_load_seconds", "Seconds until a browser page was ready, per page type."
+        )
+        self.page_loads = self.metrics.counter(
+            "scraper_page_loads_total", "Pages loaded, per source (browser, http or cache)."
+        )
+        self.fields_missing = self.metrics.counter(
+            "scraper_fields_missing_total", "Products saved without a value, per field."
+        )
+        self.blocks = self.metrics.counter(
+            "scraper_blocks_total", "Block pages received from Amazon, per source."
+        )
+        self.retries = self.metrics.counter(
+            "scraper_retries_total", "Pages loaded again, UPC codes processed again and browsers replaced, per kind."
+        )
+        self.bytes_written = self.metrics.counter(
+            "scraper_bytes_written_total", "Bytes written to the output files, per file."
+        )
+        self.upcs = self.metrics.counter(
+            "scraper_upcs_total", "UPC codes processed, per outcome."
+        )
+        self.selector_wait_timeouts = self.metrics.counter(
+            "scraper_selector_wait_timeouts_total", "Selectors waited for in the live DOM until the timeout, per field."
+        )
+
+    def start_metrics_server(self) -> None:
+        """
+            Serve the metrics on the local Prometheus endpoint when `metrics_port` is set.
+
+            Returns:
+                None
+        """
+        if self.metrics_port is None or self.metrics_server is not None:
+            return
+
+        try:
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+        except OSError as e:
+            self.logger.error(f"The metrics endpoint could not be started on port {self.metrics_port}: {e}")
+            return
+        self.metrics_server.start()
+
+    def stop_metrics_server(self) -> None:
+        """Stop the metrics endpoint if it is running."""
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def record_bytes_written(self) -> None:
+        """
+            Count how much the results file and the CSV file grew since they were last measured.
+
+            The files are measured after they were flushed, so the growth is 
+            what actually reached the disk; the write-ahead log of the SQLite 
+            store counts as part of its file.
+
+            Returns:
+                None
+        """
+        file_paths = {"results": [self.results_store.records_file_path, f"{self.results_store.records_file_path}-wal"]}
+        if self.csv_sink:
+            file_paths["csv"] = [self.csv_sink.csv_file_path]
+
+        for file_name, paths in file_paths.items():
+            for path in paths:
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                previous = self.written_sizes.get(path)
+                self.written_sizes[path] = size
+                if previous is not None and size > previous:
+                    self.bytes_written.inc(size - previous, file=file_name)
+
+    def record_proxy_outcomes(
+            self,
+            pages: List[Optional[FetchedPage]],
+            blocked: int,
+            failed: int,
+            elapsed: float
+            ) -> None:
+        """
+            Report the outcome of concurrent HTTP downloads to the proxy pool.
+
+            Downloads that were given up by the local timeout are not reported, 
+            they say nothing about the health of the proxy.
+
+            Args:
+                pages (List[Optional[FetchedPage]]): The downloaded pages, None for a failed, 
+                                                    blocked or timed out download.
+                blocked (int): How many of the downloads were blocked.
+                failed (int): How many of the downloads failed with a network error or 
+                            an error status.
+                elapsed (float): Seconds the downloads took together.
+
+            Returns:
+                None
+        """
+        if self.proxy_pool is None:
+            return
+
+        succeeded = sum(page is not None for page in pages)
+        outcomes = ["success"] * succeeded + ["block"] * blocked + ["failure"] * failed
+        for outcome in outcomes:
+            self.proxy_pool.record(self.proxy, outcome, latency=elapsed)
+
+    def open_in_browser(self, url: str, page_type: str) -> bool:
+        """
+            Load a page in the browser and wait until it is ready.
+
+            A browser that has loaded its page budget is swapped for a warm 
+            spare first, then the request waits for the rate limit of the 
+            current proxy. The time until the page is ready is reported to 
+            the proxy pool, and the outcome to the request scheduler.
+
+            Args:
+                url (str): The URL of the page.
+                page_type (str): The page type to wait for, a key of READINESS_XPATHS.
+
+            Returns:
+                bool: True if the page loaded, False if Amazon blocked it.
+        """
+        if self.driver_manager.budget_used():
+            self.replace_driver("page budget used")
+
+        self.request_scheduler.wait(self.identity)
+
+        self.page_load_started = time.monotonic()
+        self.driver.get(url)
+        self.driver_manager.count_page()
+
+        self.readiness.wait_for(page_type)
+        self.page_load_seconds.observe(time.monotonic() - self.page_load_started, page_type=page_type)
+        self.page_loads.inc(source="browser")
+        active = self.is_page_active(page_type)
+        self.record_page_bytes()
+
+        if active:
+            self.request_scheduler.on_success(self.identity)
+            if self.proxy_pool is not None:
+                self.proxy_pool.record(self.proxy, "success", latency=time.monotonic() - self.page_load_started)
+
+        return active
+
+    def record_extract_time(self, page_type: str) -> None:
+        """
+            Record the time from loading the current page until its data was extracted.
+
+            Args:
+                page_type (str): The page type the page was loaded as.
+
+            Returns:
+                None
+        """
+        self.readiness.record_extract(page_type, time.monotonic() - self.page_load_started)
+
+    def record_page_bytes(self) -> None:
+        """
+            Record how many bytes the current page transferred with its subresources.
+
+            Returns:
+                None
+        """
+        try:
+            self.page_bytes.append(int(self.driver.execute_script(PAGE_BYTES_SCRIPT) or 0))
+        except (WebDriverException, TypeError, ValueError):
+            pass
+
+    def get_cached_page(self, url: str) -> Optional[FetchedPage]:
+        """
+            Return the cached page of a URL for the current ZIP code.
+
+            Args:
+                url (str): The URL of the page.
+
+            Returns:
+                Optional[FetchedPage]: The cached page, or None if caching is disabled or 
+                                    the page is not cached.
+        """
+        if self.page_cache is None:
+            return None
+
+        page = self.page_cache.get(url, self.zip_code)
+        if page is not None:
+            self.record_page(url, page.html)
+        return page
+
+    def cache_page(self, url: str, html: str, final_url: str) -> None:
+        """
+            Store a loaded page in the page cache and the recording, unless it is a block page.
+
+            Args:
+                url (str): The requested URL of the page.
+                html (str): The HTML of the page.
+                final_url (str): The URL of the page after redirects.
+
+            Returns:
+                None
+        """
+        if (self.page_cache is None and self.record_dir is None) or is_block_page(html):
+            return
+
+        if self.page_cache is not None:
+            self.page_cache.put(url, self.zip_code, html, final_url)
+        self.record_page(url, html)
+
+    def record_page(self, url: str, html: str) -> None:
+        """
+            Save a page to the record directory, under the name the replay server looks for.
+
+            Args:
+                url (str): The requested URL of the page.
+                html (str): The HTML of the page.
+
+            Returns:
+                None
+        """
+        if self.record_dir is None:
+            return
+
+        file_path = os.path.join(self.record_dir, page_file_name(url))
+        temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, 'w', encoding='utf-8') as page_file:
+            page_file.write(html)
+        os.replace(temp_file_path, file_path)
+
+    def cache_browser_page(self, url: str) -> None:
+        """
+            Store the page shown in the browser in the page cache.
+
+            The page source is only read from the browser when caching or recording is enabled.
+
+            Args:
+                url (str): The requested URL of the page.
+
+            Returns:
+                None
+        """
+        if self.page_cache is not None or self.record_dir is not None:
+            self.cache_page(url, self.driver.page_source, self.driver.current_url)
+
+    def close_driver(self) -> None:
+        """Close the Chrome driver and the spare browsers."""
+        self.driver_manager.shutdown()
+        self.driver = None
+    
     def get_asin_code(self, url: str) -> str:
         """
             Extract the ASIN code from a given Amazon product URL.
@@ -223,7 +952,7 @@ class AmazonUPCProcessor:
         else:
             return "N/A"
     
-    def is_deliver_to_avaiable(self) -> bool:
+    def is_deliver_to_avaiable(self, driver: Optional[Any] = None) -> bool:
         """
             Check if the 'Deliver to' option is available on the page.
 
@@ -233,11 +962,14 @@ class AmazonUPCProcessor:
             If the button is not found or not clickable, it logs that the option 
             is not available and returns False.
 
+            Args:
+                driver (Optional[Any]): The browser to check. Defaults to the active one.
+
             Returns:
                 bool: True if the 'Deliver to' option is available; False otherwise.
         """
         try:
-            deliver_to_btn_elem = WebDriverWait(self.driver, 10).until(
+            deliver_to_btn_elem = WebDriverWait(driver or self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//a[@id='nav-global-location-popover-link']"))
             )
             self.logger.info("Deliver to option is available!")
@@ -246,7 +978,7 @@ class AmazonUPCProcessor:
             self.logger.error("Deliver to option is not available!")
             return False
 
-    def set_zip_code(self, zip_code: str) -> None:
+    def set_zip_code(self, zip_code: str, driver: Optional[Any] = None) -> bool:
         """
             Set the delivery ZIP code on Amazon using JavaScript injection.
 
@@ -254,208 +986,620 @@ class AmazonUPCProcessor:
             'Deliver to' option is available. If it is, the method uses 
             JavaScript to open the delivery change section, sets the provided 
             ZIP code, and clicks the "Apply" button to confirm the change. 
-            Finally, it clicks the "Continue" button to complete the process. 
-            If the 'Deliver to' option is not available, it closes the driver.
+            Finally, it clicks the "Continue" button to complete the process 
+            and saves the session cookies for the next browsers.
+
+            The waits use their own PageReadiness bound to the given browser, 
+            so spare browsers can be prepared while the active one is working; 
+            the wait times are added to the run's readiness summary.
 
             Args:
                 zip_code (str): The ZIP code to be set for delivery.
+                driver (Optional[Any]): The browser to set the ZIP code in. Defaults to 
+                                        the active one.
 
             Returns:
-                None
+                bool: False if the 'Deliver to' option is not available or setting 
+                the ZIP code failed, so the browser should be relaunched.
         """
+        driver = driver or self.driver
+        readiness = PageReadiness(
+            self.readiness.timeouts, self.readiness.network_idle, require_parsed=self.readiness.require_parsed
+        )
+        readiness.driver = driver
+
         try:
-            self.driver.get("https://www.amazon.com")
-            time.sleep(3)  # Allow page to load
+            driver.get(self.base_url)
+            readiness.wait_for("home")  # Allow page to load
             
             # Controll if Deliver to is not available
-            if self.is_deliver_to_avaiable():
-                time.sleep(2)
-                # Open the delivery change section using JavaScript
-                self.driver.execute_script("""
-                    document.getElementById('nav-global-location-popover-link').click();
-                """)
-                time.sleep(3)
-
-                # Set the ZIP code
-                self.driver.execute_script(f"""
-                    document.getElementById('GLUXZipUpdateInput').value = '{zip_code}';
-                """)
-                time.sleep(3)
-
-                # Click the "Apply" button
-                apply_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//span[@id='GLUXZipUpdate']//input[@aria-labelledby='GLUXZipUpdate-announce']"))
-                )
-                apply_button.click()
-                self.logger.info(f"ZIP code {zip_code} applied successfully!")
-
-                # Click the "Continue" button inside the popup
-                continue_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//input[@id='GLUXConfirmClose']"))
-                )
-                continue_button.click()
-                self.logger.info("Continue button clicked successfully!")
+            if not self.is_deliver_to_avaiable(driver):
+                return False
+
+            # Open the delivery change section using JavaScript
+            driver.execute_script("""
+                document.getElementById('nav-global-location-popover-link').click();
+            """)
+            readiness.wait_for("zip_popover")
+
+            # Set the ZIP code
+            driver.execute_script(f"""
+                document.getElementById('GLUXZipUpdateInput').value = '{zip_code}';
+            """)
+
+            # Click the "Apply" button
+            apply_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, "//span[@id='GLUXZipUpdate']//input[@aria-labelledby='GLUXZipUpdate-announce']"))
+            )
+            apply_button.click()
+            self.logger.info(f"ZIP code {zip_code} applied successfully!")
 
-            else:
-                self.close_driver()
+            # Click the "Continue" button inside the popup
+            continue_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, "//input[@id='GLUXConfirmClose']"))
+            )
+            continue_button.click()
+            self.logger.info("Continue button clicked successfully!")
+
+            if self.session_store is not None:
+                self.session_store.save(zip_code, driver.get_cookies())
+            return True
 
         except Exception:
             self.logger.error(f"An error occurred while setting the ZIP code!")
+            return False
 
-    def get_last_upc(self) -> str:
+        finally:
+            for page_type, timings in readiness.timings.items():
+                self.readiness.timings[page_type].extend(timings)
+            for page_type, count in readiness.timeouts_hit.items():
+                self.readiness.timeouts_hit[page_type] += count
+
+    def restore_session(self, driver: Any) -> bool:
         """
-            Retrieve the last saved UPC code from the JSON file.
+            Restore the saved session of the ZIP code in a browser.
 
-            This method checks if a specified JSON file exists. If it does, 
-            it attempts to load the data and retrieve the last UPC code 
-            from the list of saved entries. If the file does not exist or 
-            if there is an error reading the file, appropriate error 
-            messages are logged.
+            Args:
+                driver (Any): The browser to restore the session in.
 
             Returns:
-                str: The last saved UPC code if available; None if the file 
-                does not exist or if an error occurs.
+                bool: True if the browser uses the ZIP code now, False if no valid 
+                session is saved or Amazon rejected it.
         """
-        json_file_path = os.path.join(os.getcwd(), self.results_file_path)
+        if self.session_store is None:
+            return False
 
-        # Check if the file exists
-        if os.path.exists(json_file_path):
-            with open(json_file_path, 'r') as json_file:
-                try:
-                    data = json.load(json_file)
-                    if data:  # Check if there is data
-                        last_upc = data[-1]["UPC"]  # Get the last UPC from the last dictionary
-                        return last_upc
-                except json.JSONDecodeError:
-                    self.logger.error(f"Error reading JSON file {json_file_path}.")
-        else:
-            self.logger.error(f"JSON file not found at: {json_file_path}")
-        
-        return None
+        try:
+            return self.session_store.restore(driver, self.base_url, self.zip_code)
+        except WebDriverException as e:
+            self.logger.error(f"Restoring the session of ZIP code {self.zip_code} failed: {e}")
+            return False
 
-    def is_page_active(self) -> None:
+    def is_page_active(self, page_type: Optional[str] = None) -> bool:
         """
             Check if the current page is accessible by examining the title.
 
             This method retrieves the title of the current page in the 
             web driver and checks if it starts with the specified text 
-            indicating that access is blocked. If the page is blocked, 
-            it logs an error message and refreshes the page after a brief 
-            pause.
+            indicating that access is blocked. Every block is reported to the 
+            request scheduler, which backs off and lowers the request rate, 
+            and to the proxy pool. When the block opens the circuit of the 
+            current proxy, the browser is swapped for a spare with another 
+            proxy. The page is then loaded again, up to `max_block_retries` 
+            times; a browser that is still blocked after that is replaced.
+
+            Args:
+                page_type (Optional[str]): The page type to wait for after a reload. 
+                                        Default is None (no readiness wait).
 
             Returns:
-                None
+                bool: True if the page is (finally) not blocked.
         """
-        page_title = self.driver.title
+        url = self.driver.current_url
+
+        for attempt in range(self.max_block_retries + 1):
+            # Check if the title starts with the specified text
+            if not self.driver.title.startswith("Sorry!"):
+                return True
 
-        # Check if the title starts with the specified text
-        if page_title.startswith("Sorry!"):
             self.logger.error("!!! We are blocked by Amazon. Please try again later!!!")
-            time.sleep(3)
-            self.driver.refresh()
+            self.blocks.inc(source="browser")
+            self.request_scheduler.on_block(self.identity)
+
+            if self.proxy_pool is not None:
+                self.proxy_pool.record(self.proxy, "block")
+                if self.proxy_pool.is_open(self.proxy):
+                    self.switch_proxy()
+
+            if attempt < self.max_block_retries:
+                self.retries.inc(kind="block_reload")
+                self.request_scheduler.wait(self.identity)
+                self.driver.get(url)
+                if page_type:
+                    self.readiness.wait_for(page_type)
+
+        self.logger.error(f"Still blocked after {self.max_block_retries} retries: {url}")
+        self.replace_driver("still blocked", avoid_proxy=self.proxy)
+        return False
+
+    @property
+    def identity(self) -> str:
+        """The identity the request rate is limited for: the current proxy, or "direct"."""
+        return self.proxy or "direct"
+
+    def switch_proxy(self) -> None:
+        """
+            Swap the browser for a spare that uses another proxy from the proxy pool.
+
+            Returns:
+                None
+        """
+        self.replace_driver("proxy circuit open", avoid_proxy=self.proxy)
+
+    def iter_upc_rows(self) -> Iterator[UpcRow]:
+        """
+            Yield the rows of the input file that still have to be processed.
+
+            The input file (xlsx, CSV or Parquet) is streamed in chunks, so the 
+            first row is available right away regardless of the file size. Rows 
+            that the checkpoint marks as done are skipped, so an interrupted run 
+            continues exactly where it stopped without reading the results.
+
+            Returns:
+                Iterator[UpcRow]: The row ID, the UPC code padded to 12 digits, the 
+                                original UPC code, the Zoro number and the sales price 
+                                of every row.
+        """
+        self.logger.info(f"\n\nrows already processed: {self.checkpoint.completed}")
+
+        if not os.path.exists(self.excel_file_path):
+            self.logger.error(f"Excel file not found at: {self.excel_file_path}")
+            return
+
+        for row in read_upc_rows(self.excel_file_path):
+            if self.checkpoint.is_done(row.row_id):
+                continue
+
+            self.logger.info(f"upc_code_original: {row.upc_code_original}")
+            self.logger.info(f"upc_code: {row.upc_code}, {type(row.upc_code)}")
+
+            yield row
+
+    def seed_checkpoint(self) -> None:
+        """
+            Mark the input rows whose UPC code is already in the results store as done.
+
+            This runs when no checkpoint of the current input file exists: on 
+            the first run with checkpoints, or after the input file was edited. 
+            Those rows would otherwise be scraped again, only for the results 
+            store to drop their records as duplicates.
+
+            Returns:
+                None
+        """
+        if self.results_store.last_upc is None or not os.path.exists(self.excel_file_path):
+            return
+
+        for row in read_upc_rows(self.excel_file_path):
+            if self.results_store.contains_upc(row.upc_code_original):
+                self.checkpoint.mark_done(row.row_id, save=False)
+
+        self.checkpoint.save()
+        self.logger.info(f"Checkpoint seeded from the results: {self.checkpoint.completed} rows are done.")
+
+    def complete_row(self, row_id: int) -> None:
+        """
+            Mark an Excel row as processed.
+
+            The row is marked in memory; every `checkpoint_every` rows the 
+            results are synced to disk and the checkpoint is saved right after, 
+            so the checkpoint never marks a row whose results are not on disk.
+
+            Args:
+                row_id (int): The ID (position) of the row in the Excel file.
+
+            Returns:
+                None
+        """
+        self.checkpoint.mark_done(row_id, save=False)
+        self.rows_since_flush += 1
+        if self.rows_since_flush >= self.checkpoint_every:
+            self.flush_progress()
+
+    def flush_progress(self) -> None:
+        """
+            Sync the results to disk, then save the checkpoint of the finished rows.
+
+            Returns:
+                None
+        """
+        self.results_store.flush()
+        self.checkpoint.save()
+        self.rows_since_flush = 0
+        self.record_bytes_written()
+
+    def export_results(self) -> None:
+        """
+            Export the stored records as a JSON array and, when `columnar_file` 
+            is set, to a typed Parquet/Arrow file. The CSV file is already 
+            written while the rows are processed, so it is only flushed.
+
+            Returns:
+                None
+        """
+        self.flush_progress()
+        self.results_store.export_json()
+        if self.csv_sink:
+            self.csv_sink.flush()
+        self.record_bytes_written()
+        if self.columnar_file:
+            write_records_to_columnar(self.results_store.iter_records(), self.columnar_file)
+
+    def store_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+            Save product details to the results store and append the new ones to the CSV file.
+
+            The results store skips UPCs that are already saved, so only the 
+            records of new UPCs are passed on to the CSV sink.
+
+            Args:
+                records (List[Dict[str, Any]]): The product details to save.
+
+            Returns:
+                int: The number of records that were saved.
+        """
+        if self.csv_sink:
+            records = [item for item in records if not self.results_store.contains_upc(item.get("UPC"))]
+
+        written = self.results_store.append_many(records)
+        if self.csv_sink and written:
+            self.csv_sink.append_many(records)
+
+        return written
+
+    def close_results(self) -> None:
+        """
+            Close the results store and the CSV file.
+
+            Returns:
+                None
+        """
+        self.results_store.close()
+        if self.csv_sink:
+            self.csv_sink.close()
+
+    def log_run_summary(self) -> None:
+        """
+            Log a summary of the run: how long the page readiness waits took, 
+            how many pages were served from the page cache, how many page 
+            loads the ASIN memo saved, how healthy the proxies were and which 
+            selectors never matched. The proxy scores and selector statistics are 
+            saved for the next run with `save_run_stats`, and the metrics summary 
+            is written to `metrics_file`.
+
+            Returns:
+                None
+        """
+        for page_type, stats in self.readiness.summary().items():
+            self.logger.info(f"Readiness of {page_type} pages: {stats}")
+
+        if self.page_cache is not None:
+            self.logger.info(
+                f"Page cache: {self.page_cache.hits} hits, {self.page_cache.misses} misses, "
+                f"hit ratio {self.page_cache.hit_ratio:.1%}"
+            )
+
+        self.logger.info(
+            f"ASIN memo: {len(self.asin_memo)} products scraped, {self.page_loads_saved} page loads saved"
+        )
+
+        if self.search_mode == "quick":
+            self.logger.info(f"Quick search mode: {self.cards_used} products read from search cards")
+
+        if self.page_bytes:
+            self.logger.info(
+                f"Browser pages: {len(self.page_bytes)} loaded, "
+                f"{sum(self.page_bytes) / len(self.page_bytes) / 1024:.0f} KB transferred per page"
+            )
+
+        for identity, stats in self.request_scheduler.summary().items():
+            self.logger.info(f"Request rate of {identity}: {stats}")
+
+        if self.session_store is not None:
+            self.logger.info(
+                f"ZIP code sessions: {self.session_store.restored} restored, {self.session_store.rejected} rejected"
+            )
+
+        if self.proxy_pool is not None:
+            for proxy, stats in self.proxy_pool.summary().items():
+                self.logger.info(f"Proxy {proxy}: {stats}")
+
+        for field_name, selectors in self.selector_registry.never_matched().items():
+            for selector in selectors:
+                self.logger.error(f"The {field_name} selector never matched: {selector}")
+        self.save_run_stats()
+
+        for labels, stats in self.stage_seconds.summary().items():
+            self.logger.info(f"Stage timings ({labels}): {stats}")
+        self.metrics.write_summary(self.metrics_file)
+
+    def save_run_stats(self) -> None:
+        """
+            Save the proxy scores and selector statistics for the next run.
+
+            Returns:
+                None
+        """
+        if self.proxy_pool is not None:
+            self.proxy_pool.save()
+        self.selector_registry.save()
 
     def process_upc_codes(self) -> None:
         """
             Process UPC codes by reading from an Excel file, searching on Amazon, and collecting product details.
 
             This method performs the following steps:
-            1. Reads the last saved UPC code from a JSON file.
-            2. Reads UPC codes from an Excel file starting from the last saved UPC.
+            1. Loads the checkpoint with the rows that are already processed.
+            2. Reads UPC codes from an Excel file, skipping the processed rows.
             3. Constructs Amazon search URLs for each UPC code and retrieves product details.
-            4. Collects product information and saves it to a JSON file.
-            5. Saves the collected data to a CSV file.
+            4. Collects product information, saves it to the results store and marks the row as done.
+            5. Exports the collected data to JSON; the CSV file is written along the way.
 
             Returns:
                 None
         """
-        last_upc = self.get_last_upc()
-        self.logger.info(f"\n\nlast_upc: {last_upc}")
-
-        # Step 2: Read from the Excel file
-        df = self.read_excel(last_upc)
-
-        # Step 3: Process each UPC code from the DataFrame
-        if df is not None and not df.empty:
-            # Determine the starting index
-            if last_upc is None:
-                start_index = 0  # Start from the first row
-            else:
-                # Find the index of the last UPC code
-                start_index = df[df['upc_code'].astype(str).str.zfill(12) == last_upc].index
-                if not start_index.empty:
-                    start_index = start_index[0] + 1  # Start from the next row
-                else:
-                    start_index = 0  # If last_upc not found, start from the first row
-
-            # Process from the determined start index
-            for index in range(start_index, len(df)):
-                row = df.iloc[index]
-                upc_code_original = row['upc_code']
-                zoro_no = row['zoro_no']
-                upc_code = str(row['upc_code']).zfill(12)
-                sales_price = row['sales_price']
-
-                self.logger.info(f"upc_code_original: {upc_code_original}")
-                self.logger.info(f"upc_code: {upc_code}, {type(upc_code)}")
-
-                # Construct Amazon search URL with the upc_code
-                search_url = f"https://www.amazon.com/s?k={upc_code}"
-                self.logger.info(f"\n\nsearch_url: {search_url}")
-
-                # Navigate to the search URL
-                self.driver.get(search_url)
-
-                self.is_page_active()
-                time.sleep(5)
-
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.XPATH, "//span[normalize-space()='No results for']")))
-                    self.logger.error(f"We don't have products for UPC code: {upc_code}")
-
-                    # Collect the details in a dictionary
-                    product_detail = {
-                        "UPC": upc_code_original,
-                        "Zoro_No": zoro_no,
-                        "url": self.driver.current_url,
-                        "ASIN": "N/A",
-                        "BSR": "N/A",
-                        "Price": "N/A",
-                        "Price difference": "N/A",
-                        "First Category": "N/A",
-                        "Seller": "N/A"
-                    }
-
-                    # Append the product detail to the list
-                    self.product_details.append(product_detail)
-
-                    # Save details to JSON file
-                    self.save_details_to_json()
-
-                except Exception:
-                    self.logger.info(f"We have some products for UPC code: {upc_code}!")
-
-                try:
-                    all_upc_products = self.wait.until(
-                        EC.presence_of_all_elements_located((By.XPATH, "//*[contains(@class, 'puis-card-border')]"))
-                    )
-                    products_href = []
-                    for product in all_upc_products:
-                        href_elem = product.find_element(By.XPATH, ".//h2//a")
-                        href = href_elem.get_attribute("href")
-                        products_href.append(href)
-
-                    self.get_details_of_products(products_href, upc_code_original, zoro_no, sales_price)
-
-                except:
-                    pass
+        for row_id, upc_code, upc_code_original, zoro_no, sales_price in self.iter_upc_rows():
+            if self.process_row(upc_code, upc_code_original, zoro_no, sales_price):
+                self.complete_row(row_id)
         
-        # Call the function to save JSON data to CSV
-        time.sleep(3)
-        save_json_to_csv(self.results_file_path, 'src/csv/03_amazon_data.csv')
+        # Export the stored records as a JSON array and flush the CSV file
+        self.export_results()
+        self.log_run_summary()
 
-        # In the end stop the driver
+        # In the end stop the driver and the metrics endpoint
         self.close_driver()
+        self.stop_metrics_server()
+
+    def process_row(self, upc_code: str, upc_code_original: str, zoro_no: str, sales_price: float) -> bool:
+        """
+            Process one UPC code, replacing the browser if it dies on the way.
+
+            When the browser fails, the collected details of the UPC are 
+            dropped, the browser is swapped for a warm spare and the UPC is 
+            processed once more.
+
+            Args:
+                upc_code (str): The UPC code padded to 12 digits.
+                upc_code_original (str): The UPC code as written in the Excel file.
+                zoro_no (str): The Zoro number of the product.
+                sales_price (float): The Zoro sales price of the product.
+
+            Returns:
+                bool: True if the UPC code was processed, False if the browser failed twice 
+                    or a page stayed blocked (or could not be downloaded without the 
+                    browser); the row is then left for the next run.
+        """
+        for attempt in range(2):
+            try:
+                with self.time_stage("upc"):
+                    processed = self.process_upc(upc_code, upc_code_original, zoro_no, sales_price)
+                self.upcs.inc(outcome="processed" if processed else "skipped")
+                return processed
+            except WebDriverException as e:
+                self.logger.error(f"The browser failed on UPC code {upc_code}: {e}")
+                self.product_details.clear()
+                self.retries.inc(kind="upc")
+                self.replace_driver("browser failed")
+
+        self.upcs.inc(outcome="failed")
+        return False
     
+    def save_no_results(self, url: str, upc_code_original: str, zoro_no: str) -> None:
+        """
+            Save an "N/A" record for a UPC code that has no products on Amazon.
+
+            Args:
+                url (str): The URL of the search page.
+                upc_code_original (str): The UPC code as read from the Excel file.
+                zoro_no (str): The Zoro number for the product.
+
+            Returns:
+                None
+        """
+        # Collect the details in a dictionary
+        product_detail = {
+            "UPC": upc_code_original,
+            "Zoro_No": zoro_no,
+            "url": url,
+            "ASIN": "N/A",
+            "BSR": "N/A",
+            "Price": "N/A",
+            "Price difference": "N/A",
+            "First Category": "N/A",
+            "Seller": "N/A"
+        }
+
+        # Append the product detail to the list
+        self.product_details.append(product_detail)
+
+        # Save details to JSON file
+        self.save_details_to_json()
+
+    def process_upc(self, upc_code: str, upc_code_original: str, zoro_no: str, sales_price: str) -> bool:
+        """
+            Search one UPC code on Amazon and collect the details of the products found.
+
+            In "http" mode the search page is downloaded and parsed without the 
+            browser. The browser is used when the HTTP request fails, Amazon 
+            answers with a block page or the page can not be parsed, and always 
+            in "browser" mode. In the "js" extraction mode the browser page is 
+            read with a single script call. In the "quick" search mode the 
+            products are read from the search result cards.
+
+            Args:
+                upc_code (str): The UPC code padded to 12 digits, used for the search.
+                upc_code_original (str): The UPC code as read from the Excel file.
+                zoro_no (str): The Zoro number for the product.
+                sales_price (str): The sales price for comparison to the found price.
+
+            Returns:
+                bool: False if the UPC code has to be processed again: a search or product 
+                    page was still blocked after its retries, or could not be downloaded 
+                    or parsed without the browser. Nothing of the UPC code is saved then.
+        """
+        # Construct Amazon search URL with the upc_code
+        search_url = f"{self.base_url}/s?k={upc_code}"
+        self.logger.info(f"\n\nsearch_url: {search_url}")
+
+        with self.time_stage("search_fetch"):
+            page = self.fetch_page(search_url)
+            if page is None and not self.browser_fallback:
+                page = self.refetch_page(search_url)
+                if page is None:
+                    return False
+
+        if page is not None:
+            with self.time_stage("search_parse"):
+                search_data = self.parse_fetched_page(page, parse_search_page, page.url)
+            if search_data is not None:
+                return self.handle_search_data(search_data, page.url, upc_code, upc_code_original, zoro_no, sales_price)
+            if not self.browser_fallback:
+                return False
+
+        # Navigate to the search URL, the readiness wait returns once the results or "No results" exist
+        with self.time_stage("search_fetch"):
+            if not self.open_in_browser(search_url, "search"):
+                self.logger.error(f"The search page is blocked, UPC code {upc_code} is left for the next run.")
+                return False
+            self.cache_browser_page(search_url)
+
+        if self.extraction_mode == "js":
+            try:
+                with self.time_stage("search_parse"):
+                    search_data, page_url = extract_search_page(self.driver)
+            except (WebDriverException, ValueError) as e:
+                self.logger.error(f"The extraction script failed, reading the search page element by element: {e}")
+            else:
+                self.record_extract_time("search")
+                return self.handle_search_data(search_data, page_url, upc_code, upc_code_original, zoro_no, sales_price)
+
+        if self.search_mode == "quick":
+            with self.time_stage("search_parse"):
+                search_data = parse_search_page(self.driver.page_source, self.driver.current_url)
+            self.record_extract_time("search")
+            return self.handle_search_data(
+                search_data, self.driver.current_url, upc_code, upc_code_original, zoro_no, sales_price
+            )
+
+        if self.driver.find_elements(By.XPATH, "//span[normalize-space()='No results for']"):
+            self.logger.error(f"We don't have products for UPC code: {upc_code}")
+            self.save_no_results(self.driver.current_url, upc_code_original, zoro_no)
+        else:
+            self.logger.info(f"We have some products for UPC code: {upc_code}!")
+
+        try:
+            all_upc_products = self.driver.find_elements(By.XPATH, "//*[contains(@class, 'puis-card-border')]")
+            products_href = []
+            for product in all_upc_products:
+                href_elem = product.find_element(By.XPATH, ".//h2//a")
+                href = href_elem.get_attribute("href")
+                products_href.append(href)
+            self.record_extract_time("search")
+
+            if products_href:
+                return self.get_details_of_products(products_href, upc_code_original, zoro_no, sales_price)
+
+        except:
+            pass
+
+        return True
+
+    def handle_search_data(
+            self,
+            search_data: SearchPageData,
+            url: str,
+            upc_code: str,
+            upc_code_original: str,
+            zoro_no: str,
+            sales_price: str
+            ) -> bool:
+        """
+            Save the products of a parsed search page.
+
+            Args:
+                search_data (SearchPageData): The parsed search page.
+                url (str): The URL of the search page.
+                upc_code (str): The UPC code padded to 12 digits.
+                upc_code_original (str): The UPC code as read from the Excel file.
+                zoro_no (str): The Zoro number for the product.
+                sales_price (str): The sales price for comparison to the found price.
+
+            Returns:
+                bool: False if a product page was blocked and the UPC code has to be 
+                    processed again.
+        """
+        if search_data.no_results:
+            self.logger.error(f"We don't have products for UPC code: {upc_code}")
+            self.save_no_results(url, upc_code_original, zoro_no)
+        elif self.search_mode == "quick" and search_data.cards:
+            self.logger.info(f"We have some products for UPC code: {upc_code}!")
+            return self.get_details_from_cards(search_data.cards, upc_code_original, zoro_no, sales_price)
+        elif search_data.product_urls:
+            self.logger.info(f"We have some products for UPC code: {upc_code}!")
+            return self.get_details_of_products(search_data.product_urls, upc_code_original, zoro_no, sales_price)
+
+        return True
+
+    def get_details_from_cards(
+            self,
+            cards: List[SearchCard],
+            upc_code: str,
+            zoro_no: str,
+            sales_price: str
+            ) -> bool:
+        """
+            Collect product details from search result cards without opening the products.
+
+            Cards that show a price are saved with their ASIN and price; seller, 
+            BSR and category are "N/A". The product pages of cards without a 
+            price are loaded like in the full search mode.
+
+            Args:
+                cards (List[SearchCard]): The search result cards.
+                upc_code (str): The UPC code associated with the product.
+                zoro_no (str): The Zoro number for the product.
+                sales_price (str): The sales price for comparison to the found price.
+
+            Returns:
+                bool: False if a product page was blocked and the UPC code has to be 
+                    processed again.
+        """
+        urls_without_price = []
+        for card in cards:
+            if card.price == "N/A":
+                urls_without_price.append(card.url)
+                continue
+
+            self.product_details.append({
+                "UPC": upc_code,
+                "Zoro_No": zoro_no,
+                "url": card.url,
+                "ASIN": card.asin if card.asin != "N/A" else self.get_asin_code(card.url),
+                "BSR": "N/A",
+                "Price": card.price,
+                "Price difference": get_price_difference(card.price, sales_price),
+                "First Category": "N/A",
+                "Seller": "N/A"
+            })
+            self.cards_used += 1
+
+        if urls_without_price:
+            # Saves the card details together with the loaded products
+            return self.get_details_of_products(urls_without_price, upc_code, zoro_no, sales_price)
+
+        self.save_details_to_json()
+        return True
+
     def get_first_category(self, parent_text: str) -> str:
         """
             Extract the first category from the given text.
@@ -469,12 +1613,7 @@ class AmazonUPCProcessor:
             Returns:
                 str: The extracted category if found; otherwise, returns None.
         """
-        match = re.search(r'in\s+([A-Za-z\s&]+)\s*(?:\(|$)', parent_text)
-        
-        if match:
-            return match.group(1).strip()  # Return the category
-        else:
-            return None
+        return get_first_category(parent_text)
 
     def get_bsr_number(self, bsr_text: str) -> str:
         """
@@ -489,21 +1628,21 @@ class AmazonUPCProcessor:
             Returns:
                 str: The extracted BSR number if found; otherwise, returns None.
         """
-        match = re.search(r'#([\d,]+)', bsr_text)
-        return match.group(1) if match else None
+        return get_bsr_number(bsr_text)
         
     def extract_bsr_and_first_category(self) -> Tuple[Union[str, None], Union[str, None]]:
         """
             Extract the Best Seller Rank (BSR) number and the first category from the item details.
 
-            This method attempts to find the Best Seller Rank and its corresponding category
-            from the item details section on an Amazon product page. It performs two attempts 
-            to locate the relevant information using different XPaths. If successful, it 
-            returns the BSR number and first category. If not found, it returns "N/A".
+            This method opens the "Item details" section if it is collapsed and 
+            looks for the Best Sellers Rank in the product details table and in 
+            the detail bullets. If successful, it returns the BSR number and 
+            first category. If not found, it returns "N/A".
 
             Returns:
                 Tuple[Union[str, None], Union[str, None]]: A tuple containing the BSR number and
-                first category. Both values will be "N/A" if not found, or None in case of an error.
+                first category. Both values will be "N/A" if not found, or None if the text
+                has no number or category.
         """
         try:
             WebDriverWait(self.driver, 3).until(
@@ -513,53 +1652,211 @@ class AmazonUPCProcessor:
         except:
             self.logger.info(f"Item Detail Table is not present!")
 
+        best_seller_text = self.find_field_in_dom("bsr", BSR_XPATHS, lambda text: text is not None)
+        if best_seller_text is None:
+            self.logger.error(f"Getting the bsr failed.")
+            return "N/A", "N/A"
+
+        bsr_number = self.get_bsr_number(best_seller_text) if best_seller_text else "N/A"
+        first_category = self.get_first_category(best_seller_text) if best_seller_text else "N/A"
+        return bsr_number, first_category
+
+    def find_field_in_dom(self, field_name: str, xpaths: List[str], accept: Callable[[Optional[str]], bool]) -> Optional[str]:
+        """
+            Find the text of a product field in the live DOM.
+
+            All selectors of the field are evaluated at once with one script 
+            call, and the first accepted text in their declared order is used. 
+            Only when none of them matches, the selectors are waited for one 
+            at a time, most successful on the page template first; selectors 
+            that never matched on the template are not waited for.
+
+            Args:
+                field_name (str): The field: "price", "seller" or "bsr".
+                xpaths (List[str]): The XPaths of the field in their declared order.
+                accept (Callable[[Optional[str]], bool]): Returns True for a usable text.
+
+            Returns:
+                Optional[str]: The text of the field, or None if it was not found.
+        """
+        # In "lxml" and "js" mode the hits of this page were already recorded
+        registry = self.selector_registry if self.extraction_mode == "dom" else None
         try:
-            best_seller_th = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, "//th[contains(text(), 'Best Sellers Rank')]"))
-            )
+            texts, self.page_template, _ = probe_fields(self.driver, {field_name: xpaths}, registry)
+            for text in texts[field_name]:
+                if accept(text):
+                    return text
+        except (WebDriverException, ValueError) as e:
+            self.logger.error(f"Probing the {field_name} selectors failed: {e}")
+
+        for xpath in self.selector_registry.ordered(field_name, self.page_template, xpaths, skip_unmatched_after=20):
+            try:
+                text = self.wait.until(EC.presence_of_element_located((By.XPATH, xpath))).text
+            except (TimeoutException, WebDriverException):
+                self.selector_wait_timeouts.inc(field=field_name)
+                continue
 
-            if best_seller_th:
-                best_seller_td = best_seller_th.find_element(By.XPATH, "./following-sibling::td")
-                best_seller_text = best_seller_td.text.strip()
+            if accept(text):
+                return text
+            self.logger.error(f"Invalid {field_name} format: {text}")
 
-                bsr_number = self.get_bsr_number(best_seller_text) if best_seller_text else "N/A"
-                first_category = self.get_first_category(best_seller_text) if best_seller_text else "N/A"
+        return None
+    
+    def get_price_from_dom(self) -> str:
+        """
+            Retrieve the product price from the live DOM.
 
-                return bsr_number, first_category
-        except:
-            self.logger.error(f"First attempt to get bsr failed.")
+            This method first opens the "See All Buying Choices" window and reads 
+            the price from there. If that is not possible, it looks for a numeric 
+            price at the known price XPaths.
 
+            Returns:
+                str: The formatted price if found; otherwise, "N/A".
+        """
         try:
-            best_seller_ranks_elem = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, "//div[@id='detailBulletsWrapper_feature_div']//span[contains(text(), 'Best Sellers Rank')]"))
-            )
+            price_elem = self.driver.find_element(By.CSS_SELECTOR, "#buybox-see-all-buying-choices .a-button-text")
+            price_elem.click()
+            self.readiness.wait_for("offers")
 
-            if best_seller_ranks_elem:
-                parent_element = best_seller_ranks_elem.find_element(By.XPATH, "..")
-                parent_text = parent_element.text.strip()
-                bsr_number = self.get_bsr_number(parent_text) if parent_text else "N/A"
-                first_category = self.get_first_category(parent_text) if parent_text else "N/A"
-                return bsr_number, first_category
+            price_text = self.driver.find_element(By.CSS_SELECTOR, ".a-section.a-spacing-none.aok-align-center.aok-relative")
+            price_to_format = price_text.text
+            return format_price(price_to_format)
+        except:
+            self.logger.error("We can not get price with clicking right window...")
+
+        price = valid_price(self.find_field_in_dom("price", PRICE_XPATHS, lambda text: valid_price(text) != "N/A"))
+        if price != "N/A":
+            self.logger.info(f"Price found: {price}")
 
+        return price
+
+    def get_seller_from_dom(self) -> str:
+        """
+            Retrieve the seller name from the live DOM.
+
+            Returns:
+                str: The seller name if found; otherwise, "N/A".
+        """
+        seller = self.find_field_in_dom("seller", [SELLER_XPATH], lambda text: text is not None)
+        return seller if seller is not None else "N/A"
+
+    def extract_product_details_from_dom(self) -> ProductPageData:
+        """
+            Extract price, seller, BSR and first category by querying the live DOM.
+
+            Returns:
+                ProductPageData: The extracted product fields.
+        """
+        with self.time_stage("price_lookup"):
+            price = self.get_price_from_dom()
+        with self.time_stage("seller_lookup"):
+            seller = self.get_seller_from_dom()
+
+        try:
+            with self.time_stage("bsr_lookup"):
+                bsr, first_category = self.extract_bsr_and_first_category()
         except:
-            self.logger.error(f"Second attempt to get bsr failed.")
+            bsr = "N/A"
+            first_category = "N/A"
+
+        return ProductPageData(price=price, seller=seller, bsr=bsr, first_category=first_category)
+
+    def extract_product_details(self) -> ProductPageData:
+        """
+            Extract price, seller, BSR and first category from the current product page.
+
+            In "lxml" mode the page source is read once and all fields are parsed 
+            in a single pass. The live DOM is only used as a fallback: for the 
+            price when it is missing from the page source (for example when it is 
+            behind the "See All Buying Choices" window), and for all fields when 
+            the page source can not be parsed.
+
+            Returns:
+                ProductPageData: The extracted product fields.
+        """
+        if self.extraction_mode != "lxml":
+            return self.extract_product_details_from_dom()
+
+        try:
+            product_data = parse_product_page(self.driver.page_source, self.selector_registry)
+        except Exception:
+            self.logger.error("Parsing the page source failed, using the live DOM instead.")
+            return self.extract_product_details_from_dom()
+
+        self.page_template = product_data.template
+        if product_data.price == "N/A":
+            with self.time_stage("price_lookup"):
+                product_data.price = self.get_price_from_dom()
+        else:
+            self.logger.info(f"Price found: {product_data.price}")
+
+        return product_data
+
+    def extract_product_details_with_js(self) -> Tuple[ProductPageData, str]:
+        """
+            Extract price, seller, BSR and first category with a single script call.
+
+            The script returns all fields and the URL of the page as one JSON 
+            payload. Like in "lxml" mode, the live DOM is used for the price when 
+            it is missing, and for all fields when the script fails.
+
+            Returns:
+                Tuple[ProductPageData, str]: The extracted product fields and the URL of the page.
+        """
+        try:
+            product_data, page_url = extract_product_page(self.driver, self.selector_registry)
+        except (WebDriverException, ValueError) as e:
+            self.logger.error(f"The extraction script failed, using the live DOM instead: {e}")
+            return self.extract_product_details_from_dom(), self.driver.current_url
+
+        self.page_template = product_data.template
+        if product_data.price == "N/A":
+            with self.time_stage("price_lookup"):
+                product_data.price = self.get_price_from_dom()
+        else:
+            self.logger.info(f"Price found: {product_data.price}")
+
+        return product_data, page_url
+
+    def remember_product(self, url: str, asin: str, product_data: ProductPageData) -> None:
+        """
+            Remember the extracted fields of a product for the rest of the run.
+
+            Args:
+                url (str): The final URL of the product page.
+                asin (str): The ASIN of the product; "N/A" is not remembered.
+                product_data (ProductPageData): The extracted product fields.
+
+            Returns:
+                None
+        """
+        if asin != "N/A":
+            self.asin_memo[asin] = (url, product_data)
 
-        return "N/A"
-    
     def get_details_of_products(
             self, 
             urls: list[str], 
             upc_code: str, 
             zoro_no: str, 
             sales_price: str
-            ) -> None:
+            ) -> bool:
         """
             Retrieve details of products from Amazon using the provided URLs.
 
             This method navigates to each product URL, attempts to retrieve 
             the product's price, seller information, Best Sellers Rank (BSR), 
             and the first category. If successful, it compiles this data into 
-            a dictionary and appends it to the product details list.
+            a dictionary and appends it to the product details list. In "http" 
+            mode all pages are downloaded concurrently and parsed without the 
+            browser, which is only used for pages that could not be downloaded 
+            or parsed. 
+            Products whose ASIN was already scraped in this run are not loaded 
+            again: their price, BSR, seller and category are reused and only the 
+            price difference is computed for this UPC. The details are collected 
+            in the order of the URLs. When a product page is still blocked after 
+            its retries (or can not be downloaded or parsed without the browser), the 
+            details of the UPC are dropped instead of saving the page the browser 
+            ended up on, so the UPC is processed again later.
 
             Args:
                 urls (list[str]): A list of product URLs to retrieve details from.
@@ -568,74 +1865,73 @@ class AmazonUPCProcessor:
                 sales_price (str): The sales price for comparison to the found price.
 
             Returns:
-                None
+                bool: True if the details were saved, False if a product page was blocked.
         """
+        # Products already scraped in this run are not loaded again
+        urls_to_load = []
+        asins_to_load = set()
         for url in urls:
-            self.driver.get(url)
-            self.is_page_active()
-            time.sleep(1)
-            url = self.driver.current_url
             asin = self.get_asin_code(url)
-            
-            price_found = False
-            try:
-                price_elem = self.driver.find_element(By.CSS_SELECTOR, "#buybox-see-all-buying-choices .a-button-text")
-                price_elem.click()
-                time.sleep(3)
-
-                price_text = self.driver.find_element(By.CSS_SELECTOR, ".a-section.a-spacing-none.aok-align-center.aok-relative")
-                price_to_format = price_text.text
-                price = format_price(price_to_format)
-
-                price_found = True
-            except:
-                self.logger.error("We can not get price with clicking right window...")
-
-            if not price_found:
-                price_xpaths = [
-                    "(//div[@class='a-spacing-top-mini']/span)[1]",
-                    "(//span[@class='a-price aok-align-center reinventPricePriceToPayMargin priceToPay'])[1]",
-                    "(//div[@class='a-section a-spacing-micro']/span)[1]",
-                    "(//div[@class='a-section a-spacing-none aok-align-center aok-relative']/span)[1]",
-                    "//span[@id='kindle-price']",
-                    "(//span[@class='slot-price']/span)[1]",
-                    "//span[contains(text(),'Buy')]",
-                    "//*[(@id = 'tvod-btn-ab-movie-hd-tvod_purchase')]//*[contains(concat( " ", @class, " " ), concat( " ", '_36qUej', " " ))]"
-                ]
-                for price_xpath in price_xpaths:
-                    try:
-                        price_elem = self.wait.until(
-                            EC.presence_of_element_located((By.XPATH, price_xpath))
-                        )
-                        price_text = price_elem.text
-                        price = format_price(price_text)
-
-                        try:
-                            price_value = float(price)
-                            self.logger.info(f"Price found: {price_value}")
-                            break
-                        except ValueError:
-                            self.logger.error(f"Invalid price format: {price}")
-                            price = "N/A" 
-                    except:
-                        price = "N/A"
-            
-            
-            price_difference = get_price_difference(price, sales_price)
+            if asin == "N/A":
+                urls_to_load.append(url)
+            elif asin not in self.asin_memo and asin not in asins_to_load:
+                asins_to_load.add(asin)
+                urls_to_load.append(url)
 
-            try:
-                seller_elem = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.offer-display-feature-text span.offer-display-feature-text-message"))
-                )
-                seller = seller_elem.text
-            except:
-                seller = "N/A"
+        # Cached pages are parsed directly, in "http" mode the others are downloaded at the same time
+        with self.time_stage("product_fetch"):
+            pages = dict(zip(urls_to_load, self.fetch_pages(urls_to_load)))
 
-            try:
-                bsr, first_category = self.extract_bsr_and_first_category()
-            except:
-                bsr = "N/A"
-                first_category = "N/A"
+        for url in urls:
+            search_asin = self.get_asin_code(url)
+            memo = self.asin_memo.get(search_asin)
+            page = pages.get(url)
+            if memo is None and page is None and not self.browser_fallback:
+                with self.time_stage("product_fetch"):
+                    page = self.refetch_page(url)
+                if page is None:
+                    self.product_details.clear()
+                    return False
+
+            product_data = None
+            if memo is not None:
+                url, product_data = memo
+                self.page_loads_saved += 1
+            elif page is not None:
+                with self.time_stage("product_parse"):
+                    product_data = self.parse_fetched_page(page, parse_product_page, self.selector_registry)
+                if product_data is not None:
+                    url = page.url
+                elif not self.browser_fallback:
+                    self.product_details.clear()
+                    return False
+
+            if product_data is None:
+                with self.time_stage("product_fetch"):
+                    if not self.open_in_browser(url, "product"):
+                        self.logger.error(f"The product page is blocked, UPC code {upc_code} is left for the next run.")
+                        self.product_details.clear()
+                        return False
+                    self.cache_browser_page(url)
+                with self.time_stage("product_parse"):
+                    if self.extraction_mode == "js":
+                        product_data, url = self.extract_product_details_with_js()
+                    else:
+                        url = self.driver.current_url
+                        product_data = self.extract_product_details()
+                self.record_extract_time("product")
+
+            asin = self.get_asin_code(url)
+            if memo is None:
+                self.remember_product(url, asin, product_data)
+                self.remember_product(url, search_asin, product_data)
+
+            for field_name in ("price", "seller", "bsr"):
+                if getattr(product_data, field_name) == "N/A":
+                    self.fields_missing.inc(field=field_name)
+
+            # The price difference depends on the Zoro price of this UPC
+            price_difference = get_price_difference(product_data.price, sales_price)
 
             # Collect the details in a dictionary
             product_detail = {
@@ -643,11 +1939,11 @@ class AmazonUPCProcessor:
                 "Zoro_No": zoro_no,
                 "url": url,
                 "ASIN": asin,
-                "BSR": bsr,
-                "Price": price,
+                "BSR": product_data.bsr,
+                "Price": product_data.price,
                 "Price difference": price_difference,
-                "First Category": first_category,
-                "Seller": seller
+                "First Category": product_data.first_category,
+                "Seller": product_data.seller
             }
 
             # Append the product detail to the list
@@ -655,43 +1951,23 @@ class AmazonUPCProcessor:
 
         # Save details to JSON file
         self.save_details_to_json()
+        return True
 
     def save_details_to_json(self) -> None:
         """
-            Append the product details to an existing JSON file or create a new one.
+            Append the product details to the results store.
 
-            This method checks if a specified JSON file exists. If it does, it 
-            loads the existing data, filters out any duplicate UPCs from the 
-            new product details, and then appends only the unique entries. 
-            Finally, it saves the updated data back to the JSON file.
+            This method appends the collected product details to the 
+            append-only results store, which skips any UPC that is already 
+            saved. Only the new records are written, so the cost of saving 
+            does not grow with the size of the results file. The saved 
+            details are removed from the in-memory list afterwards.
 
             Returns:
                 None
         """
-        json_file_path = os.path.join(os.getcwd(), self.results_file_path)
-        
-        # Check if the file exists
-        if os.path.exists(json_file_path):
-            # Load the existing data
-            with open(json_file_path, 'r') as json_file:
-                try:
-                    existing_data = json.load(json_file)
-                except json.JSONDecodeError:
-                    existing_data = []
-        else:
-            existing_data = []
-
-        # Create a set of existing UPCs to avoid duplicates
-        existing_upcs = {item['UPC'] for item in existing_data}
+        with self.time_stage("save"):
+            written = self.store_records(self.product_details)
+        self.product_details.clear()
 
-        # Filter out duplicates from self.product_details
-        new_data = [item for item in self.product_details if item['UPC'] not in existing_upcs]
-
-        # Append only new data (non-duplicates)
-        existing_data.extend(new_data)
-
-        # Save the updated data back to the JSON file
-        with open(json_file_path, 'w') as json_file:
-            json.dump(existing_data, json_file, indent=4)
-        
-        self.logger.info(f"Details appended to {json_file_path}")
+        self.logger.info(f"{written} details appended to {self.results_store.records_file_path}")
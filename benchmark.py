@@ -0,0 +1,275 @@
+"""
+    benchmark.py
+
+    This module measures the throughput of the scraper offline, against recorded pages.
+
+    The benchmark starts a ReplayServer with the recorded search and product pages
+    (recorded with the `record_dir` argument of AmazonUPCProcessor, or generated with
+    `write_synthetic_recordings`), builds an input file with the UPC codes whose search
+    pages were recorded and runs the full AmazonUPCProcessor pipeline against the server
+    in the "http" fetch mode without a browser. The server can add latency and inject
+    block pages, so the pacing and backoff are part of the measurement. The report has
+    the UPCs and pages per minute and the p50/p95 latency of every pipeline stage. No
+    network access is needed, so throughput regressions can be caught on any machine.
+
+    Functions:
+        write_synthetic_recordings: Generate search and product pages to benchmark with.
+        recorded_upcs: The UPC codes whose search pages were recorded.
+        run_benchmark: Run the scraper against the replay server and measure it.
+        format_report: Format a benchmark result as text.
+
+    Usage:
+        >>> python benchmark.py src/recordings --latency 0.2 --block-rate 0.02
+        >>> python benchmark.py --synthetic 100
+"""
+
+import os
+import csv
+import json
+import time
+import random
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+import numpy as np
+
+from amazon_scraper import AmazonUPCProcessor
+from utils.replay_server import ReplayServer, page_file_name
+
+
+SEARCH_CARD_TEMPLATE = """
+<div data-asin="{asin}" data-component-type="s-search-result">
+    <div class="puis-card-border">
+        <h2><a href="/Synthetic-Product-{asin}/dp/{asin}/ref=sr_1_{position}"><span>Synthetic product {asin}</span></a></h2>
+        <span class="a-price"><span class="a-offscreen">${price:.2f}</span></span>
+    </div>
+</div>
+"""
+
+PRODUCT_PAGE_TEMPLATE = """<html><head><title>Synthetic product {asin}</title></head><body>
+<div id="dp" class="{template} en_US">
+    <div class="a-section a-spacing-micro"><span>${price:.2f}</span></div>
+    <div class="offer-display-feature-text"><span class="offer-display-feature-text-message">Synthetic Seller</span></div>
+    <table><tr><th>Best Sellers Rank</th><td>#{bsr:,} in Tools &amp; Home Improvement (See Top 100)</td></tr></table>
+</div>
+</body></html>"""
+
+NO_RESULTS_PAGE = """<html><head><title>Amazon.com : {upc}</title></head><body>
+<div class="s-main-slot"><span>No results for</span> <span>{upc}</span></div>
+</body></html>"""
+
+
+def write_synthetic_recordings(pages_dir: str, upcs: int = 100, products_per_upc: int = 3, seed: int = 0) -> List[str]:
+    """
+        Generate search and product pages in the layout of the recorded Amazon pages.
+
+        Every tenth UPC has no results. The product pages use two page templates,
+        and products are shared between UPCs like on Amazon, so the ASIN memo is
+        exercised as well.
+
+        Args:
+            pages_dir (str): The directory the pages are written to.
+            upcs (int): Number of UPC codes. Default is 100.
+            products_per_upc (int): Search results per UPC code. Default is 3.
+            seed (int): Seed of the generated prices and ranks. Default is 0.
+
+        Returns:
+            List[str]: The generated UPC codes.
+    """
+    rng = random.Random(seed)
+    os.makedirs(pages_dir, exist_ok=True)
+
+    upc_codes = [f"{index:012d}" for index in range(1, upcs + 1)]
+    asins = [f"B0SYN{index:05d}" for index in range(upcs * products_per_upc // 2 + 1)]
+
+    for index, upc in enumerate(upc_codes):
+        search_url = f"/s?k={upc}"
+        if index % 10 == 9:
+            html = NO_RESULTS_PAGE.format(upc=upc)
+        else:
+            cards = "".join(
+                SEARCH_CARD_TEMPLATE.format(asin=asin, position=position, price=rng.uniform(5, 150))
+                for position, asin in enumerate(rng.sample(asins, products_per_upc), start=1)
+            )
+            html = f"<html><head><title>Amazon.com : {upc}</title></head><body><div class=\"s-main-slot\">{cards}</div></body></html>"
+
+        with open(os.path.join(pages_dir, page_file_name(search_url)), 'w', encoding='utf-8') as page_file:
+            page_file.write(html)
+
+    for index, asin in enumerate(asins):
+        html = PRODUCT_PAGE_TEMPLATE.format(
+            asin=asin, template="hardlines_tools" if index % 2 else "home_garden",
+            price=rng.uniform(5, 150), bsr=rng.randint(1, 500000)
+        )
+        with open(os.path.join(pages_dir, page_file_name(f"/dp/{asin}")), 'w', encoding='utf-8') as page_file:
+            page_file.write(html)
+
+    return upc_codes
+
+
+def recorded_upcs(pages_dir: str) -> List[str]:
+    """
+        Return the UPC codes whose search pages were recorded.
+
+        Args:
+            pages_dir (str): The directory with the recorded pages.
+
+        Returns:
+            List[str]: The UPC codes, sorted.
+    """
+    return sorted(
+        unquote(file_name[len("s_"):-len(".html")])
+        for file_name in os.listdir(pages_dir)
+        if file_name.startswith("s_") and file_name.endswith(".html")
+    )
+
+
+def _percentile_ms(values: List[float], percentile: float) -> Optional[float]:
+    """Return a percentile of durations in milliseconds, or None without durations."""
+    if not values:
+        return None
+    return round(float(np.percentile(values, percentile)) * 1000, 2)
+
+
+def run_benchmark(
+        pages_dir: str,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        block_rate: float = 0.0,
+        request_rate: float = 50.0,
+        search_mode: str = "full",
+        detail_concurrency: int = 8,
+        seed: Optional[int] = 0
+        ) -> Dict[str, Any]:
+    """
+        Run the scraper against the recorded pages and measure its throughput.
+
+        Args:
+            pages_dir (str): The directory with the recorded pages.
+            latency (float): Seconds the server delays every response. Default is 0.
+            latency_jitter (float): Random seconds added to the latency. Default is 0.
+            block_rate (float): Share of requests answered with the block page. Default is 0.
+            request_rate (float): Requests per second the scraper starts with. Default is 50.
+            search_mode (str): The search mode of the scraper. Default is "full".
+            detail_concurrency (int): Product pages downloaded at the same time. Default is 8.
+            seed (Optional[int]): Seed of the server's jitter and block injection. Default is 0.
+
+        Returns:
+            Dict[str, Any]: The UPC and page counts, the elapsed seconds, the UPCs and pages
+                            per minute, the p50/p95 milliseconds of every stage and the
+                            counters of the scraper's metrics.
+
+        Raises:
+            ValueError: If no search page is recorded in `pages_dir`.
+    """
+    upc_codes = recorded_upcs(pages_dir)
+    if not upc_codes:
+        raise ValueError(f"No recorded search pages in {pages_dir}")
+
+    server = ReplayServer(pages_dir, latency=latency, latency_jitter=latency_jitter, block_rate=block_rate, seed=seed)
+    server.start()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_file_path = os.path.join(work_dir, 'input.csv')
+        with open(input_file_path, 'w', newline='', encoding='utf-8') as input_file:
+            writer = csv.writer(input_file)
+            writer.writerow(['zoro_no', 'upc_code', 'sales_price'])
+            for index, upc in enumerate(upc_codes):
+                writer.writerow([f"Z{index:06d}", upc, 25.0])
+
+        processor = AmazonUPCProcessor(
+            input_file_path,
+            os.path.join(work_dir, 'results.json'),
+            os.path.join(work_dir, 'proxies.json'),
+            fetch_mode="http",
+            browser_fallback=False,
+            base_url=server.base_url,
+            csv_file=None,
+            request_rate=request_rate,
+            search_mode=search_mode,
+            detail_concurrency=detail_concurrency,
+            selector_stats_file=os.path.join(work_dir, 'selector_stats.json'),
+            log_file_name="benchmark.log"
+        )
+
+        started = time.perf_counter()
+        try:
+            processor.start_driver()
+        finally:
+            elapsed = time.perf_counter() - started
+            server.stop()
+
+    minutes = elapsed / 60
+    upcs_done = len(processor.stage_timings["upc"])
+    return {
+        "upcs": upcs_done,
+        "pages": server.served,
+        "blocked": server.blocked,
+        "not_found": server.not_found,
+        "seconds": round(elapsed, 2),
+        "upcs_per_minute": round(upcs_done / minutes, 1) if minutes else None,
+        "pages_per_minute": round(server.served / minutes, 1) if minutes else None,
+        "stages": {
+            stage: {
+                "count": len(durations),
+                "p50_ms": _percentile_ms(durations, 50),
+                "p95_ms": _percentile_ms(durations, 95),
+            }
+            for stage, durations in processor.stage_timings.items()
+        },
+        "counters": processor.metrics.summary()["counters"],
+    }
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """
+        Format a benchmark result as text.
+
+        Args:
+            result (Dict[str, Any]): The result of run_benchmark.
+
+        Returns:
+            str: The report, one line per stage.
+    """
+    lines = [
+        f"{result['upcs']} UPCs, {result['pages']} pages ({result['blocked']} blocked) in {result['seconds']} seconds",
+        f"{result['upcs_per_minute']} UPCs/min, {result['pages_per_minute']} pages/min",
+        f"{'stage':<15}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}",
+    ]
+    for stage, stats in result["stages"].items():
+        lines.append(f"{stage:<15}{stats['count']:>8}{stats['p50_ms']:>12}{stats['p95_ms']:>12}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper offline against recorded pages.")
+    parser.add_argument("pages_dir", nargs="?", help="Directory with the recorded pages.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark this many generated UPCs instead.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the server delays every response.")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Random seconds added to the latency.")
+    parser.add_argument("--block-rate", type=float, default=0.0, help="Share of requests answered with the block page.")
+    parser.add_argument("--request-rate", type=float, default=50.0, help="Requests per second the scraper starts with.")
+    parser.add_argument("--search-mode", default="full", choices=["full", "quick"])
+    parser.add_argument("--json", help="Also write the result to this JSON file.")
+    arguments = parser.parse_args()
+
+    if not arguments.pages_dir and not arguments.synthetic:
+        parser.error("Give the directory with the recorded pages or --synthetic.")
+
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        pages_dir = arguments.pages_dir
+        if arguments.synthetic:
+            pages_dir = synthetic_dir
+            write_synthetic_recordings(pages_dir, arguments.synthetic)
+
+        result = run_benchmark(
+            pages_dir, latency=arguments.latency, latency_jitter=arguments.latency_jitter,
+            block_rate=arguments.block_rate, request_rate=arguments.request_rate, search_mode=arguments.search_mode
+        )
+
+    print(format_report(result))
+    if arguments.json:
+        with open(arguments.json, 'w', encoding='utf-8') as json_file:
+            json.dump(result, json_file, indent=4)
@@ -1,5 +1,6 @@
 import os
 from amazon_scraper import AmazonUPCProcessor
+from worker_pool import WorkerPool
 
 
 if __name__ == "__main__":
@@ -8,6 +9,21 @@ if __name__ == "__main__":
     results_file_path = os.path.join(base_dir, 'src', 'json', '03_amazon_data.json')
     proxies_file_path = os.path.join(base_dir, 'src', 'json', 'proxies.json')
 
-    amazon_upc_processor = AmazonUPCProcessor(excel_file_path, results_file_path, proxies_file_path)
-    amazon_upc_processor.start_driver()
-    
\ No newline at end of file
+    # Number of Chrome instances, more than one starts the worker pool
+    workers = 1
+
+    # Optional features, all off by default. To opt in, set the directory or file
+    # (for example os.path.join(base_dir, 'src', 'cache')) or set lean_profile to True.
+    options = {
+        "cache_dir": None,          # page cache, e.g. src/cache/
+        "session_dir": None,        # saved ZIP code sessions, e.g. src/sessions/
+        "columnar_file": None,      # Parquet export, e.g. src/parquet/03_amazon_data.parquet
+        "lean_profile": False,      # block images, fonts, media and ads in Chrome
+    }
+
+    if workers > 1:
+        worker_pool = WorkerPool(excel_file_path, results_file_path, proxies_file_path, workers=workers, **options)
+        worker_pool.run()
+    else:
+        amazon_upc_processor = AmazonUPCProcessor(excel_file_path, results_file_path, proxies_file_path, **options)
+        amazon_upc_processor.start_driver()
@@ -0,0 +1,105 @@
+"""
+    async_fetcher.py
+
+    This module downloads several pages concurrently with asyncio.
+
+    The product pages found for one UPC are independent of each other, so instead of
+    downloading them one after another they are fetched at the same time, bounded by
+    a semaphore and a per-request timeout. The blocking `HttpFetcher.fetch` calls run
+    in worker threads, which lets them share the fetcher's pooled keep-alive session.
+    Every page first waits for its turn at the fetcher's request scheduler; the timeout
+    only starts with the request itself, so pages queued behind the rate limit are not
+    given up. A page that times out is given up without waiting for its thread to finish.
+    The results keep the order of the given URLs.
+
+    Functions:
+        fetch_pages_concurrently: Download a list of URLs concurrently and return the pages in order.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from utils.http_fetcher import FetchedPage, HttpFetcher
+
+
+async def _fetch_one(
+        fetcher: HttpFetcher,
+        url: str,
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor,
+        timeout: float
+        ) -> Optional[FetchedPage]:
+    """
+        Download one page once a slot of the semaphore is free.
+
+        Args:
+            fetcher (HttpFetcher): The fetcher used to download the page.
+            url (str): The URL of the page.
+            semaphore (asyncio.Semaphore): Limits how many pages are downloaded at once.
+            executor (ThreadPoolExecutor): The threads that run the blocking downloads.
+            timeout (float): Seconds after which the request is given up, not counting
+                            the wait for the rate limit.
+
+        Returns:
+            Optional[FetchedPage]: The downloaded page, or None if it failed, was blocked
+                                or timed out.
+    """
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, fetcher.wait_turn)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, fetcher.fetch, url, False), timeout)
+        except asyncio.TimeoutError:
+            logging.getLogger("default").error(f"Fetching {url} timed out after {timeout} seconds.")
+            return None
+
+
+async def _fetch_all(
+        fetcher: HttpFetcher,
+        urls: List[str],
+        max_concurrency: int,
+        executor: ThreadPoolExecutor,
+        timeout: float
+        ) -> List[Optional[FetchedPage]]:
+    """Download all URLs concurrently and return the pages in the order of the URLs."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    return await asyncio.gather(
+        *(_fetch_one(fetcher, url, semaphore, executor, timeout) for url in urls)
+    )
+
+
+def fetch_pages_concurrently(
+        fetcher: HttpFetcher,
+        urls: List[str],
+        max_concurrency: int = 8,
+        timeout: float = 20
+        ) -> List[Optional[FetchedPage]]:
+    """
+        Download a list of URLs concurrently.
+
+        The total time is set by the slowest page instead of the sum of all
+        pages, as long as the number of URLs does not exceed `max_concurrency`.
+
+        Args:
+            fetcher (HttpFetcher): The fetcher used to download the pages.
+            urls (List[str]): The URLs of the pages.
+            max_concurrency (int): Maximum number of pages downloaded at once. Default is 8.
+            timeout (float): Seconds after which the request of a single page is given up,
+                            not counting its wait for the rate limit. Default is 20.
+
+        Returns:
+            List[Optional[FetchedPage]]: The downloaded pages in the order of `urls`; None for
+                                        pages that failed, were blocked or timed out.
+    """
+    if not urls:
+        return []
+
+    max_concurrency = max(1, max_concurrency)
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        return asyncio.run(_fetch_all(fetcher, urls, max_concurrency, executor, timeout))
+    finally:
+        # Do not wait for downloads that already timed out
+        executor.shutdown(wait=False)
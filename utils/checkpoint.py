@@ -0,0 +1,141 @@
+"""
+    checkpoint.py
+
+    This module keeps track of the input rows that are already processed.
+
+    The Checkpoint class stores the completed row IDs of the input file as a bitmap
+    (one bit per row), so resuming a run only needs this small file instead of the
+    results. Every save writes a temporary file and atomically replaces the
+    checkpoint, so an interrupted run never leaves a half written checkpoint behind.
+    The header records the name, size and modification time of the input file; when
+    the input file was edited, the row IDs may point to other rows, so the bitmap is
+    dropped and a new checkpoint is started (`fresh`).
+
+    Classes:
+        Checkpoint: Bitmap of the completed input rows, written atomically.
+
+    Usage:
+        >>> checkpoint = Checkpoint('src/json/03_amazon_data.checkpoint', 'src/csv/data.xlsx')
+        >>> checkpoint.is_done(0)
+        False
+        >>> checkpoint.mark_done(0)
+"""
+
+import os
+import json
+import logging
+
+
+class Checkpoint:
+    def __init__(self, checkpoint_file_path: str, input_file_path: str) -> None:
+        """
+            Load the checkpoint of an input file, or start an empty one.
+
+            The checkpoint remembers the name, size and modification time of the
+            input file it belongs to. If it was written for another input file,
+            or the input file changed since, it is ignored and a new one is
+            started.
+
+            Args:
+                checkpoint_file_path (str): The path of the checkpoint file.
+                input_file_path (str): The path of the input file whose rows are tracked.
+        """
+        self.logger = logging.getLogger("default")
+        self.checkpoint_file_path = checkpoint_file_path
+        self.input_name = os.path.basename(input_file_path)
+        self.input_fingerprint = None
+        if os.path.exists(input_file_path):
+            input_stat = os.stat(input_file_path)
+            self.input_fingerprint = {"size": input_stat.st_size, "mtime_ns": input_stat.st_mtime_ns}
+
+        self.bitmap = bytearray()
+        self.completed = 0
+        # True until a checkpoint of the current input file was loaded
+        self.fresh = True
+        self.load()
+
+    def load(self) -> None:
+        """
+            Read the header and the bitmap of the checkpoint file.
+
+            Returns:
+                None
+        """
+        if not os.path.exists(self.checkpoint_file_path):
+            return
+
+        with open(self.checkpoint_file_path, 'rb') as checkpoint_file:
+            try:
+                header = json.loads(checkpoint_file.readline())
+            except json.JSONDecodeError:
+                self.logger.error(f"Checkpoint {self.checkpoint_file_path} is damaged, starting a new one.")
+                return
+            bitmap = checkpoint_file.read()
+
+        if header.get("input") != self.input_name:
+            self.logger.error(
+                f"Checkpoint {self.checkpoint_file_path} belongs to {header.get('input')}, "
+                f"not to {self.input_name}. Starting a new one."
+            )
+            return
+
+        if header.get("fingerprint") != self.input_fingerprint:
+            self.logger.error(
+                f"{self.input_name} changed since checkpoint {self.checkpoint_file_path} was written, "
+                f"its row IDs may point to other rows. Starting a new one."
+            )
+            return
+
+        self.bitmap = bytearray(bitmap)
+        self.completed = header.get("completed", 0)
+        self.fresh = False
+        self.logger.info(f"Checkpoint loaded: {self.completed} rows of {self.input_name} are done.")
+
+    def is_done(self, row_id: int) -> bool:
+        """Return True if the row with the given ID is already processed."""
+        byte_index = row_id >> 3
+        return byte_index < len(self.bitmap) and bool(self.bitmap[byte_index] & (1 << (row_id & 7)))
+
+    def mark_done(self, row_id: int, save: bool = True) -> None:
+        """
+            Mark a row as processed and save the checkpoint.
+
+            Args:
+                row_id (int): The ID (position) of the row in the input file.
+                save (bool): Write the checkpoint to disk right away. Default is True.
+
+            Returns:
+                None
+        """
+        if self.is_done(row_id):
+            return
+
+        byte_index = row_id >> 3
+        if byte_index >= len(self.bitmap):
+            self.bitmap.extend(bytes(byte_index + 1 - len(self.bitmap)))
+
+        self.bitmap[byte_index] |= 1 << (row_id & 7)
+        self.completed += 1
+
+        if save:
+            self.save()
+
+    def save(self) -> None:
+        """
+            Atomically write the checkpoint to disk.
+
+            Returns:
+                None
+        """
+        temp_file_path = f"{self.checkpoint_file_path}.tmp"
+        header = json.dumps({
+            "input": self.input_name, "fingerprint": self.input_fingerprint, "completed": self.completed
+        })
+
+        with open(temp_file_path, 'wb') as checkpoint_file:
+            checkpoint_file.write(header.encode('utf-8') + b"\n")
+            checkpoint_file.write(self.bitmap)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+        os.replace(temp_file_path, self.checkpoint_file_path)
@@ -0,0 +1,181 @@
+"""
+    columnar_export.py
+
+    This module exports the scraped product details as a typed columnar file.
+
+    The CSV export stores every value as text, with "N/A" mixed into the numeric
+    columns. This export writes Parquet (or Arrow IPC for `.arrow`/`.feather` files)
+    with a fixed schema instead: Price and Price difference are floats, BSR is an
+    integer and missing values are nulls. The records are converted and written in
+    row-group batches, so memory stays bounded no matter how many records are stored.
+    pyarrow is optional: when it is not installed, `PYARROW_AVAILABLE` is False and
+    the export is skipped.
+
+    Functions:
+        to_float: Convert a price value to a float, or None.
+        to_int: Convert a BSR value to an integer, or None.
+        write_records_to_columnar: Write records to a Parquet or Arrow IPC file in batches.
+
+    Usage:
+        >>> write_records_to_columnar(store.iter_records(), 'src/parquet/03_amazon_data.parquet')
+"""
+
+import os
+import logging
+import itertools
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_ipc = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+
+logger = logging.getLogger("default")
+
+# Column name in the export, record field and type of every column
+COLUMNS = [
+    ("UPC", "UPC", "string"),
+    ("Zoro_No", "Zoro_No", "string"),
+    ("URL", "url", "string"),
+    ("ASIN", "ASIN", "string"),
+    ("BSR", "BSR", "int64"),
+    ("Price", "Price", "float64"),
+    ("Price difference", "Price difference", "float64"),
+    ("First Category", "First Category", "string"),
+    ("Seller", "Seller", "string"),
+]
+
+# Values that mean "not found" in the scraped records
+MISSING_VALUES = {"", "N/A", "None", "nan"}
+
+
+def to_float(value: Any) -> Optional[float]:
+    """
+        Convert a price value to a float.
+
+        Args:
+            value (Any): The value to convert, for example 12.5, "12.50" or "$1,299.00".
+
+        Returns:
+            Optional[float]: The float, or None if the value is missing or not a number.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+
+    text = str(value).strip().replace('$', '').replace(',', '')
+    if text in MISSING_VALUES:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def to_int(value: Any) -> Optional[int]:
+    """
+        Convert a BSR value to an integer.
+
+        Args:
+            value (Any): The value to convert, for example 1234 or "1,234".
+
+        Returns:
+            Optional[int]: The integer, or None if the value is missing or not a number.
+    """
+    number = to_float(value)
+    return int(number) if number is not None else None
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """Convert a value to text, with None for missing values."""
+    if value is None:
+        return None
+    text = str(value)
+    return None if text in MISSING_VALUES else text
+
+
+CONVERTERS = {"string": _to_text, "int64": to_int, "float64": to_float}
+
+
+def _schema() -> Any:
+    """Return the Arrow schema of the export."""
+    return pa.schema([(name, getattr(pa, data_type)()) for name, _, data_type in COLUMNS])
+
+
+def _to_batch(records: List[Dict[str, Any]], schema: Any) -> Any:
+    """
+        Convert a list of records to a typed Arrow record batch.
+
+        Args:
+            records (List[Dict[str, Any]]): The product details of the batch.
+            schema (Any): The Arrow schema of the export.
+
+        Returns:
+            Any: The pyarrow RecordBatch.
+    """
+    arrays = []
+    for name, field, data_type in COLUMNS:
+        convert = CONVERTERS[data_type]
+        arrays.append(pa.array([convert(item.get(field)) for item in records], type=schema.field(name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_records_to_columnar(
+        records: Iterable[Dict[str, Any]],
+        file_path: str,
+        batch_size: int = 10000
+        ) -> int:
+    """
+        Write records to a typed Parquet or Arrow IPC file in batches.
+
+        Files ending in `.arrow` or `.feather` are written as Arrow IPC, every
+        other file as Parquet with one row group per batch. The file is written
+        to a temporary path first and replaces the target at the end.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): The product details to export.
+            file_path (str): The path of the file to write.
+            batch_size (int): Number of records converted and written at once. Default is 10000.
+
+        Returns:
+            int: The number of records written, 0 when pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        logger.error(f"pyarrow is not installed, skipping the export to {file_path}.")
+        return 0
+
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    schema = _schema()
+    temp_file_path = f"{file_path}.tmp"
+    is_ipc = os.path.splitext(file_path)[1].lower() in ('.arrow', '.feather')
+    writer = pa_ipc.new_file(temp_file_path, schema) if is_ipc else pq.ParquetWriter(temp_file_path, schema)
+
+    written = 0
+    records = iter(records)
+    try:
+        while True:
+            batch = list(itertools.islice(records, max(1, batch_size)))
+            if not batch:
+                break
+            if is_ipc:
+                writer.write_batch(_to_batch(batch, schema))
+            else:
+                writer.write_table(pa.Table.from_batches([_to_batch(batch, schema)]))
+            written += len(batch)
+    finally:
+        writer.close()
+
+    os.replace(temp_file_path, file_path)
+    logger.info(f"Exported {written} records to {file_path}")
+    return written
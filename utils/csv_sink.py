@@ -0,0 +1,150 @@
+"""
+    csv_sink.py
+
+    This module appends the scraped product details to the CSV file while the run goes on.
+
+    Rewriting the whole CSV file from the results at the end of the run is slow for big
+    result sets, and a run that crashes before that point leaves no CSV at all. The
+    CsvSink keeps the CSV file open in append mode and writes every new product detail
+    right away through a buffered writer. The buffer is flushed to disk every
+    `flush_every` rows or `flush_interval` seconds, and on close. When the sink is
+    opened and the CSV file does not have the same number of rows as the results
+    store (for example after a crash between two flushes), the CSV is rebuilt from
+    the store first, so it never misses or repeats a record.
+
+    Classes:
+        CsvSink: Buffered, append-only CSV writer for the product details.
+
+    Usage:
+        >>> sink = CsvSink('src/csv/03_amazon_data.csv')
+        >>> sink.sync_with(results_store)
+        >>> sink.append_many(product_details)
+        >>> sink.close()
+"""
+
+import os
+import csv
+import time
+import logging
+from typing import Any, Dict, Iterable
+
+from utils.json_to_csv import CSV_COLUMNS, record_to_csv_row
+
+
+class CsvSink:
+    def __init__(self, csv_file_path: str, flush_every: int = 50, flush_interval: float = 5.0) -> None:
+        """
+            Open the CSV file for appending and write the header if it is new.
+
+            Args:
+                csv_file_path (str): The path of the CSV file.
+                flush_every (int): Number of buffered rows after which the file is flushed.
+                                Default is 50.
+                flush_interval (float): Seconds after which buffered rows are flushed, even
+                                        if fewer than `flush_every` are pending. Default is 5.
+        """
+        self.logger = logging.getLogger("default")
+        self.csv_file_path = csv_file_path
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+
+        self.row_count = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._open()
+
+    def _open(self) -> None:
+        """
+            Open the CSV file in append mode and count the rows it already has.
+
+            Returns:
+                None
+        """
+        directory = os.path.dirname(self.csv_file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.row_count = self._count_rows()
+        self._csv_file = open(self.csv_file_path, 'a', newline='', buffering=64 * 1024)
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=CSV_COLUMNS)
+
+        if self._csv_file.tell() == 0:
+            self._writer.writeheader()
+
+    def _count_rows(self) -> int:
+        """Return the number of data rows in the CSV file, 0 if it does not exist."""
+        if not os.path.exists(self.csv_file_path):
+            return 0
+
+        with open(self.csv_file_path, 'r', newline='') as csv_file:
+            return max(0, sum(1 for _ in csv.reader(csv_file)) - 1)
+
+    def sync_with(self, results_store: Any) -> None:
+        """
+            Rebuild the CSV file from the results store if it does not match.
+
+            Args:
+                results_store (Any): The results store with `record_count`, `iter_records`
+                                    and `export_csv`.
+
+            Returns:
+                None
+        """
+        record_count = getattr(results_store, "record_count", None)
+        if record_count is None or record_count == self.row_count:
+            return
+
+        self.logger.info(
+            f"{self.csv_file_path} has {self.row_count} rows but the results store has "
+            f"{record_count} records, rebuilding the CSV file."
+        )
+        self._csv_file.close()
+        results_store.export_csv(self.csv_file_path)
+        self._open()
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+            Append product details to the CSV file.
+
+            Args:
+                records (Iterable[Dict[str, Any]]): The new product details.
+
+            Returns:
+                int: The number of rows written.
+        """
+        written = 0
+        for item in records:
+            self._writer.writerow(record_to_csv_row(item))
+            written += 1
+
+        self.row_count += written
+        self._pending += written
+
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+        return written
+
+    def flush(self) -> None:
+        """
+            Write the buffered rows to disk.
+
+            Returns:
+                None
+        """
+        self._csv_file.flush()
+        os.fsync(self._csv_file.fileno())
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """
+            Flush the buffered rows and close the CSV file.
+
+            Returns:
+                None
+        """
+        if self._csv_file.closed:
+            return
+        self.flush()
+        self._csv_file.close()
@@ -0,0 +1,197 @@
+"""
+    driver_manager.py
+
+    This module owns the lifecycle of the Chrome browsers used by the scraper.
+
+    Launching Chrome and setting the ZIP code takes tens of seconds, and the scraper used
+    to pay that price on every restart, from inside a recursive restart chain. The
+    DriverManager keeps the active browser plus one or more warm spare browsers that are
+    launched in a background thread while the active one works. When the active browser
+    dies, gets blocked or has loaded its page budget, a spare is swapped in right away
+    and a new spare is launched in the background, so replacing a browser is a loop step
+    instead of a new call on the stack.
+
+    Classes:
+        ManagedDriver: A launched browser with its proxy, user agent and page count.
+        DriverManager: Active browser, warm spares, page budget recycling and shutdown.
+
+    Usage:
+        >>> manager = DriverManager(create_browser, choose_proxy, spares=1, page_budget=300)
+        >>> browser = manager.start()
+        >>> manager.count_page()
+        >>> browser = manager.replace("blocked")
+        >>> manager.shutdown()
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class ManagedDriver:
+    """A launched browser that is ready to load pages."""
+    driver: Any
+    proxy: Optional[str] = None
+    user_agent: str = ""
+    pages: int = 0
+
+
+class DriverManager:
+    def __init__(
+            self,
+            create_browser: Callable[[Optional[str]], ManagedDriver],
+            choose_proxy: Callable[[], Optional[str]],
+            spares: int = 1,
+            page_budget: int = 300
+            ) -> None:
+        """
+            Initialize the manager. No browser is launched before `start`.
+
+            Args:
+                create_browser (Callable[[Optional[str]], ManagedDriver]): Launches a browser
+                                        through the given proxy and prepares it (ZIP code).
+                choose_proxy (Callable[[], Optional[str]]): Returns the proxy for the next
+                                        browser, or None.
+                spares (int): Number of warm spare browsers kept ready. Default is 1.
+                page_budget (int): Pages a browser loads before it is recycled; 0 disables
+                                recycling. Default is 300.
+        """
+        self.logger = logging.getLogger("default")
+        self.create_browser = create_browser
+        self.choose_proxy = choose_proxy
+        self.spares_wanted = max(0, spares)
+        self.page_budget = page_budget
+
+        self.current: Optional[ManagedDriver] = None
+        self.spares: List[ManagedDriver] = []
+        self.launching = 0
+        self.replacements = 0
+        self.closed = False
+
+        self._lock = threading.Lock()
+        # Launches are serialized, patching the Chrome driver is not safe in parallel
+        self._launch_lock = threading.Lock()
+
+    def _launch(self, proxy: Optional[str]) -> ManagedDriver:
+        """Launch and prepare one browser."""
+        with self._launch_lock:
+            return self.create_browser(proxy)
+
+    def _launch_spare(self) -> None:
+        """Launch a spare browser, meant to run in a background thread."""
+        try:
+            browser = self._launch(self.choose_proxy())
+        except Exception as e:
+            self.logger.error(f"Launching a spare browser failed: {e}")
+            with self._lock:
+                self.launching -= 1
+            return
+
+        with self._lock:
+            self.launching -= 1
+            if not self.closed:
+                self.spares.append(browser)
+                self.logger.info(f"Spare browser ready ({len(self.spares)} warm).")
+                return
+
+        self._quit(browser)
+
+    def _fill_spares(self) -> None:
+        """Start background launches until the wanted number of spares is ready or launching."""
+        with self._lock:
+            missing = self.spares_wanted - len(self.spares) - self.launching
+            self.launching += max(0, missing)
+
+        for _ in range(missing):
+            threading.Thread(target=self._launch_spare, daemon=True).start()
+
+    def _quit(self, browser: Optional[ManagedDriver]) -> None:
+        """Quit a browser, ignoring a browser that is already dead."""
+        if browser is None:
+            return
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            self.logger.error(f"Quitting the browser failed: {e}")
+
+    def start(self, proxy: Optional[str] = None) -> ManagedDriver:
+        """
+            Launch the active browser and start warming the spares.
+
+            Args:
+                proxy (Optional[str]): The proxy of the active browser. Default is None.
+
+            Returns:
+                ManagedDriver: The active browser.
+        """
+        self._quit(self.current)
+        self.closed = False
+        self.current = self._launch(proxy)
+        self._fill_spares()
+        return self.current
+
+    def replace(self, reason: str, avoid_proxy: Optional[str] = None) -> ManagedDriver:
+        """
+            Swap the active browser for a warm spare, or launch a new one if none is ready.
+
+            Args:
+                reason (str): Why the browser is replaced, for the log.
+                avoid_proxy (Optional[str]): Do not take a spare that uses this proxy, for
+                                            example the one that was just blocked. Default is None.
+
+            Returns:
+                ManagedDriver: The new active browser.
+        """
+        old = self.current
+        with self._lock:
+            spare_index = next(
+                (index for index, spare in enumerate(self.spares)
+                 if avoid_proxy is None or spare.proxy != avoid_proxy),
+                None
+            )
+            spare = self.spares.pop(spare_index) if spare_index is not None else None
+
+        if old is not None:
+            threading.Thread(target=self._quit, args=(old,), daemon=True).start()
+
+        if spare is not None:
+            self.logger.info(f"Browser replaced by a warm spare ({reason}).")
+            self.current = spare
+        else:
+            self.logger.info(f"No warm spare ready, launching a new browser ({reason}).")
+            proxy = self.choose_proxy()
+            self.current = self._launch(proxy)
+
+        self.replacements += 1
+        self._fill_spares()
+        return self.current
+
+    def count_page(self) -> None:
+        """Count a page load of the active browser."""
+        if self.current is not None:
+            self.current.pages += 1
+
+    def budget_used(self) -> bool:
+        """Return True if the active browser has loaded its page budget and should be recycled."""
+        return (
+            self.current is not None and bool(self.page_budget)
+            and self.current.pages >= self.page_budget
+        )
+
+    def shutdown(self) -> None:
+        """
+            Quit the active browser and all spares.
+
+            Returns:
+                None
+        """
+        with self._lock:
+            self.closed = True
+            browsers = [self.current] + self.spares
+            self.current = None
+            self.spares = []
+
+        for browser in browsers:
+            self._quit(browser)
@@ -0,0 +1,217 @@
+"""
+    http_fetcher.py
+
+    This module provides a plain HTTP fetch engine for Amazon search and product pages.
+
+    The HttpFetcher class keeps one pooled keep-alive `requests.Session`, so pages are
+    downloaded without rendering them in Chrome. The session reuses the user agent and
+    the cookies of the browser session (including the delivery ZIP code chosen with
+    `set_zip_code`), and the raw HTML is handed to the parsers in `utils.page_parser`.
+    When Amazon answers with a block or captcha page, `fetch` returns None so the caller
+    can fall back to Selenium.
+
+    Classes:
+        FetchedPage: The final URL and HTML of a downloaded page.
+        HttpFetcher: Pooled keep-alive HTTP client for Amazon pages.
+
+    Functions:
+        is_block_page: Check if an HTML document is an Amazon block or captcha page.
+"""
+
+import re
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BLOCK_PAGE_MARKERS = [
+    "/errors/validateCaptcha",
+    "api-services-support@amazon.com",
+    "To discuss automated access to Amazon data please contact",
+]
+
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class FetchedPage:
+    """A page downloaded over HTTP: the final URL after redirects and its HTML."""
+    url: str
+    html: str
+
+
+def is_block_page(html: str) -> bool:
+    """
+        Check if an HTML document is an Amazon block or captcha page.
+
+        The check matches the title that `is_page_active` looks for ("Sorry!")
+        and a few markers that only appear on the captcha page.
+
+        Args:
+            html (str): The HTML document to check.
+
+        Returns:
+            bool: True if the document is a block page; False otherwise.
+    """
+    title = TITLE_PATTERN.search(html[:5000])
+    if title and title.group(1).strip().startswith("Sorry!"):
+        return True
+
+    return any(marker in html for marker in BLOCK_PAGE_MARKERS)
+
+
+class HttpFetcher:
+    def __init__(
+            self,
+            user_agent: str,
+            timeout: float = 15,
+            pool_size: int = 10,
+            proxy: Optional[str] = None,
+            scheduler: Optional[Any] = None
+            ) -> None:
+        """
+            Initialize the HTTP fetcher with a pooled keep-alive session.
+
+            Args:
+                user_agent (str): The user agent string sent with every request. It
+                                should match the browser the cookies come from.
+                timeout (float): Timeout in seconds for a single request. Default is 15.
+                pool_size (int): Number of keep-alive connections kept per host. Default is 10.
+                proxy (Optional[str]): The proxy ("host:port") to send the requests through.
+                                    Default is None (no proxy).
+                scheduler (Optional[Any]): A RequestScheduler that paces the requests of this
+                                        proxy and backs off after blocks. Default is None.
+        """
+        self.logger = logging.getLogger("default")
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.identity = proxy or "direct"
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Connection": "keep-alive",
+        })
+        if proxy:
+            self.session.proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+
+        # Counters are shared by the threads of the concurrent fetcher
+        self._lock = threading.Lock()
+        self.requests_count = 0
+        self.blocked_count = 0
+        self.failed_count = 0
+
+    def _count(self, blocked: bool = False, failed: bool = False) -> None:
+        """Increase the request, block or failure counter."""
+        with self._lock:
+            if blocked:
+                self.blocked_count += 1
+            elif failed:
+                self.failed_count += 1
+            else:
+                self.requests_count += 1
+
+    def load_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """
+            Copy browser cookies into the HTTP session.
+
+            Args:
+                cookies (List[Dict[str, Any]]): Cookies in the format returned by
+                                                Selenium's `driver.get_cookies()`.
+
+            Returns:
+                None
+        """
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/")
+            )
+        self.logger.info(f"Loaded {len(cookies)} cookies into the HTTP session.")
+
+    def wait_turn(self) -> None:
+        """
+            Wait until the request scheduler lets the next request of this fetcher go out.
+
+            Returns:
+                None
+        """
+        if self.scheduler is not None:
+            self.scheduler.wait(self.identity)
+
+    def fetch(self, url: str, paced: bool = True) -> Optional[FetchedPage]:
+        """
+            Download a page and return its HTML unless Amazon blocked the request.
+
+            Args:
+                url (str): The URL of the page to download.
+                paced (bool): Wait for the request scheduler first. False when the caller
+                            already waited with `wait_turn`. Default is True.
+
+            Returns:
+                Optional[FetchedPage]: The downloaded page, or None if the request failed,
+                                    returned an error status, an empty page or a block page.
+        """
+        if paced:
+            self.wait_turn()
+
+        self._count()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.logger.error(f"HTTP request to {url} failed: {e}")
+            self._count(failed=True)
+            return None
+
+        if response.status_code == 404:
+            # The page does not exist, which says nothing about the health of the proxy
+            self.logger.error(f"HTTP request to {url} returned status 404, there is no such page.")
+            return None
+
+        if response.status_code >= 400:
+            self.logger.error(f"HTTP request to {url} returned status {response.status_code}")
+            if response.status_code == 503:
+                self._count(blocked=True)
+                self._report(blocked=True)
+            else:
+                self._count(failed=True)
+            return None
+
+        html = response.text
+        if not html.strip():
+            self.logger.error(f"HTTP request to {url} returned an empty page.")
+            self._count(failed=True)
+            return None
+
+        if is_block_page(html):
+            self._count(blocked=True)
+            self.logger.error(f"!!! We are blocked by Amazon on {url} over HTTP !!!")
+            self._report(blocked=True)
+            return None
+
+        self._report(blocked=False)
+        return FetchedPage(url=response.url, html=html)
+
+    def _report(self, blocked: bool) -> None:
+        """Tell the scheduler whether a request was blocked, so it can retune the rate."""
+        if self.scheduler is None:
+            return
+        if blocked:
+            self.scheduler.on_block(self.identity)
+        else:
+            self.scheduler.on_success(self.identity)
+
+    def close(self) -> None:
+        """Close the pooled connections of the session."""
+        self.session.close()
@@ -0,0 +1,243 @@
+"""
+    js_extractor.py
+
+    This module reads search and product pages with a single JavaScript call per page.
+
+    Reading a page through Selenium element by element costs one WebDriver round trip
+    per call: every search result card needs a `find_element` and a `get_attribute`,
+    and every product field its own wait and find. The scripts of this module run the
+    XPath expressions of `page_parser` inside the browser with `document.evaluate` and
+    return everything the scraper needs from the page (the final URL, the product links,
+    ASINs and prices of the cards, or the price, seller and Best Sellers Rank text of a
+    product) as one JSON payload. The texts are then turned into the same typed results
+    that `page_parser` returns, so the "js" extraction mode needs neither lxml nor the
+    page source. Every selector of a product field is evaluated, and the selectors up to
+    the first hit are recorded in a SelectorRegistry.
+
+    Functions:
+        run_script: Run an extraction script and decode its JSON payload.
+        extract_search_page: Read the "No results" marker and the cards of the current search page.
+        probe_fields: Evaluate every selector of some fields on the current page.
+        extract_product_page: Read the price, seller, BSR and first category of the current product page.
+
+    Usage:
+        >>> search_data, page_url = extract_search_page(driver)
+        >>> product_data, page_url = extract_product_page(driver, registry)
+        >>> texts, template, page_url = probe_fields(driver, {"price": PRICE_XPATHS})
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.page_parser import (
+    BSR_XPATHS, NO_RESULTS_XPATH, PRICE_XPATHS, SEARCH_CARD_ASIN_XPATH, SEARCH_CARD_LINK_XPATH,
+    SEARCH_CARD_PRICE_XPATH, SEARCH_CARD_TITLE_XPATH, SEARCH_CARD_XPATH, SELLER_XPATH,
+    ProductPageData, SearchCard, SearchPageData, get_bsr_number, get_first_category, valid_price,
+)
+from utils.selector_registry import SelectorRegistry, template_from_class
+
+
+# XPath helpers shared by both scripts. The text of a node prefers its off-screen
+# copy of the price and normalizes whitespace, like page_parser does with lxml.
+_XPATH_FUNCTIONS = """
+    function first(xpath, context) {
+        return document.evaluate(xpath, context || document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    function all(xpath, context) {
+        var result = document.evaluate(xpath, context || document, null,
+                                       XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    }
+    function text(node) {
+        if (!node) {
+            return null;
+        }
+        if (node.nodeType === Node.ATTRIBUTE_NODE) {
+            return node.value;
+        }
+        var offscreen = first(".//span[@class='a-offscreen']", node);
+        if (offscreen && offscreen.textContent.trim()) {
+            return offscreen.textContent.trim();
+        }
+        return node.textContent.split(/\\s+/).join(' ').trim();
+    }
+"""
+
+# Returns the URL, the "No results" marker and the cards of a search page
+SEARCH_PAGE_SCRIPT = _XPATH_FUNCTIONS + """
+    var xpaths = arguments[0];
+    var cards = [];
+    all(xpaths.card).forEach(function (card) {
+        var href = text(first(xpaths.link, card));
+        if (!href) {
+            return;
+        }
+        cards.push({
+            url: new URL(href, location.href).href,
+            asin: text(first(xpaths.asin, card)),
+            title: text(first(xpaths.title, card)),
+            price: text(first(xpaths.price, card))
+        });
+    });
+    return JSON.stringify({url: location.href, no_results: !!first(xpaths.no_results), cards: cards});
+"""
+
+# Returns the URL and template of a product page, and for every field the text and
+# milliseconds of each of its selectors
+PROBE_SCRIPT = _XPATH_FUNCTIONS + """
+    var xpaths = arguments[0];
+    var fields = {};
+    Object.keys(xpaths).forEach(function (field) {
+        fields[field] = xpaths[field].map(function (xpath) {
+            var started = performance.now();
+            var value = text(first(xpath));
+            return {text: value, ms: performance.now() - started};
+        });
+    });
+    var dp = document.getElementById('dp');
+    return JSON.stringify({url: location.href, template: dp ? dp.className : '', fields: fields});
+"""
+
+SEARCH_PAGE_XPATHS = {
+    "card": SEARCH_CARD_XPATH,
+    "link": SEARCH_CARD_LINK_XPATH,
+    "asin": SEARCH_CARD_ASIN_XPATH,
+    "title": SEARCH_CARD_TITLE_XPATH,
+    "price": SEARCH_CARD_PRICE_XPATH,
+    "no_results": NO_RESULTS_XPATH,
+}
+
+PRODUCT_PAGE_XPATHS = {
+    "price": PRICE_XPATHS,
+    "seller": [SELLER_XPATH],
+    "bsr": BSR_XPATHS,
+}
+
+
+def run_script(driver: Any, script: str, xpaths: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        Run an extraction script in the browser and decode its JSON payload.
+
+        Args:
+            driver (Any): The Selenium driver.
+            script (str): SEARCH_PAGE_SCRIPT or PROBE_SCRIPT.
+            xpaths (Dict[str, Any]): The XPath expressions passed to the script.
+
+        Returns:
+            Dict[str, Any]: The decoded payload.
+
+        Raises:
+            ValueError: If the script did not return a JSON object.
+    """
+    payload = json.loads(driver.execute_script(script, xpaths) or "null")
+    if not isinstance(payload, dict):
+        raise ValueError("The extraction script did not return a JSON object.")
+    return payload
+
+
+def extract_search_page(driver: Any) -> Tuple[SearchPageData, str]:
+    """
+        Read the "No results" marker and the result cards of the current search page.
+
+        Args:
+            driver (Any): The Selenium driver showing a search page.
+
+        Returns:
+            Tuple[SearchPageData, str]: The search page data, like `parse_search_page`
+                                        returns it, and the URL of the page.
+    """
+    payload = run_script(driver, SEARCH_PAGE_SCRIPT, SEARCH_PAGE_XPATHS)
+
+    cards = [
+        SearchCard(
+            url=card["url"],
+            asin=card.get("asin") or "N/A",
+            title=card.get("title") or "N/A",
+            price=valid_price(card.get("price"))
+        )
+        for card in payload.get("cards", [])
+    ]
+
+    search_data = SearchPageData(
+        no_results=bool(payload.get("no_results")),
+        product_urls=[card.url for card in cards],
+        cards=cards
+    )
+    return search_data, payload.get("url", "")
+
+
+def probe_fields(
+        driver: Any,
+        xpaths: Dict[str, List[str]],
+        registry: Optional[SelectorRegistry] = None
+        ) -> Tuple[Dict[str, List[Optional[str]]], str, str]:
+    """
+        Evaluate every selector of the given fields on the current page in one script call.
+
+        Args:
+            driver (Any): The Selenium driver.
+            xpaths (Dict[str, List[str]]): The XPaths of every field, for example
+                                        {"price": PRICE_XPATHS}.
+            registry (Optional[SelectorRegistry]): Records the hit and latency of the
+                                                selectors up to the first hit for the
+                                                template of the page. Default is None.
+
+        Returns:
+            Tuple[Dict[str, List[Optional[str]]], str, str]: For every field the text found
+                                        by each selector (None where it did not match),
+                                        the template and the URL of the page.
+    """
+    payload = run_script(driver, PROBE_SCRIPT, xpaths)
+    template = template_from_class(payload.get("template"))
+
+    texts = {}
+    for field_name, field_xpaths in xpaths.items():
+        results = payload.get("fields", {}).get(field_name) or [{}] * len(field_xpaths)
+        texts[field_name] = [result.get("text") for result in results]
+
+        if registry is not None:
+            tries = []
+            for xpath, result in zip(field_xpaths, results):
+                text = result.get("text")
+                hit = valid_price(text) != "N/A" if field_name == "price" else text is not None
+                tries.append((xpath, hit, (result.get("ms") or 0) / 1000))
+            registry.record_until_hit(field_name, template, tries)
+
+    return texts, template, payload.get("url", "")
+
+
+def extract_product_page(driver: Any, registry: Optional[SelectorRegistry] = None) -> Tuple[ProductPageData, str]:
+    """
+        Read the price, seller, BSR and first category of the current product page.
+
+        Args:
+            driver (Any): The Selenium driver showing a product page.
+            registry (Optional[SelectorRegistry]): Records the selectors up to the first hit.
+                                                Default is None.
+
+        Returns:
+            Tuple[ProductPageData, str]: The product fields, like `parse_product_page`
+                                        returns them, and the URL of the page.
+    """
+    texts, template, page_url = probe_fields(driver, PRODUCT_PAGE_XPATHS, registry)
+
+    prices = [valid_price(text) for text in texts["price"]]
+    bsr_text = next((text for text in texts["bsr"] if text is not None), None)
+    bsr, first_category = "N/A", "N/A"
+    if bsr_text is not None:
+        bsr = get_bsr_number(bsr_text) if bsr_text else "N/A"
+        first_category = get_first_category(bsr_text) if bsr_text else "N/A"
+
+    product_data = ProductPageData(
+        price=next((price for price in prices if price != "N/A"), "N/A"),
+        seller=texts["seller"][0] or "N/A",
+        bsr=bsr,
+        first_category=first_category,
+        template=template
+    )
+    return product_data, page_url
@@ -3,9 +3,6 @@ import csv
 import os
 
 def save_json_to_csv(json_results_file, csv_file):
-    # Ensure the directory structure exists
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
-    
     # Load the JSON data from the file
     try:
         with open(json_results_file, 'r') as file:
@@ -22,29 +19,42 @@ def save_json_to_csv(json_results_file, csv_file):
         print(f"Error: Failed to decode JSON. {e}")
         return
     
-    # Define the CSV columns
-    columns = ["UPC", "Zoro_No", "URL", "ASIN", "BSR", "Price", "Price difference", "First Category", "Seller"]
-    
+    write_records_to_csv(data, csv_file)
+
+
+# Define the CSV columns
+CSV_COLUMNS = ["UPC", "Zoro_No", "URL", "ASIN", "BSR", "Price", "Price difference", "First Category", "Seller"]
+
+
+def record_to_csv_row(item):
+    # Map a product detail to the CSV columns
+    return {
+        "UPC": item.get("UPC"),
+        "Zoro_No": item.get("Zoro_No"),
+        "URL": item.get("url"),
+        "ASIN": item.get("ASIN"),
+        "BSR": item.get("BSR"),
+        "Price": item.get("Price"),
+        "Price difference": item.get("Price difference"),
+        "First Category": item.get("First Category"),
+        "Seller": item.get("Seller")
+    }
+
+
+def write_records_to_csv(records, csv_file):
+    # Ensure the directory structure exists
+    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+
     # Open the CSV file and write the data
     with open(csv_file, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
         
         # Write the header
         writer.writeheader()
         
         # Write the data rows
-        for item in data:
-            writer.writerow({
-                "UPC": item.get("UPC"),
-                "Zoro_No": item.get("Zoro_No"),
-                "URL": item.get("url"),
-                "ASIN": item.get("ASIN"),
-                "BSR": item.get("BSR"),
-                "Price": item.get("Price"),
-                "Price difference": item.get("Price difference"),
-                "First Category": item.get("First Category"),
-                "Seller": item.get("Seller")
-            })
+        for item in records:
+            writer.writerow(record_to_csv_row(item))
 
 # Call the function to save JSON data to CSV
 # save_json_to_csv('02_amazon_data.json', 'src/csv/amazon_data.csv')
@@ -0,0 +1,104 @@
+"""
+    lean_profile.py
+
+    This module makes Chrome skip the resources the scraper never reads.
+
+    The scraper only reads text from search and product pages, yet a normal page load
+    also downloads every image, font, video and ad or analytics script. The lean profile
+    hands Chrome a list of URL patterns through the DevTools protocol
+    (`Network.setBlockedURLs`), and Chrome fails the matching requests before they
+    reach the network. Patterns are grouped by resource type ("image", "font", "media",
+    "ads"). An allowlist keeps what some pages need: an entry that names a group
+    unblocks the whole group, any other entry unblocks every pattern that contains it
+    (for example "amazon-adsystem.com" or "*.svg").
+
+    Functions:
+        blocked_url_patterns: The URL patterns to block for the given groups and allowlist.
+        apply_lean_profile: Block the patterns in a running Chrome driver.
+
+    Usage:
+        >>> apply_lean_profile(driver, allowlist=["*.svg"])
+"""
+
+import logging
+from typing import Any, Iterable, List, Optional
+
+
+# URL patterns per resource group, "*" matches any text
+BLOCKED_RESOURCES = {
+    "image": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.m4a"],
+    "ads": [
+        "*amazon-adsystem.com*",
+        "*fls-na.amazon.com*",
+        "*unagi.amazon.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+    ],
+}
+
+# Bytes the current page transferred, including its subresources
+PAGE_BYTES_SCRIPT = """
+    var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+    return entries.reduce(function (total, entry) { return total + (entry.transferSize || 0); }, 0);
+"""
+
+
+def blocked_url_patterns(groups: Iterable[str] = tuple(BLOCKED_RESOURCES), allowlist: Optional[Iterable[str]] = None) -> List[str]:
+    """
+        Return the URL patterns to block.
+
+        Args:
+            groups (Iterable[str]): The resource groups to block, keys of BLOCKED_RESOURCES.
+                                    Default is all groups.
+            allowlist (Optional[Iterable[str]]): Groups or pattern fragments that stay
+                                                allowed. Default is None.
+
+        Returns:
+            List[str]: The URL patterns.
+    """
+    allowlist = list(allowlist or [])
+    patterns = []
+
+    for group in groups:
+        if group in allowlist:
+            continue
+        for pattern in BLOCKED_RESOURCES[group]:
+            if not any(allowed in pattern for allowed in allowlist):
+                patterns.append(pattern)
+
+    return patterns
+
+
+def apply_lean_profile(
+        driver: Any,
+        groups: Iterable[str] = tuple(BLOCKED_RESOURCES),
+        allowlist: Optional[Iterable[str]] = None
+        ) -> List[str]:
+    """
+        Block images, fonts, media and ad hosts in a running Chrome driver.
+
+        Args:
+            driver (Any): The Chrome driver, it has to support `execute_cdp_cmd`.
+            groups (Iterable[str]): The resource groups to block. Default is all groups.
+            allowlist (Optional[Iterable[str]]): Groups or pattern fragments that stay
+                                                allowed. Default is None.
+
+        Returns:
+            List[str]: The blocked URL patterns, empty if the driver does not support it.
+    """
+    logger = logging.getLogger("default")
+    patterns = blocked_url_patterns(groups, allowlist)
+
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.error(f"The lean browser profile could not be applied: {e}")
+        return []
+
+    logger.info(f"Lean browser profile: blocking {len(patterns)} URL patterns.")
+    return patterns
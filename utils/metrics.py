@@ -0,0 +1,382 @@
+"""
+    metrics.py
+
+    This module collects counters and latency histograms of a scraper run and exports them.
+
+    A Counter counts events (page loads, selector misses, blocks, retries, bytes written)
+    and a Histogram counts durations in fixed buckets, both per label set such as the
+    stage or page type. Recording an event is a dictionary lookup and an addition under
+    a lock, so the instrumentation can stay on in production. The MetricsRegistry
+    renders all metrics in the Prometheus text format, which the MetricsServer serves
+    on a local HTTP endpoint while the run is going, and writes a JSON summary with
+    the counts, means and estimated p50/p95 of every histogram at the end of the run.
+
+    Classes:
+        Counter: A monotonically increasing count per label set.
+        Histogram: Bucketed observations with their sum and count per label set.
+        MetricsRegistry: The metrics of a run, with Prometheus and JSON export.
+        MetricsServer: Threaded HTTP server that serves the registry on /metrics.
+
+    Usage:
+        >>> metrics = MetricsRegistry()
+        >>> metrics.counter("scraper_blocks_total", "Block pages received.").inc(source="http")
+        >>> with metrics.time("scraper_stage_seconds", stage="save"):
+        ...     save()
+        >>> MetricsServer(metrics, port=9108).start()
+        >>> metrics.write_summary('src/json/03_amazon_data.metrics.json')
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Upper bounds in seconds of the default histogram buckets, from a parsed page to a backoff
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Dict[str, Any]) -> LabelSet:
+    """Return the labels as a sorted tuple, usable as a dictionary key."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(label_set: LabelSet, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Format labels in the Prometheus text format, for example {stage="save"}."""
+    pairs = list(label_set) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+
+def _summary_key(label_set: LabelSet) -> str:
+    """Format labels as the key of the JSON summary, for example "stage=save"."""
+    return ",".join(f"{name}={value}" for name, value in label_set) or "all"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        """
+            Initialize a counter without any counts.
+
+            Args:
+                name (str): The metric name, ending in "_total".
+                help_text (str): The description shown by Prometheus.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[LabelSet, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+            Add to the count of a label set.
+
+            Args:
+                amount (float): The amount to add. Default is 1.
+                **labels (Any): The labels, for example `source="http"`.
+
+            Returns:
+                None
+        """
+        key = _label_set(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Return the count of a label set."""
+        return self.values.get(_label_set(labels), 0)
+
+    def render(self) -> List[str]:
+        """Return the lines of the counter in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_set, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(label_set)} {value:g}")
+        return lines
+
+    def summary(self) -> Dict[str, float]:
+        """Return the counts per label set."""
+        with self.lock:
+            return {_summary_key(label_set): value for label_set, value in sorted(self.values.items())}
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+            Initialize a histogram without any observations.
+
+            Args:
+                name (str): The metric name, for example "scraper_stage_seconds".
+                help_text (str): The description shown by Prometheus.
+                buckets (Sequence[float]): The ascending upper bounds of the buckets; an
+                                        infinite bucket is added. Default is DEFAULT_BUCKETS.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [count per bucket (the last one is +Inf), sum, count]
+        self.values: Dict[LabelSet, List[Any]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+            Count an observation of a label set.
+
+            Args:
+                value (float): The observed value, for example seconds.
+                **labels (Any): The labels, for example `stage="save"`.
+
+            Returns:
+                None
+        """
+        key = _label_set(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def quantile(self, quantile: float, **labels: Any) -> Optional[float]:
+        """
+            Estimate a quantile of a label set by interpolating inside its bucket.
+
+            Args:
+                quantile (float): The quantile, between 0 and 1.
+                **labels (Any): The labels.
+
+            Returns:
+                Optional[float]: The estimate, None without observations. Values in the
+                                infinite bucket are estimated as the largest bound.
+        """
+        with self.lock:
+            entry = self.values.get(_label_set(labels))
+            if entry is None:
+                return None
+            bucket_counts, _, count = list(entry[0]), entry[1], entry[2]
+
+        rank = quantile * count
+        cumulative = 0
+        for index, bucket_count in enumerate(bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        """Return the lines of the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            entries = sorted((label_set, list(entry[0]), entry[1], entry[2]) for label_set, entry in self.values.items())
+
+        for label_set, bucket_counts, total, count in entries:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(label_set, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(label_set)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(label_set)} {count}")
+        return lines
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return the count, sum, mean and estimated p50/p95 per label set."""
+        with self.lock:
+            label_sets = sorted(self.values)
+
+        summary = {}
+        for label_set in label_sets:
+            labels = dict(label_set)
+            _, total, count = self.values[label_set]
+            summary[_summary_key(label_set)] = {
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6) if count else None,
+                "p50": round(self.quantile(0.5, **labels), 6),
+                "p95": round(self.quantile(0.95, **labels), 6),
+            }
+        return summary
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.logger = logging.getLogger("default")
+        self.metrics: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """
+            Return the counter of a name, creating it on first use.
+
+            Args:
+                name (str): The metric name.
+                help_text (str): The description, used when the counter is created. Default is "".
+
+            Returns:
+                Counter: The counter.
+        """
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Counter(name, help_text)
+            return self.metrics[name]
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+            Return the histogram of a name, creating it on first use.
+
+            Args:
+                name (str): The metric name.
+                help_text (str): The description, used when the histogram is created. Default is "".
+                buckets (Sequence[float]): The bucket bounds, used when the histogram is
+                                        created. Default is DEFAULT_BUCKETS.
+
+            Returns:
+                Histogram: The histogram.
+        """
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Histogram(name, help_text, buckets)
+            return self.metrics[name]
+
+    @contextmanager
+    def time(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+            Observe the seconds the body of the `with` statement takes in a histogram.
+
+            Args:
+                name (str): The name of the histogram.
+                **labels (Any): The labels of the observation.
+
+            Returns:
+                Iterator[None]: The context manager.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        """
+            Render all metrics in the Prometheus text format.
+
+            Returns:
+                str: The exposition text.
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+            Summarize all metrics.
+
+            Returns:
+                Dict[str, Dict[str, Any]]: The counters with their counts and the histograms
+                                        with count, sum, mean, p50 and p95, per label set.
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {
+            "counters": {metric.name: metric.summary() for metric in metrics if isinstance(metric, Counter)},
+            "histograms": {metric.name: metric.summary() for metric in metrics if isinstance(metric, Histogram)},
+        }
+
+    def write_summary(self, file_path: str) -> None:
+        """
+            Atomically write the summary of all metrics to a JSON file.
+
+            Args:
+                file_path (str): The JSON file.
+
+            Returns:
+                None
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, 'w', encoding='utf-8') as summary_file:
+            json.dump({"written_at": time.time(), **self.summary()}, summary_file, indent=4)
+        os.replace(temp_file_path, file_path)
+
+        self.logger.info(f"Metrics summary written to {file_path}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Request handler that answers /metrics with the Prometheus text of the registry."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] == "/metrics":
+            body = self.server.registry.render().encode("utf-8")
+            status = 200
+        else:
+            body = b"Not found, the metrics are on /metrics\n"
+            status = 404
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger("default").debug(f"Metrics server: {format % args}")
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108) -> None:
+        """
+            Initialize the metrics endpoint.
+
+            Args:
+                registry (MetricsRegistry): The metrics to serve.
+                host (str): The interface to listen on. Default is "127.0.0.1".
+                port (int): The port to listen on; 0 picks a free port. Default is 9108.
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.registry = registry
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The URL of the metrics endpoint."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.getLogger("default").info(f"Metrics are served on {self.url}")
+
+    def stop(self) -> None:
+        """Stop the server and release its port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
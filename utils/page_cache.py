@@ -0,0 +1,270 @@
+"""
+    page_cache.py
+
+    This module provides a persistent on-disk cache for downloaded Amazon pages.
+
+    Pages are keyed by their normalized URL plus the delivery ZIP code, because the
+    ZIP code changes prices and sellers. The HTML is stored gzip compressed and content
+    addressed (the file name is the SHA-256 of the page), so identical pages are stored
+    only once. A small SQLite index keeps the key, the stored time and the last access
+    time of every entry: entries older than the TTL are treated as missing, and the
+    least recently used entries are evicted when the cache grows beyond its size limit.
+    The index runs in WAL mode with a busy timeout, so the worker processes of the
+    WorkerPool can share one cache: readers do not block the writer, and a writer
+    waits for the lock instead of failing with "database is locked". The size of the
+    cached pages is kept as a running total in the index, shared by all processes, so
+    storing a page does not add up the sizes of all entries; the total is only
+    recounted when the cache is opened.
+
+    Classes:
+        PageCache: Compressed, content-addressed HTML cache with TTL and LRU eviction.
+
+    Functions:
+        normalize_url: Reduce an Amazon URL to the parts that identify the page.
+"""
+
+import os
+import re
+import gzip
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from utils.http_fetcher import FetchedPage
+
+
+# Query parameters that only track the visit and do not change the page
+TRACKING_PARAMETERS = {"ref", "ref_", "qid", "sr", "dib", "dib_tag", "crid", "sprefix", "th", "psc"}
+
+
+def normalize_url(url: str) -> str:
+    """
+        Reduce an Amazon URL to the parts that identify the page.
+
+        Product URLs are reduced to their ASIN, search URLs to their search term,
+        and tracking parameters are removed from every other URL.
+
+        Args:
+            url (str): The URL to normalize.
+
+        Returns:
+            str: The normalized URL, for example "www.amazon.com/dp/B000000000".
+    """
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+
+    asin = re.search(r'/dp/([A-Z0-9]{10})', parsed.path)
+    if asin:
+        return f"{host}/dp/{asin.group(1)}"
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parsed.query)
+        if name not in TRACKING_PARAMETERS and not name.startswith("pd_rd_")
+    )
+    path = parsed.path.rstrip("/") or "/"
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+class PageCache:
+    def __init__(
+            self,
+            cache_dir: str,
+            ttl_seconds: float = 12 * 3600,
+            max_bytes: int = 512 * 1024 * 1024
+            ) -> None:
+        """
+            Open (or create) the page cache in the given directory.
+
+            Args:
+                cache_dir (str): The directory that holds the compressed pages and the index.
+                ttl_seconds (float): Seconds a cached page stays valid. Default is 12 hours.
+                max_bytes (int): Maximum size of the compressed pages on disk. Default is 512 MB.
+        """
+        self.logger = logging.getLogger("default")
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+            CREATE INDEX IF NOT EXISTS entries_blob ON entries (blob);
+            CREATE TABLE IF NOT EXISTS totals (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        # Recount once, so a total that drifted (for example after a crash) is corrected
+        self.connection.execute(
+            "INSERT OR REPLACE INTO totals (name, value) "
+            "SELECT 'bytes', COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM entries)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(url: str, zip_code: str) -> str:
+        """Return the cache key of a URL for a delivery ZIP code."""
+        return hashlib.sha256(f"{normalize_url(url)}|{zip_code}".encode("utf-8")).hexdigest()
+
+    def _blob_path(self, blob: str) -> str:
+        """Return the file path of a content-addressed page."""
+        return os.path.join(self.cache_dir, "blobs", blob[:2], f"{blob}.html.gz")
+
+    def get(self, url: str, zip_code: str) -> Optional[FetchedPage]:
+        """
+            Return the cached page of a URL if it is younger than the TTL.
+
+            Args:
+                url (str): The URL of the page.
+                zip_code (str): The delivery ZIP code the page was loaded with.
+
+            Returns:
+                Optional[FetchedPage]: The cached page with its final URL, or None on a miss.
+        """
+        key = self.make_key(url, zip_code)
+        row = self.connection.execute(
+            "SELECT url, blob, size, stored_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        final_url, blob, size, stored_at = row
+        if time.time() - stored_at > self.ttl_seconds:
+            self._delete_entry(key, blob, size)
+            self.connection.commit()
+            self.misses += 1
+            return None
+
+        try:
+            with gzip.open(self._blob_path(blob), 'rt', encoding='utf-8') as blob_file:
+                html = blob_file.read()
+        except (OSError, EOFError):
+            self.logger.error(f"Cached page of {url} is missing or damaged, dropping it.")
+            self._delete_entry(key, blob, size)
+            self.connection.commit()
+            self.misses += 1
+            return None
+
+        self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        self.hits += 1
+        return FetchedPage(url=final_url, html=html)
+
+    def put(self, url: str, zip_code: str, html: str, final_url: Optional[str] = None) -> None:
+        """
+            Store a page in the cache and evict old entries if the cache is too big.
+
+            Args:
+                url (str): The requested URL of the page.
+                zip_code (str): The delivery ZIP code the page was loaded with.
+                html (str): The HTML of the page.
+                final_url (Optional[str]): The URL after redirects. Defaults to `url`.
+
+            Returns:
+                None
+        """
+        data = html.encode("utf-8")
+        blob = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(blob)
+
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            temp_path = f"{blob_path}.{os.getpid()}.tmp"
+            with gzip.open(temp_path, 'wb') as blob_file:
+                blob_file.write(data)
+            os.replace(temp_path, blob_path)
+
+        # Take the write lock first, so the running total stays exact with several processes
+        self.connection.execute("BEGIN IMMEDIATE")
+        key = self.make_key(url, zip_code)
+        old_row = self.connection.execute("SELECT blob, size FROM entries WHERE key = ?", (key,)).fetchone()
+        size = os.path.getsize(blob_path)
+        if not self._blob_in_use(blob):
+            self._add_bytes(size)
+
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries (key, url, blob, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, final_url or url, blob, size, now, now)
+        )
+        if old_row is not None and old_row[0] != blob:
+            self._remove_blob_if_unused(*old_row)
+
+        self._evict()
+        self.connection.commit()
+
+    def _delete_entry(self, key: str, blob: str, size: int) -> None:
+        """Delete an entry and its page file when no other entry uses it."""
+        self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._remove_blob_if_unused(blob, size)
+
+    def _blob_in_use(self, blob: str) -> bool:
+        """Return True if an entry references the page file."""
+        return self.connection.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)).fetchone() is not None
+
+    def _remove_blob_if_unused(self, blob: str, size: int) -> None:
+        """Delete a page file that is not referenced by any entry anymore."""
+        if self._blob_in_use(blob):
+            return
+        self._add_bytes(-size)
+        if os.path.exists(self._blob_path(blob)):
+            os.remove(self._blob_path(blob))
+
+    def _add_bytes(self, size: int) -> None:
+        """Change the running total of the cached page sizes."""
+        self.connection.execute("UPDATE totals SET value = value + ? WHERE name = 'bytes'", (size,))
+
+    def total_bytes(self) -> int:
+        """Return the size of all distinct cached page files."""
+        return self.connection.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()[0]
+
+    def _evict(self) -> None:
+        """
+            Remove the least recently used entries until the cache fits into `max_bytes`.
+
+            Returns:
+                None
+        """
+        total_bytes = self.total_bytes()
+        if total_bytes <= self.max_bytes:
+            return
+
+        lru_entries = self.connection.execute(
+            "SELECT key, blob, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall()
+
+        for key, blob, size in lru_entries:
+            if total_bytes <= self.max_bytes:
+                break
+            self._delete_entry(key, blob, size)
+            total_bytes = self.total_bytes()
+
+        self.logger.info(f"Page cache evicted down to {total_bytes} bytes.")
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of lookups in this run that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        """Close the cache index."""
+        self.connection.close()
@@ -0,0 +1,405 @@
+"""
+    page_parser.py
+
+    This module parses the HTML source of Amazon search and product pages in a single pass.
+
+    Instead of asking the browser for every field with its own WebDriverWait, the
+    page source is grabbed once and price, seller, Best Sellers Rank (BSR) and first
+    category are extracted with precompiled lxml XPath expressions. lxml is optional:
+    when it is not installed, `LXML_AVAILABLE` is False and the scraper keeps using
+    the live DOM.
+
+    With a SelectorRegistry, the selectors of a field are evaluated in their declared
+    order until one matches, and their hits and latencies are recorded for the
+    template of the page.
+
+    Search result cards already show the ASIN, title and price of most products, so
+    they are parsed into SearchCard results as well; the "quick" search mode of the
+    scraper uses them instead of opening every product page.
+
+    Classes:
+        ProductPageData: Typed result with the fields extracted from a product page.
+        SearchCard: Typed result with the ASIN, title and price of one search result card.
+        SearchPageData: Typed result with the product links and cards found on a search page.
+
+    Functions:
+        parse_product_page: Extract the product fields from the HTML source of a product page.
+        parse_search_page: Extract the product links from the HTML source of a search page.
+        get_bsr_number: Extract the BSR number from the Best Sellers Rank text.
+        get_first_category: Extract the first category from the Best Sellers Rank text.
+        valid_price: Format a price text, "N/A" unless it is numeric.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from utils.price_utils import format_price
+from utils.selector_registry import DEFAULT_TEMPLATE, TEMPLATE_XPATH, SelectorRegistry, template_from_class
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = None
+    lxml_html = None
+    LXML_AVAILABLE = False
+
+
+# Price locations on the product page, tried in this order
+PRICE_XPATHS = [
+    "(//div[@class='a-spacing-top-mini']/span)[1]",
+    "(//span[@class='a-price aok-align-center reinventPricePriceToPayMargin priceToPay'])[1]",
+    "(//div[@class='a-section a-spacing-micro']/span)[1]",
+    "(//div[@class='a-section a-spacing-none aok-align-center aok-relative']/span)[1]",
+    "//span[@id='kindle-price']",
+    "(//span[@class='slot-price']/span)[1]",
+    "//span[contains(text(),'Buy')]",
+    "//*[@id='tvod-btn-ab-movie-hd-tvod_purchase']//*[contains(concat(' ', @class, ' '), ' _36qUej ')]"
+]
+
+SELLER_XPATH = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' offer-display-feature-text ')]"
+    "//span[contains(concat(' ', normalize-space(@class), ' '), ' offer-display-feature-text-message ')]"
+)
+
+# Best Sellers Rank text, from the product details table or from the detail bullets
+BSR_XPATHS = [
+    "//th[contains(text(), 'Best Sellers Rank')]/following-sibling::td",
+    "//div[@id='detailBulletsWrapper_feature_div']//span[contains(text(), 'Best Sellers Rank')]/..",
+]
+
+# Search result cards and the marker shown when a search has no results
+SEARCH_CARD_XPATH = "//*[contains(@class, 'puis-card-border')]"
+SEARCH_CARD_LINK_XPATH = ".//h2//a/@href"
+SEARCH_CARD_ASIN_XPATH = "ancestor-or-self::*[@data-asin][1]/@data-asin"
+SEARCH_CARD_TITLE_XPATH = ".//h2"
+# The price to pay, not the struck-through list price
+SEARCH_CARD_PRICE_XPATH = (
+    ".//span[contains(concat(' ', normalize-space(@class), ' '), ' a-price ')]"
+    "[not(contains(concat(' ', normalize-space(@class), ' '), ' a-text-price '))]"
+)
+NO_RESULTS_XPATH = "//span[normalize-space()='No results for']"
+
+if LXML_AVAILABLE:
+    _PRICE_QUERIES = [etree.XPath(xpath) for xpath in PRICE_XPATHS]
+    _SELLER_QUERY = etree.XPath(SELLER_XPATH)
+    _BSR_QUERIES = [etree.XPath(xpath) for xpath in BSR_XPATHS]
+    _OFFSCREEN_QUERY = etree.XPath(".//span[@class='a-offscreen']")
+    _SEARCH_CARD_QUERY = etree.XPath(SEARCH_CARD_XPATH)
+    _SEARCH_CARD_LINK_QUERY = etree.XPath(SEARCH_CARD_LINK_XPATH)
+    _SEARCH_CARD_ASIN_QUERY = etree.XPath(SEARCH_CARD_ASIN_XPATH)
+    _SEARCH_CARD_TITLE_QUERY = etree.XPath(SEARCH_CARD_TITLE_XPATH)
+    _SEARCH_CARD_PRICE_QUERY = etree.XPath(SEARCH_CARD_PRICE_XPATH)
+    _NO_RESULTS_QUERY = etree.XPath(NO_RESULTS_XPATH)
+    _TEMPLATE_QUERY = etree.XPath(TEMPLATE_XPATH)
+
+
+@dataclass
+class ProductPageData:
+    """Fields extracted from an Amazon product page, and its template. Missing values are "N/A"."""
+    price: str = "N/A"
+    seller: str = "N/A"
+    bsr: Optional[str] = "N/A"
+    first_category: Optional[str] = "N/A"
+    template: str = DEFAULT_TEMPLATE
+
+
+@dataclass
+class SearchCard:
+    """One search result card. Missing values are "N/A"."""
+    url: str
+    asin: str = "N/A"
+    title: str = "N/A"
+    price: str = "N/A"
+
+
+@dataclass
+class SearchPageData:
+    """Result of a search page: the "No results" marker, the absolute product URLs and the cards."""
+    no_results: bool = False
+    product_urls: List[str] = field(default_factory=list)
+    cards: List[SearchCard] = field(default_factory=list)
+
+
+def _parse_document(page_source: str) -> Any:
+    """
+        Parse an HTML document with lxml.
+
+        Args:
+            page_source (str): The HTML source of the page.
+
+        Returns:
+            Any: The parsed lxml document.
+
+        Raises:
+            ValueError: If the page source is empty or not an HTML document.
+    """
+    try:
+        return lxml_html.fromstring(page_source)
+    except etree.ParserError as e:
+        raise ValueError(f"The page source could not be parsed: {e}") from e
+
+
+def get_first_category(parent_text: str) -> Optional[str]:
+    """
+        Extract the first category from the given text.
+
+        This function uses a regular expression to find the text that follows the word 'in' and
+        precedes any parentheses or line breaks. It returns the cleaned category string.
+
+        Args:
+            parent_text (str): The input text from which to extract the category.
+
+        Returns:
+            Optional[str]: The extracted category if found; otherwise, returns None.
+    """
+    match = re.search(r'in\s+([A-Za-z\s&]+)\s*(?:\(|$)', parent_text)
+
+    if match:
+        return match.group(1).strip()  # Return the category
+    else:
+        return None
+
+
+def get_bsr_number(bsr_text: str) -> Optional[str]:
+    """
+        Extract the Best Seller Rank (BSR) number from the given text.
+
+        Args:
+            bsr_text (str): The input text that may contain the BSR number.
+
+        Returns:
+            Optional[str]: The extracted BSR number if found; otherwise, returns None.
+    """
+    match = re.search(r'#([\d,]+)', bsr_text)
+    return match.group(1) if match else None
+
+
+def _element_text(element: Any) -> str:
+    """
+        Return the visible text of an element with normalized whitespace.
+
+        Price elements contain both an off-screen copy of the price and the
+        split visible parts, so the off-screen text is preferred when present.
+
+        Args:
+            element (Any): The lxml element to read.
+
+        Returns:
+            str: The text of the element.
+    """
+    offscreen = _OFFSCREEN_QUERY(element)
+    if offscreen and offscreen[0].text_content().strip():
+        return offscreen[0].text_content().strip()
+
+    return " ".join(element.text_content().split())
+
+
+def _first_text(query: Any, tree: Any) -> Optional[str]:
+    """Return the text of the first element matched by a compiled XPath, or None."""
+    elements = query(tree)
+    if not elements:
+        return None
+    return _element_text(elements[0])
+
+
+def _probe_texts(
+        field_name: str,
+        xpaths: List[str],
+        queries: List[Any],
+        tree: Any,
+        registry: SelectorRegistry,
+        template: str
+        ) -> List[Optional[str]]:
+    """
+        Evaluate the selectors of a field in order until one hits, and record them in the registry.
+
+        Args:
+            field_name (str): The field the selectors look for.
+            xpaths (List[str]): The XPaths of the selectors.
+            queries (List[Any]): The compiled XPaths, in the same order.
+            tree (Any): The parsed lxml document.
+            registry (SelectorRegistry): The registry the tries are recorded in.
+            template (str): The template of the page.
+
+        Returns:
+            List[Optional[str]]: The text found by every evaluated selector, None where it
+                                did not match; the last one is the hit, if any.
+    """
+    texts = []
+    tries = []
+    for xpath, query in zip(xpaths, queries):
+        started = time.perf_counter()
+        text = _first_text(query, tree)
+        hit = valid_price(text) != "N/A" if field_name == "price" else text is not None
+        tries.append((xpath, hit, time.perf_counter() - started))
+        texts.append(text)
+        if hit:
+            break
+
+    registry.record_until_hit(field_name, template, tries)
+    return texts
+
+
+def _parse_price(tree: Any, registry: Optional[SelectorRegistry] = None, template: str = DEFAULT_TEMPLATE) -> str:
+    """
+        Find the first valid price on the page by trying the price XPaths in order.
+
+        Args:
+            tree (Any): The parsed lxml document.
+            registry (Optional[SelectorRegistry]): Records the price selectors up to the first hit. Default is None.
+            template (str): The template of the page. Default is DEFAULT_TEMPLATE.
+
+        Returns:
+            str: The formatted price if a numeric price is found; otherwise, "N/A".
+    """
+    if registry is not None:
+        prices = [valid_price(text) for text in _probe_texts("price", PRICE_XPATHS, _PRICE_QUERIES, tree, registry, template)]
+        return next((price for price in prices if price != "N/A"), "N/A")
+
+    for query in _PRICE_QUERIES:
+        price = valid_price(_first_text(query, tree))
+        if price != "N/A":
+            return price
+
+    return "N/A"
+
+
+def valid_price(price_text: Optional[str]) -> str:
+    """Return the formatted price if it is numeric, otherwise "N/A"."""
+    if price_text is None:
+        return "N/A"
+
+    price = format_price(price_text)
+    try:
+        float(price)
+        return price
+    except ValueError:
+        return "N/A"
+
+
+def _parse_bsr_and_first_category(
+        tree: Any,
+        registry: Optional[SelectorRegistry] = None,
+        template: str = DEFAULT_TEMPLATE
+        ) -> Tuple[Optional[str], Optional[str]]:
+    """
+        Find the BSR number and first category in the product details or detail bullets.
+
+        Args:
+            tree (Any): The parsed lxml document.
+            registry (Optional[SelectorRegistry]): Records the BSR selectors up to the first hit. Default is None.
+            template (str): The template of the page. Default is DEFAULT_TEMPLATE.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: The BSR number and the first category, "N/A" if not found.
+    """
+    if registry is not None:
+        bsr_texts = _probe_texts("bsr", BSR_XPATHS, _BSR_QUERIES, tree, registry, template)
+    else:
+        bsr_texts = (_first_text(query, tree) for query in _BSR_QUERIES)
+
+    for bsr_text in bsr_texts:
+        if bsr_text is None:
+            continue
+
+        bsr_number = get_bsr_number(bsr_text) if bsr_text else "N/A"
+        first_category = get_first_category(bsr_text) if bsr_text else "N/A"
+        return bsr_number, first_category
+
+    return "N/A", "N/A"
+
+
+def parse_product_page(page_source: str, registry: Optional[SelectorRegistry] = None) -> ProductPageData:
+    """
+        Extract price, seller, BSR and first category from a product page in one pass.
+
+        The HTML is parsed once and every field is read from the same document
+        with precompiled XPath expressions, so no browser round trip or wait is
+        involved.
+
+        Args:
+            page_source (str): The HTML source of the product page.
+            registry (Optional[SelectorRegistry]): Records the selectors up to the first hit
+                                                for the template of the page. Default is None.
+
+        Returns:
+            ProductPageData: The extracted fields; missing fields are "N/A".
+
+        Raises:
+            RuntimeError: If lxml is not installed.
+            ValueError: If the page source is empty or not an HTML document.
+    """
+    if not LXML_AVAILABLE:
+        raise RuntimeError("lxml is not installed, the page source can not be parsed.")
+
+    tree = _parse_document(page_source)
+
+    dp_classes = _TEMPLATE_QUERY(tree)
+    template = template_from_class(dp_classes[0] if dp_classes else None)
+
+    if registry is not None:
+        seller = _probe_texts("seller", [SELLER_XPATH], [_SELLER_QUERY], tree, registry, template)[0]
+    else:
+        seller = _first_text(_SELLER_QUERY, tree)
+    bsr, first_category = _parse_bsr_and_first_category(tree, registry, template)
+
+    return ProductPageData(
+        price=_parse_price(tree, registry, template),
+        seller=seller if seller else "N/A",
+        bsr=bsr,
+        first_category=first_category,
+        template=template
+    )
+
+
+def parse_search_page(page_source: str, page_url: str) -> SearchPageData:
+    """
+        Extract the product links and cards from the HTML source of a search page.
+
+        Args:
+            page_source (str): The HTML source of the search page.
+            page_url (str): The URL of the search page, used to resolve relative links.
+
+        Returns:
+            SearchPageData: Whether the page shows "No results for", the product URLs
+                            of the search result cards and the cards with their
+                            ASIN, title and price, in page order.
+
+        Raises:
+            RuntimeError: If lxml is not installed.
+            ValueError: If the page source is empty or not an HTML document.
+    """
+    if not LXML_AVAILABLE:
+        raise RuntimeError("lxml is not installed, the page source can not be parsed.")
+
+    tree = _parse_document(page_source)
+
+    product_urls = []
+    cards = []
+    for card in _SEARCH_CARD_QUERY(tree):
+        hrefs = _SEARCH_CARD_LINK_QUERY(card)
+        if not hrefs:
+            continue
+
+        url = urljoin(page_url, hrefs[0])
+        asins = _SEARCH_CARD_ASIN_QUERY(card)
+        title = _first_text(_SEARCH_CARD_TITLE_QUERY, card)
+
+        product_urls.append(url)
+        cards.append(SearchCard(
+            url=url,
+            asin=asins[0] if asins and asins[0] else "N/A",
+            title=title if title else "N/A",
+            price=valid_price(_first_text(_SEARCH_CARD_PRICE_QUERY, card))
+        ))
+
+    return SearchPageData(
+        no_results=bool(_NO_RESULTS_QUERY(tree)),
+        product_urls=product_urls,
+        cards=cards
+    )
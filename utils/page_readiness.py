@@ -0,0 +1,220 @@
+"""
+    page_readiness.py
+
+    This module waits for Amazon pages to be ready based on concrete signals instead of
+    fixed sleeps.
+
+    Every page type (home page, search results, product page, ...) has a readiness
+    XPath that marks the content the scraper needs and its own timeout: the result
+    grid for search pages, the buybox (or the title, on pages without a buybox) for
+    product pages. A page is ready once that content exists (and,
+    unless the browser uses the "none" page load strategy, the document is parsed),
+    optionally also once the network has been idle for a short time. Amazon's block
+    page ends the wait right away. Fast pages continue right away, and the time every
+    wait took is recorded per page type, together with the time until the scraper
+    finished extracting the page.
+
+    Classes:
+        PageReadiness: Waits for pages to be ready and records how long every wait took.
+
+    Usage:
+        >>> readiness = PageReadiness()
+        >>> readiness.driver = driver
+        >>> driver.get(search_url)
+        >>> readiness.wait_for("search")
+        >>> readiness.summary()
+"""
+
+import time
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Element that marks a page type as ready to be read
+READINESS_XPATHS = {
+    "home": "//a[@id='nav-global-location-popover-link']",
+    "zip_popover": "//input[@id='GLUXZipUpdateInput']",
+    "search": (
+        "//div[contains(@class, 's-main-slot')]//*[contains(@class, 'puis-card-border')]"
+        " | //span[normalize-space()='No results for']"
+    ),
+    # Many product pages have no details table, so it is not waited for
+    "product": (
+        "//div[@id='dp'][.//div[@id='buybox'] or .//div[@id='desktop_buybox'] or .//div[@id='outOfStock']"
+        " or .//span[@id='productTitle']]"
+    ),
+    "offers": "//div[@class='a-section a-spacing-none aok-align-center aok-relative']",
+}
+
+# Maximum seconds to wait for each page type
+DEFAULT_TIMEOUTS = {
+    "home": 10,
+    "zip_popover": 5,
+    "search": 10,
+    "product": 8,
+    "offers": 5,
+}
+
+# Amazon's block page, it ends every wait
+BLOCK_PAGE_XPATH = "//title[starts-with(normalize-space(.), 'Sorry!')]"
+
+# Returns true once the readiness element exists and, if required, the document is parsed
+READY_SCRIPT = """
+    if (arguments[1] && document.readyState === 'loading') { return false; }
+    return document.evaluate(
+        arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue !== null;
+"""
+
+# Number of resources the page has requested so far, used to detect network idle
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length;"
+
+
+class PageReadiness:
+    def __init__(
+            self,
+            timeouts: Optional[Dict[str, float]] = None,
+            network_idle: bool = False,
+            idle_time: float = 0.5,
+            poll_frequency: float = 0.1,
+            require_parsed: bool = True
+            ) -> None:
+        """
+            Initialize the readiness waits.
+
+            Args:
+                timeouts (Optional[Dict[str, float]]): Timeouts per page type that override
+                                                    DEFAULT_TIMEOUTS. Default is None.
+                network_idle (bool): Also wait until no new resource was requested for
+                                    `idle_time` seconds. Default is False.
+                idle_time (float): Seconds without new requests that count as network idle.
+                                Default is 0.5.
+                poll_frequency (float): Seconds between two readiness checks. Default is 0.1.
+                require_parsed (bool): Also wait until the document is no longer loading.
+                                    Set it to False with the "none" page load strategy,
+                                    where reading starts while the page still streams in.
+                                    Default is True.
+        """
+        self.logger = logging.getLogger("default")
+        self.driver = None
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.network_idle = network_idle
+        self.idle_time = idle_time
+        self.poll_frequency = poll_frequency
+        self.require_parsed = require_parsed
+
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.timeouts_hit: Dict[str, int] = defaultdict(int)
+        self.extract_timings: Dict[str, List[float]] = defaultdict(list)
+
+    def _is_ready(self, xpath: str) -> bool:
+        """Return True if the readiness element exists and, if required, the document is parsed."""
+        try:
+            return bool(self.driver.execute_script(READY_SCRIPT, xpath, self.require_parsed))
+        except JavascriptException:
+            # The script ran while the browser navigated away from the previous document
+            return False
+
+    def _resource_count(self) -> Optional[int]:
+        """Return the number of resources the page requested, or None while the browser navigates."""
+        try:
+            return self.driver.execute_script(RESOURCE_COUNT_SCRIPT)
+        except JavascriptException:
+            return None
+
+    def _wait_for_network_idle(self, deadline: float) -> None:
+        """
+            Wait until the page did not request new resources for `idle_time` seconds.
+
+            Args:
+                deadline (float): The `time.monotonic()` value after which waiting stops.
+
+            Returns:
+                None
+        """
+        resource_count = self._resource_count()
+        idle_since = time.monotonic()
+
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_frequency)
+            current_count = self._resource_count()
+            if current_count is None or current_count != resource_count:
+                resource_count = current_count
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= self.idle_time:
+                return
+
+    def wait_for(self, page_type: str, xpath: Optional[str] = None) -> float:
+        """
+            Wait until a page of the given type is ready to be read.
+
+            A timeout is not an error: it is logged and counted, and the caller
+            continues like it did after the fixed sleeps.
+
+            Args:
+                page_type (str): The page type, a key of READINESS_XPATHS.
+                xpath (Optional[str]): A readiness XPath that overrides the default one
+                                    of the page type. Default is None.
+
+            Returns:
+                float: The seconds the wait took.
+        """
+        xpath = f"{xpath or READINESS_XPATHS[page_type]} | {BLOCK_PAGE_XPATH}"
+        timeout = self.timeouts.get(page_type, 10)
+        start = time.monotonic()
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(
+                lambda driver: self._is_ready(xpath)
+            )
+            if self.network_idle:
+                self._wait_for_network_idle(start + timeout)
+        except TimeoutException:
+            self.timeouts_hit[page_type] += 1
+            self.logger.error(f"The {page_type} page was not ready after {timeout} seconds.")
+
+        elapsed = time.monotonic() - start
+        self.timings[page_type].append(elapsed)
+        return elapsed
+
+    def record_extract(self, page_type: str, seconds: float) -> None:
+        """
+            Record the time from requesting a page until its data was extracted.
+
+            Args:
+                page_type (str): The page type.
+                seconds (float): The seconds from `driver.get` until extraction finished.
+
+            Returns:
+                None
+        """
+        self.extract_timings[page_type].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+            Summarize the recorded waits per page type.
+
+            Returns:
+                Dict[str, Dict[str, Any]]: For every page type the number of waits, the
+                                        number of timeouts, the mean and maximum
+                                        wait in seconds and, when recorded, the mean
+                                        time to extract in seconds.
+        """
+        summary = {
+            page_type: {
+                "waits": len(timings),
+                "timeouts": self.timeouts_hit[page_type],
+                "mean_seconds": round(sum(timings) / len(timings), 3),
+                "max_seconds": round(max(timings), 3),
+            }
+            for page_type, timings in self.timings.items() if timings
+        }
+        for page_type, timings in self.extract_timings.items():
+            if timings and page_type in summary:
+                summary[page_type]["extracted"] = len(timings)
+                summary[page_type]["mean_extract_seconds"] = round(sum(timings) / len(timings), 3)
+        return summary
@@ -1,9 +1,55 @@
+"""
+    price_utils.py
+
+    This module formats scraped prices and compares them with the Zoro prices.
+
+    The Zoro price is marked up by ZORO_MARKUP, and Zoro prices above
+    SURCHARGE_THRESHOLD get SURCHARGE added before the markup. `get_price_difference`
+    applies this rule to one product while scraping. The batched functions apply it
+    to whole columns of Amazon and Zoro prices at once with NumPy: unparseable
+    prices such as "N/A" become NaN instead of raising, so a history of scraped
+    records can be repriced with a new markup without a Python loop over the rows.
+
+    Functions:
+        format_price: Format a scraped price string to a decimal string.
+        get_price_difference: The price difference of one product.
+        to_price_array: Convert a column of prices to floats, NaN where unparseable.
+        zoro_target_prices: The marked-up Zoro prices of a column.
+        markup_tiers: The markup tier of every Zoro price.
+        price_differences: The price differences of whole columns.
+        margin_percentages: The margins of whole columns, in percent of the Amazon price.
+        reprice_records: Recompute the pricing columns of scraped records.
+
+    Usage:
+        >>> price_differences(["12.99", "N/A"], [9.5, 60.0])
+        >>> python -m utils.price_utils src/json/03_amazon_data.json src/csv/data.xlsx --markup 1.25
+"""
+
+import argparse
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
 from utils.setup_logger import LoggerSetup
 
 logger_setup = LoggerSetup()  # Create an instance of LoggerSetup
 logger_setup.setup_logger()  # Set up the logger
 logger = logger_setup.logger  # Access the logger
 
+# The Zoro price is multiplied with the markup, after adding the surcharge above the threshold
+ZORO_MARKUP = 1.203
+SURCHARGE = 5.0
+SURCHARGE_THRESHOLD = 50.0
+
+# A decimal number after the currency signs and separators are removed
+NUMBER_PATTERN = r'[+-]?(?:\d+\.?\d*|\.\d+)'
+
+# Markup tiers returned by markup_tiers
+NO_SURCHARGE_TIER = 0
+SURCHARGE_TIER = 1
+UNKNOWN_TIER = -1
+
 
 def format_price(price: str) -> str:
     """
@@ -49,10 +95,182 @@ def get_price_difference(price: str, zoro_price: str) -> float:
     """
     try:
         price, zoro_price = float(price), float(zoro_price)
-        diff = price - zoro_price * 1.203
-        if zoro_price > 50:
-            diff = price - ((zoro_price + 5) * 1.203)
+        diff = price - zoro_price * ZORO_MARKUP
+        if zoro_price > SURCHARGE_THRESHOLD:
+            diff = price - ((zoro_price + SURCHARGE) * ZORO_MARKUP)
         return diff
     except ValueError:
         logger.error(f"Something went wrong during conversion for the price: {price}")
         return 'N/A'
+
+
+def to_price_array(prices: Any) -> np.ndarray:
+    """
+        Convert a column of prices to a float array.
+
+        Numeric columns are converted directly. Text columns have dollar signs,
+        thousands separators and whitespace removed first; values that are still
+        not numeric ("N/A", "", None) become NaN.
+
+        Args:
+            prices (Any): The prices, a list, NumPy array or pandas Series.
+
+        Returns:
+            np.ndarray: The prices as float64, NaN where unparseable.
+    """
+    prices = pd.Series(prices, copy=False)
+    if pd.api.types.is_numeric_dtype(prices.dtype):
+        return prices.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Checking the format first is much faster than letting pd.to_numeric coerce the errors
+    cleaned = prices.astype(str).str.replace(r'[\s$,]', '', regex=True)
+    is_number = cleaned.str.fullmatch(NUMBER_PATTERN).to_numpy(dtype=bool, na_value=False)
+
+    result = np.full(len(cleaned), np.nan)
+    result[is_number] = cleaned[is_number].astype(np.float64).to_numpy()
+    return result
+
+
+def zoro_target_prices(
+        zoro_prices: Any,
+        markup: float = ZORO_MARKUP,
+        surcharge: float = SURCHARGE,
+        surcharge_threshold: float = SURCHARGE_THRESHOLD
+        ) -> np.ndarray:
+    """
+        Mark up a column of Zoro prices.
+
+        Args:
+            zoro_prices (Any): The Zoro prices.
+            markup (float): The factor the Zoro price is multiplied with. Default is ZORO_MARKUP.
+            surcharge (float): Added to Zoro prices above the threshold before the markup.
+                            Default is SURCHARGE.
+            surcharge_threshold (float): Zoro prices above it get the surcharge.
+                                        Default is SURCHARGE_THRESHOLD.
+
+        Returns:
+            np.ndarray: The marked-up prices, NaN where the Zoro price is unparseable.
+    """
+    zoro_prices = to_price_array(zoro_prices)
+    return (zoro_prices + np.where(zoro_prices > surcharge_threshold, surcharge, 0.0)) * markup
+
+
+def markup_tiers(zoro_prices: Any, surcharge_threshold: float = SURCHARGE_THRESHOLD) -> np.ndarray:
+    """
+        Return the markup tier of every Zoro price.
+
+        Args:
+            zoro_prices (Any): The Zoro prices.
+            surcharge_threshold (float): Zoro prices above it get the surcharge.
+                                        Default is SURCHARGE_THRESHOLD.
+
+        Returns:
+            np.ndarray: SURCHARGE_TIER or NO_SURCHARGE_TIER per price, UNKNOWN_TIER
+                        where the Zoro price is unparseable.
+    """
+    zoro_prices = to_price_array(zoro_prices)
+    tiers = np.where(zoro_prices > surcharge_threshold, SURCHARGE_TIER, NO_SURCHARGE_TIER).astype(np.int8)
+    tiers[np.isnan(zoro_prices)] = UNKNOWN_TIER
+    return tiers
+
+
+def price_differences(prices: Any, zoro_prices: Any, **markup_kwargs: float) -> np.ndarray:
+    """
+        Compute the price differences of whole columns, like `get_price_difference` does for one product.
+
+        Args:
+            prices (Any): The Amazon prices.
+            zoro_prices (Any): The Zoro prices, in the same order.
+            **markup_kwargs (float): `markup`, `surcharge` and `surcharge_threshold` of
+                                    zoro_target_prices.
+
+        Returns:
+            np.ndarray: The Amazon price minus the marked-up Zoro price, NaN where either
+                        price is unparseable.
+    """
+    return to_price_array(prices) - zoro_target_prices(zoro_prices, **markup_kwargs)
+
+
+def margin_percentages(prices: Any, zoro_prices: Any, **markup_kwargs: float) -> np.ndarray:
+    """
+        Compute the margins of whole columns: the price difference in percent of the Amazon price.
+
+        Args:
+            prices (Any): The Amazon prices.
+            zoro_prices (Any): The Zoro prices, in the same order.
+            **markup_kwargs (float): `markup`, `surcharge` and `surcharge_threshold` of
+                                    zoro_target_prices.
+
+        Returns:
+            np.ndarray: The margins, NaN where a price is unparseable or the Amazon price
+                        is not positive.
+    """
+    prices = to_price_array(prices)
+    differences = prices - zoro_target_prices(zoro_prices, **markup_kwargs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prices > 0, differences / prices * 100, np.nan)
+
+
+def reprice_records(
+        records: pd.DataFrame,
+        zoro_prices: Optional[pd.Series] = None,
+        **markup_kwargs: float
+        ) -> pd.DataFrame:
+    """
+        Recompute the pricing columns of scraped records.
+
+        Args:
+            records (pd.DataFrame): The records with the columns "Zoro_No" and "Price".
+            zoro_prices (Optional[pd.Series]): The Zoro prices indexed by Zoro number. Default
+                                            is None (the records have a "Zoro price" column).
+            **markup_kwargs (float): `markup`, `surcharge` and `surcharge_threshold` of
+                                    zoro_target_prices.
+
+        Returns:
+            pd.DataFrame: A copy of the records with the columns "Zoro price", "Markup tier",
+                        "Price difference" and "Margin %".
+    """
+    records = records.copy()
+    if zoro_prices is not None:
+        if not zoro_prices.index.is_unique:
+            zoro_prices = zoro_prices[~zoro_prices.index.duplicated(keep='last')]
+        positions = zoro_prices.index.get_indexer(records["Zoro_No"].astype(str))
+        records["Zoro price"] = np.where(positions >= 0, to_price_array(zoro_prices)[positions], np.nan)
+
+    zoro = to_price_array(records["Zoro price"])
+    prices = to_price_array(records["Price"])
+    threshold = markup_kwargs.get("surcharge_threshold", SURCHARGE_THRESHOLD)
+
+    records["Zoro price"] = zoro
+    records["Markup tier"] = markup_tiers(zoro, threshold)
+    records["Price difference"] = price_differences(prices, zoro, **markup_kwargs)
+    records["Margin %"] = margin_percentages(prices, zoro, **markup_kwargs)
+    return records
+
+
+if __name__ == "__main__":
+    from utils.results_store import open_results_store
+    from utils.upc_reader import read_upc_rows
+
+    parser = argparse.ArgumentParser(description="Reprice the scraped records with a new Zoro markup.")
+    parser.add_argument("results_file", help="The results file of the scraper, for example src/json/03_amazon_data.json.")
+    parser.add_argument("input_file", help="The input file with the Zoro numbers and sales prices.")
+    parser.add_argument("--backend", default="jsonl", help="The results store backend.")
+    parser.add_argument("--markup", type=float, default=ZORO_MARKUP)
+    parser.add_argument("--surcharge", type=float, default=SURCHARGE)
+    parser.add_argument("--surcharge-threshold", type=float, default=SURCHARGE_THRESHOLD)
+    parser.add_argument("--output", default="src/csv/repriced.csv", help="The CSV file the repriced records are written to.")
+    arguments = parser.parse_args()
+
+    rows = list(read_upc_rows(arguments.input_file))
+    input_prices = pd.Series([row.sales_price for row in rows], index=[str(row.zoro_no) for row in rows])
+
+    store = open_results_store(arguments.results_file, arguments.backend)
+    repriced = reprice_records(
+        pd.DataFrame(store.read_all()), input_prices, markup=arguments.markup,
+        surcharge=arguments.surcharge, surcharge_threshold=arguments.surcharge_threshold
+    )
+    store.close()
+
+    repriced.to_csv(arguments.output, index=False)
+    print(f"{len(repriced)} records repriced to {arguments.output}")
@@ -0,0 +1,343 @@
+"""
+    proxy_pool.py
+
+    This module chooses proxies by their health instead of uniformly at random.
+
+    For every proxy of `proxies.json` the pool tracks how many requests succeeded,
+    failed or were answered with Amazon's "Sorry!" block page, and a moving average
+    of the page load latency. Proxies are chosen at random weighted by a health
+    score, so healthy and fast proxies get most of the traffic. A proxy that fails
+    or is blocked several times in a row trips its circuit breaker: it is not chosen
+    until its cooldown has passed, then it gets a single half-open trial request.
+    A successful trial closes the circuit again, a failed one reopens it with a
+    doubled cooldown. The scores are saved to a JSON file, so the next run starts
+    with what this run learned. Several processes that loaded the same scores report
+    only their own requests (`changes`), which one of them merges and saves.
+
+    Classes:
+        ProxyHealth: The counters, latency and circuit state of one proxy.
+        ProxyPool: Health-weighted proxy selection with circuit breaking and saved scores.
+
+    Usage:
+        >>> pool = ProxyPool(["216.185.36.92:11383"], 'src/json/proxy_scores.json')
+        >>> proxy = pool.choose()
+        >>> pool.record(proxy, "success", latency=1.8)
+        >>> pool.save()
+"""
+
+import os
+import json
+import time
+import random
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Outcomes of a request made through a proxy
+OUTCOMES = ("success", "block", "failure")
+
+
+@dataclass
+class ProxyHealth:
+    """The request counters, latency and circuit breaker state of one proxy."""
+    successes: int = 0
+    blocks: int = 0
+    failures: int = 0
+    latency: Optional[float] = None
+    consecutive_errors: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    cooldown: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        """The number of requests recorded for the proxy."""
+        return self.successes + self.blocks + self.failures
+
+    @property
+    def success_rate(self) -> float:
+        """The smoothed share of successful requests, 0.5 for an unused proxy."""
+        return (self.successes + 1) / (self.requests + 2)
+
+    @property
+    def block_rate(self) -> float:
+        """The smoothed share of blocked requests, 0 for an unused proxy."""
+        return self.blocks / (self.requests + 2)
+
+
+class ProxyPool:
+    def __init__(
+            self,
+            proxies: List[str],
+            scores_file_path: Optional[str] = None,
+            failure_threshold: int = 3,
+            cooldown: float = 60,
+            max_cooldown: float = 30 * 60,
+            latency_weight: float = 0.3,
+            reference_latency: float = 3.0
+            ) -> None:
+        """
+            Initialize the pool and load the saved scores of its proxies.
+
+            Args:
+                proxies (List[str]): The proxies ("host:port") of the pool.
+                scores_file_path (Optional[str]): The JSON file the scores are saved to.
+                                                Default is None (scores are not saved).
+                failure_threshold (int): Consecutive failures or blocks that open the circuit
+                                        of a proxy. Default is 3.
+                cooldown (float): Seconds a newly opened circuit waits before its half-open
+                                trial. Default is 60.
+                max_cooldown (float): Upper limit of the doubled cooldowns. Default is 30 minutes.
+                latency_weight (float): Smoothing factor of the latency moving average.
+                                        Default is 0.3.
+                reference_latency (float): Latency in seconds that halves the score of a proxy.
+                                        Default is 3.
+        """
+        self.logger = logging.getLogger("default")
+        self.scores_file_path = scores_file_path
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.latency_weight = latency_weight
+        self.reference_latency = reference_latency
+
+        self.health: Dict[str, ProxyHealth] = {proxy: ProxyHealth() for proxy in proxies}
+        self.load()
+
+        # The counters as loaded, so the requests of this process can be told apart
+        self.loaded_counts = {
+            proxy: (health.successes, health.blocks, health.failures) for proxy, health in self.health.items()
+        }
+
+    def load(self) -> None:
+        """
+            Load the saved scores of the proxies that are in the pool.
+
+            Returns:
+                None
+        """
+        if not self.scores_file_path or not os.path.exists(self.scores_file_path):
+            return
+
+        try:
+            with open(self.scores_file_path, 'r', encoding='utf-8') as scores_file:
+                scores = json.load(scores_file)
+        except json.JSONDecodeError:
+            self.logger.error(f"Proxy scores file {self.scores_file_path} is damaged, starting fresh.")
+            return
+
+        for proxy, values in scores.items():
+            if proxy in self.health:
+                self.health[proxy] = ProxyHealth(**values)
+
+    def save(self) -> None:
+        """
+            Atomically write the scores of all proxies to the scores file.
+
+            Returns:
+                None
+        """
+        if not self.scores_file_path:
+            return
+
+        directory = os.path.dirname(self.scores_file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file_path = f"{self.scores_file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, 'w', encoding='utf-8') as scores_file:
+            json.dump({proxy: asdict(health) for proxy, health in self.health.items()}, scores_file, indent=4)
+        os.replace(temp_file_path, self.scores_file_path)
+
+    def score(self, proxy: str) -> float:
+        """
+            Return the health score of a proxy, higher is better.
+
+            The score is the success rate, reduced by the block rate and by the
+            latency relative to `reference_latency`.
+
+            Args:
+                proxy (str): The proxy.
+
+            Returns:
+                float: The score, between 0 and 1.
+        """
+        health = self.health[proxy]
+        latency_factor = 1.0
+        if health.latency is not None:
+            latency_factor = 1 / (1 + health.latency / self.reference_latency)
+        return health.success_rate * (1 - health.block_rate) * latency_factor
+
+    def is_available(self, proxy: str, now: Optional[float] = None) -> bool:
+        """
+            Return True if the circuit of a proxy lets a request through.
+
+            An open circuit whose cooldown has passed switches to half-open.
+
+            Args:
+                proxy (str): The proxy.
+                now (Optional[float]): The current `time.time()`. Default is None (now).
+
+            Returns:
+                bool: True if the proxy can be chosen.
+        """
+        health = self.health[proxy]
+        if health.state == OPEN and (now or time.time()) - health.opened_at >= health.cooldown:
+            health.state = HALF_OPEN
+            self.logger.info(f"Proxy {proxy} is half-open, trying it again.")
+        return health.state != OPEN
+
+    def choose(self, exclude: Optional[str] = None) -> Optional[str]:
+        """
+            Choose a proxy at random, weighted by the health scores.
+
+            Proxies with an open circuit are skipped. If all circuits are open,
+            the proxy whose cooldown ends first is returned.
+
+            Args:
+                exclude (Optional[str]): A proxy that should not be chosen, for example
+                                        the one that was just blocked. Default is None.
+
+            Returns:
+                Optional[str]: The chosen proxy, or None if the pool is empty.
+        """
+        candidates = [proxy for proxy in self.health if proxy != exclude] or list(self.health)
+        if not candidates:
+            return None
+
+        now = time.time()
+        available = [proxy for proxy in candidates if self.is_available(proxy, now)]
+        if not available:
+            proxy = min(candidates, key=lambda proxy: self.health[proxy].opened_at + self.health[proxy].cooldown)
+            self.logger.error(f"All proxy circuits are open, using {proxy} whose cooldown ends first.")
+            return proxy
+
+        weights = [self.score(proxy) for proxy in available]
+        return random.choices(available, weights=weights)[0]
+
+    def record(self, proxy: Optional[str], outcome: str, latency: Optional[float] = None) -> None:
+        """
+            Record the outcome of a request made through a proxy.
+
+            Args:
+                proxy (Optional[str]): The proxy the request used. None (no proxy) is ignored.
+                outcome (str): "success", "block" (the "Sorry!" page) or "failure".
+                latency (Optional[float]): Seconds the request took. Default is None.
+
+            Returns:
+                None
+        """
+        if proxy not in self.health:
+            return
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Unknown proxy outcome: {outcome}")
+
+        health = self.health[proxy]
+        if outcome == "success":
+            health.successes += 1
+            health.consecutive_errors = 0
+            if health.state == HALF_OPEN:
+                health.state = CLOSED
+                health.cooldown = 0.0
+                self.logger.info(f"Proxy {proxy} recovered, circuit closed.")
+        else:
+            if outcome == "block":
+                health.blocks += 1
+            else:
+                health.failures += 1
+            health.consecutive_errors += 1
+            if health.state == HALF_OPEN or health.consecutive_errors >= self.failure_threshold:
+                self._open_circuit(proxy)
+
+        if latency is not None and outcome == "success":
+            health.latency = latency if health.latency is None else (
+                self.latency_weight * latency + (1 - self.latency_weight) * health.latency
+            )
+
+    def changes(self) -> Dict[str, Dict[str, Any]]:
+        """
+            Return the health of the proxies this process sent requests through.
+
+            Returns:
+                Dict[str, Dict[str, Any]]: For every used proxy the number of successes, blocks
+                                        and failures recorded in this process, and its current
+                                        latency and circuit breaker state.
+        """
+        changes = {}
+        for proxy, health in self.health.items():
+            successes, blocks, failures = self.loaded_counts.get(proxy, (0, 0, 0))
+            if health.requests == successes + blocks + failures:
+                continue
+
+            changes[proxy] = {
+                **asdict(health),
+                "successes": health.successes - successes,
+                "blocks": health.blocks - blocks,
+                "failures": health.failures - failures,
+            }
+        return changes
+
+    def merge(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        """
+            Add the requests of another process to the counters of the proxies.
+
+            The circuit breaker state is taken over from the other process, it 
+            used the proxy more recently; the latency only when the other 
+            process had successful requests, the only ones that update it.
+
+            Args:
+                changes (Dict[str, Dict[str, Any]]): The result of `changes` of the other process.
+
+            Returns:
+                None
+        """
+        for proxy, values in changes.items():
+            if proxy not in self.health:
+                continue
+
+            health = self.health[proxy]
+            self.health[proxy] = ProxyHealth(**{
+                **values,
+                "successes": health.successes + values["successes"],
+                "blocks": health.blocks + values["blocks"],
+                "failures": health.failures + values["failures"],
+                "latency": values["latency"] if values["successes"] else health.latency,
+            })
+
+    def _open_circuit(self, proxy: str) -> None:
+        """Open the circuit of a proxy, doubling its cooldown after a failed trial."""
+        health = self.health[proxy]
+        health.cooldown = min(self.max_cooldown, health.cooldown * 2 if health.cooldown else self.base_cooldown)
+        health.state = OPEN
+        health.opened_at = time.time()
+        self.logger.error(f"Proxy {proxy} circuit opened for {health.cooldown:.0f} seconds.")
+
+    def is_open(self, proxy: Optional[str]) -> bool:
+        """Return True if the circuit of a proxy is open."""
+        return proxy in self.health and self.health[proxy].state == OPEN
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+            Summarize the health of every proxy.
+
+            Returns:
+                Dict[str, Dict[str, Any]]: For every proxy the score, success and block
+                                        rates, mean latency and circuit state.
+        """
+        return {
+            proxy: {
+                "score": round(self.score(proxy), 3),
+                "requests": health.requests,
+                "success_rate": round(health.success_rate, 3),
+                "block_rate": round(health.block_rate, 3),
+                "latency_seconds": round(health.latency, 3) if health.latency is not None else None,
+                "state": health.state,
+            }
+            for proxy, health in self.health.items()
+        }
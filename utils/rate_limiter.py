@@ -0,0 +1,312 @@
+"""
+    rate_limiter.py
+
+    This module paces the requests sent to Amazon and backs off when Amazon blocks them.
+
+    Every identity (a proxy, or "direct" without one) gets a token bucket that limits
+    how many requests per second it sends. When a request is answered with the
+    "Sorry!" block page, the identity waits an exponentially growing, jittered backoff
+    before its next request, and its rate is cut multiplicatively. Every successful
+    request raises the rate again by a small additive step (AIMD). The rates at which
+    blocks happened are remembered, and the additive step shrinks when the rate comes
+    close to them, so the sustained rate settles just under Amazon's throttling
+    threshold instead of repeatedly crossing it.
+
+    The controller can be tested offline: `simulate_block_rate` drives a scheduler
+    with a virtual clock against a simulated server that blocks requests once they
+    come faster than a given threshold.
+
+    Classes:
+        TokenBucket: Token bucket with an adjustable refill rate.
+        RequestScheduler: Per-identity rate limits with backoff and AIMD retuning.
+
+    Functions:
+        simulate_block_rate: Run a scheduler against a simulated throttling threshold.
+
+    Usage:
+        >>> scheduler = RequestScheduler(initial_rate=0.5)
+        >>> scheduler.wait("216.185.36.92:11383")
+        >>> scheduler.on_success("216.185.36.92:11383")
+        >>> python -m utils.rate_limiter --threshold 1.0 --requests 3000
+"""
+
+import time
+import random
+import logging
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+            Initialize a full token bucket.
+
+            Args:
+                rate (float): Tokens added per second, the sustained request rate.
+                capacity (float): Maximum number of tokens, the allowed burst. Default is 1.
+                clock (Callable[[], float]): The clock in seconds. Default is time.monotonic.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update; a bucket paused until later earns none."""
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def reserve(self) -> float:
+        """
+            Take a token, going into debt if none is available.
+
+            Returns:
+                float: Seconds the caller has to wait before using the token.
+        """
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= 1
+        # A paused bucket only starts refilling at `updated_at`
+        paused = max(0.0, self.updated_at - now)
+        return paused + (0.0 if self.tokens >= 0 else -self.tokens / self.rate)
+
+
+@dataclass
+class IdentityState:
+    """The token bucket, backoff and retuning state of one identity."""
+    bucket: TokenBucket
+    consecutive_blocks: int = 0
+    backoff_until: float = 0.0
+    block_ceiling: Optional[float] = None
+    requests: int = 0
+    blocks: int = 0
+
+
+class RequestScheduler:
+    def __init__(
+            self,
+            initial_rate: float = 0.5,
+            min_rate: float = 0.05,
+            max_rate: float = 5.0,
+            burst: float = 1.0,
+            increase_step: float = 0.02,
+            decrease_factor: float = 0.5,
+            base_backoff: float = 3.0,
+            max_backoff: float = 120.0,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep
+            ) -> None:
+        """
+            Initialize the scheduler.
+
+            Args:
+                initial_rate (float): Requests per second a new identity starts with. Default is 0.5.
+                min_rate (float): The lowest rate a block can push an identity to. Default is 0.05.
+                max_rate (float): The highest rate the additive increase can reach. Default is 5.
+                burst (float): Requests an idle identity may send at once. Default is 1.
+                increase_step (float): Requests per second added after a success. Default is 0.02.
+                decrease_factor (float): Factor the rate is multiplied with on a block. Default is 0.5.
+                base_backoff (float): Seconds of the first backoff after a block. Default is 3.
+                max_backoff (float): Upper limit of the backoff. Default is 120.
+                clock (Callable[[], float]): The clock in seconds. Default is time.monotonic.
+                sleep (Callable[[float], None]): The sleep function. Default is time.sleep.
+        """
+        self.logger = logging.getLogger("default")
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+
+        self.identities: Dict[str, IdentityState] = {}
+        self.lock = threading.Lock()
+
+    def _state(self, identity: str) -> IdentityState:
+        """Return the state of an identity, creating it on first use."""
+        if identity not in self.identities:
+            self.identities[identity] = IdentityState(TokenBucket(self.initial_rate, self.burst, self.clock))
+        return self.identities[identity]
+
+    def rate(self, identity: str) -> float:
+        """Return the current request rate of an identity."""
+        with self.lock:
+            return self._state(identity).bucket.rate
+
+    def wait(self, identity: str) -> float:
+        """
+            Block until the identity may send its next request.
+
+            The caller waits for the end of a running backoff and for a token
+            of the identity's bucket.
+
+            Args:
+                identity (str): The proxy, or "direct".
+
+            Returns:
+                float: The seconds waited.
+        """
+        with self.lock:
+            state = self._state(identity)
+            backoff = max(0.0, state.backoff_until - self.clock())
+            if backoff:
+                # The bucket is paused until the backoff is over, so the delay includes the backoff
+                state.bucket.updated_at = max(state.bucket.updated_at, state.backoff_until)
+                state.bucket.tokens = min(state.bucket.tokens, 0.0)
+            delay = state.bucket.reserve()
+            state.requests += 1
+
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def on_success(self, identity: str) -> None:
+        """
+            Raise the rate of an identity after a successful request.
+
+            The additive step shrinks to a tenth when the rate is within 10% of
+            the rate at which the identity was blocked before.
+
+            Args:
+                identity (str): The proxy, or "direct".
+
+            Returns:
+                None
+        """
+        with self.lock:
+            state = self._state(identity)
+            state.consecutive_blocks = 0
+
+            step = self.increase_step
+            if state.block_ceiling is not None and state.bucket.rate >= 0.9 * state.block_ceiling:
+                step /= 10
+            state.bucket.rate = min(self.max_rate, state.bucket.rate + step)
+
+    def on_block(self, identity: str) -> float:
+        """
+            Back off and cut the rate of an identity after a blocked request.
+
+            The backoff doubles with every consecutive block, up to `max_backoff`,
+            and half of it is random jitter so identities do not retry in lockstep.
+
+            Args:
+                identity (str): The proxy, or "direct".
+
+            Returns:
+                float: The seconds of the backoff.
+        """
+        with self.lock:
+            state = self._state(identity)
+            state.blocks += 1
+            state.consecutive_blocks += 1
+
+            rate = state.bucket.rate
+            state.block_ceiling = rate if state.block_ceiling is None else 0.7 * state.block_ceiling + 0.3 * rate
+            state.bucket.rate = max(self.min_rate, rate * self.decrease_factor)
+
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (state.consecutive_blocks - 1))
+            backoff = backoff / 2 + random.uniform(0, backoff / 2)
+            state.backoff_until = self.clock() + backoff
+
+        self.logger.error(
+            f"Blocked on {identity}: backing off {backoff:.1f} seconds, "
+            f"rate lowered from {rate:.3f} to {state.bucket.rate:.3f} requests per second."
+        )
+        return backoff
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+            Summarize the rate and blocks of every identity.
+
+            Returns:
+                Dict[str, Dict[str, Any]]: For every identity the current rate, the
+                                        retuned block ceiling and the request and
+                                        block counts.
+        """
+        with self.lock:
+            return {
+                identity: {
+                    "rate": round(state.bucket.rate, 3),
+                    "block_ceiling": round(state.block_ceiling, 3) if state.block_ceiling is not None else None,
+                    "requests": state.requests,
+                    "blocks": state.blocks,
+                }
+                for identity, state in self.identities.items()
+            }
+
+
+def simulate_block_rate(
+        threshold_rate: float,
+        requests: int = 3000,
+        window: float = 10.0,
+        background_block_rate: float = 0.0,
+        **scheduler_kwargs: Any
+        ) -> Dict[str, float]:
+    """
+        Run a scheduler against a simulated server with a throttling threshold.
+
+        The simulation uses a virtual clock, so it finishes instantly. The
+        simulated server blocks a request when the requests of the last
+        `window` seconds came faster than `threshold_rate`, and otherwise with
+        the probability `background_block_rate`.
+
+        Args:
+            threshold_rate (float): Requests per second above which the server blocks.
+            requests (int): Number of requests to simulate. Default is 3000.
+            window (float): Seconds over which the server measures the rate. Default is 10.
+            background_block_rate (float): Share of requests blocked regardless of the
+                                        rate. Default is 0.
+            **scheduler_kwargs (Any): Keyword arguments of RequestScheduler.
+
+        Returns:
+            Dict[str, float]: The achieved request rate, the block rate and the final
+                            rate of the scheduler.
+    """
+    now = [0.0]
+
+    def advance(seconds: float) -> None:
+        now[0] += seconds
+
+    scheduler = RequestScheduler(clock=lambda: now[0], sleep=advance, **scheduler_kwargs)
+    scheduler.logger = logging.getLogger("rate_limiter_simulation")
+    scheduler.logger.disabled = True
+
+    sent_at = []
+    blocks = 0
+    for _ in range(requests):
+        scheduler.wait("simulated")
+        sent_at.append(now[0])
+        while sent_at and sent_at[0] < now[0] - window:
+            sent_at.pop(0)
+
+        if len(sent_at) / window > threshold_rate or random.random() < background_block_rate:
+            blocks += 1
+            scheduler.on_block("simulated")
+        else:
+            scheduler.on_success("simulated")
+
+    return {
+        "achieved_rate": round(requests / now[0], 3) if now[0] else 0.0,
+        "block_rate": round(blocks / requests, 4),
+        "final_rate": round(scheduler.rate("simulated"), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the request scheduler against a throttling threshold.")
+    parser.add_argument("--threshold", type=float, default=1.0, help="Requests per second above which blocks happen.")
+    parser.add_argument("--requests", type=int, default=3000, help="Number of simulated requests.")
+    parser.add_argument("--background-block-rate", type=float, default=0.0, help="Share of random blocks.")
+    arguments = parser.parse_args()
+
+    print(simulate_block_rate(arguments.threshold, arguments.requests,
+                              background_block_rate=arguments.background_block_rate))
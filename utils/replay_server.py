@@ -0,0 +1,216 @@
+"""
+    replay_server.py
+
+    This module provides a local stand-in for amazon.com that serves recorded pages.
+
+    Recorded search and product pages are stored as HTML files in one directory, named
+    after the page they belong to (see `page_file_name`); the `record_dir` argument of
+    AmazonUPCProcessor records them during a live run. The ReplayServer serves them
+    over HTTP on localhost, so the HTTP fetch mode of the scraper can be pointed at it
+    with the `base_url` argument of AmazonUPCProcessor and run without network access.
+    Absolute links to amazon.com in the recorded pages are served as local links.
+
+    To behave like the real site, every response can be delayed by a latency with
+    random jitter, and a share of the requests can be answered with the "Sorry!"
+    block page instead of the recorded page.
+
+    Classes:
+        ReplayServer: Threaded HTTP server that replays recorded pages.
+
+    Functions:
+        page_key: Build the stable key of an Amazon URL (search term or ASIN).
+        page_file_name: Build the file name a recorded page is stored under.
+
+    Usage:
+        >>> server = ReplayServer('src/recordings', latency=0.2, block_rate=0.02)
+        >>> server.start()
+        >>> processor = AmazonUPCProcessor(..., fetch_mode="http", base_url=server.base_url)
+        >>> server.stop()
+"""
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+
+def page_key(url: str) -> str:
+    """
+        Build the stable key of an Amazon URL.
+
+        Product URLs carry titles, tracking refs and session parameters that
+        change between runs, so they are keyed by ASIN. Search URLs are keyed
+        by their search term, every other URL by its path.
+
+        Args:
+            url (str): The absolute URL or the path (with query) of the page.
+
+        Returns:
+            str: The key of the page, for example "dp_B000000000" or "s_012345678905".
+    """
+    parsed = urlparse(url)
+
+    asin = re.search(r'/dp/([A-Z0-9]{10})', parsed.path)
+    if asin:
+        return f"dp_{asin.group(1)}"
+
+    if parsed.path.rstrip("/") == "/s":
+        search_term = parse_qs(parsed.query).get("k", [""])[0]
+        return f"s_{quote(search_term, safe='')}"
+
+    path = parsed.path.strip("/")
+    return quote(path, safe="") if path else "index"
+
+
+def page_file_name(url: str) -> str:
+    """Return the file name a recorded page of the given URL is stored under."""
+    return f"{page_key(url)}.html"
+
+
+# Answered instead of a recorded page when a block is injected
+BLOCK_PAGE = (
+    b"<html><head><title>Sorry! Something went wrong!</title></head>"
+    b"<body><p>Sorry! Something went wrong on our end.</p></body></html>"
+)
+
+# Absolute links of the recorded pages that are served as local links
+AMAZON_LINK_PATTERN = re.compile(rb'https?://(?:www\.)?amazon\.com(?=/)')
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """Request handler that answers with the recorded page of the requested URL."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        replay = self.server.replay
+        file_path = os.path.join(replay.pages_dir, page_file_name(self.path))
+
+        delay = replay.response_delay()
+        if delay:
+            time.sleep(delay)
+
+        if replay.inject_block():
+            body = BLOCK_PAGE
+            status = 503
+        elif os.path.exists(file_path):
+            with open(file_path, 'rb') as page_file:
+                body = AMAZON_LINK_PATTERN.sub(b"", page_file.read())
+            status = 200
+        else:
+            body = b"<html><head><title>Page Not Found</title></head><body></body></html>"
+            status = 404
+        replay.count(status)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger("default").debug(f"Replay server: {format % args}")
+
+
+class ReplayServer:
+    def __init__(
+            self,
+            pages_dir: str,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            block_rate: float = 0.0,
+            seed: Optional[int] = None
+            ) -> None:
+        """
+            Initialize the replay server.
+
+            Args:
+                pages_dir (str): The directory with the recorded HTML pages.
+                host (str): The interface to listen on. Default is "127.0.0.1".
+                port (int): The port to listen on; 0 picks a free port. Default is 0.
+                latency (float): Seconds every response is delayed. Default is 0.
+                latency_jitter (float): Up to this many seconds are randomly added to the
+                                        latency. Default is 0.
+                block_rate (float): Share of requests answered with the block page. Default is 0.
+                seed (Optional[int]): Seed of the jitter and block injection. Default is None.
+        """
+        self.pages_dir = pages_dir
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.block_rate = block_rate
+        self.random = random.Random(seed)
+
+        self.served = 0
+        self.blocked = 0
+        self.not_found = 0
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay = self
+        self.thread: Optional[threading.Thread] = None
+
+    def response_delay(self) -> float:
+        """Return the seconds the next response is delayed."""
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.latency_jitter)
+
+    def inject_block(self) -> bool:
+        """Return True if the next request is answered with the block page."""
+        with self.lock:
+            return self.random.random() < self.block_rate
+
+    def count(self, status: int) -> None:
+        """Count a response by its status: served, blocked or not found."""
+        with self.lock:
+            if status == 200:
+                self.served += 1
+            elif status == 503:
+                self.blocked += 1
+            else:
+                self.not_found += 1
+
+    @property
+    def base_url(self) -> str:
+        """The base URL of the server, to be used as `base_url` of the scraper."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the server and release its port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded Amazon pages on localhost.")
+    parser.add_argument("pages_dir", help="Directory with the recorded HTML pages")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every response is delayed")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Random seconds added to the latency")
+    parser.add_argument("--block-rate", type=float, default=0.0, help="Share of requests answered with the block page")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.pages_dir, port=args.port, latency=args.latency,
+                          latency_jitter=args.latency_jitter, block_rate=args.block_rate)
+    print(f"Replaying {args.pages_dir} on {server.base_url}")
+    server.httpd.serve_forever()
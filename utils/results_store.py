@@ -0,0 +1,615 @@
+"""
+    results_store.py
+
+    This module provides the results stores for the scraped product details.
+
+    Every product detail is written as one JSON object per line (JSON Lines), so saving
+    the results of a UPC only appends to the end of the file instead of reloading and
+    rewriting the whole history. A small sidecar index keeps the UPC and ASIN of every
+    stored record together with the byte offset where the record ends, which lets the
+    store rebuild its duplicate filter at startup without parsing the results file.
+
+    The SQLite store keeps the same records in a WAL-mode database with indexes on UPC,
+    ASIN, Zoro number and scrape time, so questions like "all ASINs of a Zoro number"
+    or "rows scraped before yesterday" do not need to load every record. Both stores
+    export the usual JSON array and CSV file on demand.
+
+    Classes:
+        JsonlResultsStore: Append-only JSON Lines store with a UPC/ASIN index.
+        SqliteResultsStore: SQLite store with indexed, batched transactional inserts.
+
+    Functions:
+        open_results_store: Open the results store of the given backend.
+
+    Usage:
+        >>> store = JsonlResultsStore('src/json/03_amazon_data.json')
+        >>> store.append_many([{"UPC": "012345678905", "ASIN": "B000000000"}])
+        >>> store.export_json('src/json/03_amazon_data.json')
+        >>> store.close()
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import textwrap
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from utils.json_to_csv import write_records_to_csv
+
+
+# Fields of a product detail, in the order they are saved
+RECORD_FIELDS = ["UPC", "Zoro_No", "url", "ASIN", "BSR", "Price", "Price difference", "First Category", "Seller"]
+
+
+def write_records_to_json(records: Iterable[Dict[str, Any]], json_file_path: str) -> int:
+    """
+        Stream records into a JSON array file.
+
+        The array is written record by record into a temporary file that
+        replaces the target file at the end, so readers never see a half
+        written file.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): The records to write.
+            json_file_path (str): The path of the JSON file to write.
+
+        Returns:
+            int: The number of records written.
+    """
+    temp_file_path = f"{json_file_path}.tmp"
+
+    exported = 0
+    with open(temp_file_path, 'w', encoding='utf-8') as json_file:
+        json_file.write("[")
+        for item in records:
+            json_file.write(",\n" if exported else "\n")
+            json_file.write(textwrap.indent(json.dumps(item, indent=4), "    "))
+            exported += 1
+        json_file.write("\n]" if exported else "]")
+
+    os.replace(temp_file_path, json_file_path)
+    return exported
+
+
+class JsonlResultsStore:
+    def __init__(self, results_file_path: str, fsync_every: int = 50) -> None:
+        """
+            Open (or create) the JSON Lines store that belongs to a results file.
+
+            The records are stored next to the given results file, using the same
+            name with a `.jsonl` extension, and the index uses a `.index` extension.
+            If only a legacy JSON array file exists, its records are imported once.
+
+            Args:
+                results_file_path (str): The path to the JSON results file. The JSON Lines
+                                        and index files are derived from this path.
+                fsync_every (int): Number of appended records after which the files are
+                                flushed and synced to disk. Default is 50.
+        """
+        self.logger = logging.getLogger("default")
+        self.json_file_path = results_file_path
+        base_path = os.path.splitext(results_file_path)[0]
+        self.records_file_path = f"{base_path}.jsonl"
+        self.index_file_path = f"{base_path}.index"
+        self.fsync_every = max(1, fsync_every)
+
+        self.upcs: Set[str] = set()
+        self.asins: Set[str] = set()
+        self.record_count = 0
+        self.last_upc: Optional[str] = None
+        self._unsynced = 0
+
+        directory = os.path.dirname(self.records_file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(self.records_file_path) and os.path.exists(self.json_file_path):
+            self._import_json_array()
+
+        self._load_index()
+
+        # Records are written in binary mode so the end offset of every record is known
+        self._records_file = open(self.records_file_path, 'ab')
+        self._records_offset = self._records_file.seek(0, os.SEEK_END)
+        if self._records_offset and not self._ends_with_newline():
+            # Terminate a partially written last line so new records start on their own line
+            self._records_file.write(b"\n")
+            self._records_offset += 1
+        self._index_file = open(self.index_file_path, 'a', encoding='utf-8')
+
+    def _import_json_array(self) -> None:
+        """
+            Convert a legacy JSON array results file into the JSON Lines format.
+
+            This runs only once, when the JSON Lines file does not exist yet. The
+            original JSON file is left untouched.
+
+            Returns:
+                None
+        """
+        try:
+            with open(self.json_file_path, 'r', encoding='utf-8') as json_file:
+                data = json.load(json_file)
+        except json.JSONDecodeError:
+            self.logger.error(f"Error reading JSON file {self.json_file_path}, nothing to import.")
+            return
+
+        with open(self.records_file_path, 'w', encoding='utf-8') as records_file:
+            for item in data:
+                records_file.write(json.dumps(item) + "\n")
+
+        # The index is rebuilt from the freshly written records
+        if os.path.exists(self.index_file_path):
+            os.remove(self.index_file_path)
+
+        self.logger.info(f"Imported {len(data)} records from {self.json_file_path}")
+
+    def _load_index(self) -> None:
+        """
+            Load the UPC/ASIN index from disk and catch up with any unindexed records.
+
+            Each index line holds the UPC, the ASIN and the byte offset where the
+            record ends in the JSON Lines file. If the records file is longer than
+            the last indexed offset (for example after a crash between the two
+            writes), only the missing tail of the records file is scanned.
+
+            Returns:
+                None
+        """
+        indexed_offset = 0
+        if os.path.exists(self.index_file_path):
+            with open(self.index_file_path, 'r', encoding='utf-8') as index_file:
+                for line in index_file:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 3:
+                        continue
+                    upc, asin, end_offset = parts
+                    self._add_to_index(upc, asin)
+                    indexed_offset = int(end_offset)
+
+        if not os.path.exists(self.records_file_path):
+            return
+
+        records_size = os.path.getsize(self.records_file_path)
+        if records_size < indexed_offset:
+            # The records file was replaced or truncated, the index is stale
+            self.logger.error(f"Index {self.index_file_path} is ahead of the records, rebuilding it.")
+            self.upcs.clear()
+            self.asins.clear()
+            self.record_count = 0
+            self.last_upc = None
+            os.remove(self.index_file_path)
+            indexed_offset = 0
+
+        if records_size > indexed_offset:
+            self._index_tail(indexed_offset)
+
+    def _index_tail(self, start_offset: int) -> None:
+        """
+            Index the records stored after the given byte offset.
+
+            Args:
+                start_offset (int): The byte offset in the records file to start scanning from.
+
+            Returns:
+                None
+        """
+        with open(self.records_file_path, 'rb') as records_file, \
+                open(self.index_file_path, 'a', encoding='utf-8') as index_file:
+            records_file.seek(start_offset)
+            for line in records_file:
+                end_offset = records_file.tell()
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted run
+                    continue
+                upc, asin = str(item.get("UPC")), str(item.get("ASIN"))
+                self._add_to_index(upc, asin)
+                index_file.write(f"{upc}\t{asin}\t{end_offset}\n")
+
+    def _ends_with_newline(self) -> bool:
+        """Return True if the records file ends with a line break."""
+        with open(self.records_file_path, 'rb') as records_file:
+            records_file.seek(-1, os.SEEK_END)
+            return records_file.read(1) == b"\n"
+
+    def _add_to_index(self, upc: str, asin: str) -> None:
+        """Register one stored record in the in-memory index."""
+        self.upcs.add(upc)
+        if asin and asin != "N/A":
+            self.asins.add(asin)
+        self.record_count += 1
+        self.last_upc = upc
+
+    def contains_upc(self, upc: Any) -> bool:
+        """Return True if a record for the given UPC is already stored."""
+        return str(upc) in self.upcs
+
+    def contains_asin(self, asin: str) -> bool:
+        """Return True if a record for the given ASIN is already stored."""
+        return asin in self.asins
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+            Append product details whose UPC is not stored yet.
+
+            The duplicate check uses the UPCs stored before this call, so all
+            products that belong to the same new UPC are written together. The
+            cost of this method only depends on the number of given records, not
+            on the size of the results file.
+
+            Args:
+                records (Iterable[Dict[str, Any]]): The product details to append.
+
+            Returns:
+                int: The number of records that were written.
+        """
+        batch_upcs: Set[str] = set()
+        written = 0
+
+        for item in records:
+            upc, asin = str(item.get("UPC")), str(item.get("ASIN"))
+            if upc in self.upcs and upc not in batch_upcs:
+                continue
+            batch_upcs.add(upc)
+
+            line = (json.dumps(item) + "\n").encode('utf-8')
+            self._records_file.write(line)
+            self._records_offset += len(line)
+            self._index_file.write(f"{upc}\t{asin}\t{self._records_offset}\n")
+            self._add_to_index(upc, asin)
+
+            written += 1
+            self._unsynced += 1
+
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+
+        return written
+
+    def flush(self) -> None:
+        """
+            Flush buffered records and the index to disk with fsync.
+
+            Returns:
+                None
+        """
+        for file in (self._records_file, self._index_file):
+            file.flush()
+            os.fsync(file.fileno())
+        self._unsynced = 0
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+            Iterate over the stored records in insertion order.
+
+            Returns:
+                Iterator[Dict[str, Any]]: The stored product details, one at a time.
+        """
+        self._records_file.flush()
+        with open(self.records_file_path, 'r', encoding='utf-8') as records_file:
+            for line in records_file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return all stored records as a list, like the content of the JSON array file."""
+        return list(self.iter_records())
+
+    def export_json(self, json_file_path: Optional[str] = None) -> None:
+        """
+            Write the stored records as a JSON array for downstream consumers.
+
+            Args:
+                json_file_path (Optional[str]): The path of the JSON file to write. Defaults
+                                                to the results file this store belongs to.
+
+            Returns:
+                None
+        """
+        json_file_path = json_file_path or self.json_file_path
+        exported = write_records_to_json(self.iter_records(), json_file_path)
+        self.logger.info(f"Exported {exported} records to {json_file_path}")
+
+    def export_csv(self, csv_file_path: str) -> None:
+        """
+            Write the stored records to a CSV file.
+
+            Args:
+                csv_file_path (str): The path of the CSV file to write.
+
+            Returns:
+                None
+        """
+        write_records_to_csv(self.iter_records(), csv_file_path)
+        self.logger.info(f"Exported {self.record_count} records to {csv_file_path}")
+
+    def close(self) -> None:
+        """
+            Flush pending writes and close the store files.
+
+            Returns:
+                None
+        """
+        if self._records_file.closed:
+            return
+        self.flush()
+        self._records_file.close()
+        self._index_file.close()
+
+
+class SqliteResultsStore:
+    def __init__(self, results_file_path: str, commit_every: int = 50) -> None:
+        """
+            Open (or create) the SQLite database that belongs to a results file.
+
+            The database is stored next to the given results file, using the same
+            name with a `.sqlite` extension. If only a legacy JSON array file
+            exists, its records are imported once.
+
+            Args:
+                results_file_path (str): The path to the JSON results file. The database
+                                        path is derived from this path.
+                commit_every (int): Number of inserted records after which the open
+                                    transaction is committed. Default is 50.
+        """
+        self.logger = logging.getLogger("default")
+        self.json_file_path = results_file_path
+        self.records_file_path = f"{os.path.splitext(results_file_path)[0]}.sqlite"
+        self.commit_every = max(1, commit_every)
+        self._uncommitted = 0
+
+        directory = os.path.dirname(self.records_file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(self.records_file_path)
+        self.connection = sqlite3.connect(self.records_file_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                upc TEXT NOT NULL,
+                zoro_no TEXT,
+                url TEXT,
+                asin TEXT,
+                bsr,
+                price,
+                price_difference,
+                first_category TEXT,
+                seller TEXT,
+                scraped_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS products_upc ON products (upc);
+            CREATE INDEX IF NOT EXISTS products_asin ON products (asin);
+            CREATE INDEX IF NOT EXISTS products_zoro_no ON products (zoro_no);
+            CREATE INDEX IF NOT EXISTS products_scraped_at ON products (scraped_at);
+        """)
+        self.connection.commit()
+
+        if is_new and os.path.exists(self.json_file_path):
+            self._import_json_array()
+
+    def _import_json_array(self) -> None:
+        """
+            Import the records of a legacy JSON array results file.
+
+            The imported records get the modification time of the legacy file 
+            as their `scraped_at`, the latest time they can have been scraped.
+
+            Returns:
+                None
+        """
+        try:
+            with open(self.json_file_path, 'r', encoding='utf-8') as json_file:
+                data = json.load(json_file)
+        except json.JSONDecodeError:
+            self.logger.error(f"Error reading JSON file {self.json_file_path}, nothing to import.")
+            return
+
+        # The legacy file does not say when each record was scraped; none of them is newer than the file
+        self._insert(data, scraped_at=os.path.getmtime(self.json_file_path))
+        self.connection.commit()
+        self.logger.info(f"Imported {len(data)} records from {self.json_file_path}")
+
+    def _insert(self, records: List[Dict[str, Any]], scraped_at: Optional[float] = None) -> None:
+        """Insert records into the products table inside the open transaction, scraped now by default."""
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        self.connection.executemany(
+            """INSERT INTO products (upc, zoro_no, url, asin, bsr, price, price_difference,
+                                     first_category, seller, scraped_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    str(item.get("UPC")), item.get("Zoro_No"), item.get("url"), item.get("ASIN"),
+                    item.get("BSR"), item.get("Price"), item.get("Price difference"),
+                    item.get("First Category"), item.get("Seller"), scraped_at
+                )
+                for item in records
+            ]
+        )
+
+    @property
+    def record_count(self) -> int:
+        """The number of stored records."""
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    @property
+    def last_upc(self) -> Optional[str]:
+        """The UPC of the last stored record, or None if the store is empty."""
+        row = self.connection.execute("SELECT upc FROM products ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def contains_upc(self, upc: Any) -> bool:
+        """Return True if a record for the given UPC is already stored."""
+        return self.connection.execute(
+            "SELECT 1 FROM products WHERE upc = ? LIMIT 1", (str(upc),)
+        ).fetchone() is not None
+
+    def contains_asin(self, asin: str) -> bool:
+        """Return True if a record for the given ASIN is already stored."""
+        return self.connection.execute(
+            "SELECT 1 FROM products WHERE asin = ? LIMIT 1", (asin,)
+        ).fetchone() is not None
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+            Insert product details whose UPC is not stored yet.
+
+            The duplicate check uses the UPCs stored before this call, so all
+            products that belong to the same new UPC are written together. The
+            records are inserted in the open transaction, which is committed
+            every `commit_every` records.
+
+            Args:
+                records (Iterable[Dict[str, Any]]): The product details to insert.
+
+            Returns:
+                int: The number of records that were inserted.
+        """
+        known: Dict[str, bool] = {}
+        new_records = []
+
+        for item in records:
+            upc = str(item.get("UPC"))
+            if upc not in known:
+                known[upc] = self.contains_upc(upc)
+            if not known[upc]:
+                new_records.append(item)
+
+        if new_records:
+            self._insert(new_records)
+            self._uncommitted += len(new_records)
+
+        if self._uncommitted >= self.commit_every:
+            self.flush()
+
+        return len(new_records)
+
+    def flush(self) -> None:
+        """
+            Commit the open transaction.
+
+            Returns:
+                None
+        """
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def _rows_to_records(self, rows: Iterable[tuple]) -> Iterator[Dict[str, Any]]:
+        """Turn rows of the products table back into product details."""
+        for row in rows:
+            yield dict(zip(RECORD_FIELDS, row))
+
+    def query(self, where: str = "1 = 1", parameters: tuple = ()) -> Iterator[Dict[str, Any]]:
+        """
+            Iterate over the records that match an SQL condition, in insertion order.
+
+            The condition can use the columns upc, zoro_no, url, asin, bsr, price,
+            price_difference, first_category, seller and scraped_at.
+
+            Args:
+                where (str): The SQL condition. Default is "1 = 1" (all records).
+                parameters (tuple): The parameters of the condition. Default is ().
+
+            Returns:
+                Iterator[Dict[str, Any]]: The matching product details.
+        """
+        rows = self.connection.execute(
+            f"""SELECT upc, zoro_no, url, asin, bsr, price, price_difference, first_category, seller
+                FROM products WHERE {where} ORDER BY id""",
+            parameters
+        )
+        return self._rows_to_records(rows)
+
+    def records_for_zoro_no(self, zoro_no: str) -> List[Dict[str, Any]]:
+        """Return all records of a Zoro number."""
+        return list(self.query("zoro_no = ?", (zoro_no,)))
+
+    def records_scraped_before(self, timestamp: Union[int, float]) -> List[Dict[str, Any]]:
+        """Return all records scraped before a Unix timestamp."""
+        return list(self.query("scraped_at < ?", (timestamp,)))
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+            Iterate over the stored records in insertion order.
+
+            Returns:
+                Iterator[Dict[str, Any]]: The stored product details, one at a time.
+        """
+        return self.query()
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return all stored records as a list, like the content of the JSON array file."""
+        return list(self.iter_records())
+
+    def export_json(self, json_file_path: Optional[str] = None) -> None:
+        """
+            Write the stored records as a JSON array for downstream consumers.
+
+            Args:
+                json_file_path (Optional[str]): The path of the JSON file to write. Defaults
+                                                to the results file this store belongs to.
+
+            Returns:
+                None
+        """
+        json_file_path = json_file_path or self.json_file_path
+        exported = write_records_to_json(self.iter_records(), json_file_path)
+        self.logger.info(f"Exported {exported} records to {json_file_path}")
+
+    def export_csv(self, csv_file_path: str) -> None:
+        """
+            Write the stored records to a CSV file.
+
+            Args:
+                csv_file_path (str): The path of the CSV file to write.
+
+            Returns:
+                None
+        """
+        write_records_to_csv(self.iter_records(), csv_file_path)
+        self.logger.info(f"Exported {self.record_count} records to {csv_file_path}")
+
+    def close(self) -> None:
+        """
+            Commit pending inserts and close the database.
+
+            Returns:
+                None
+        """
+        self.flush()
+        self.connection.close()
+
+
+RESULTS_BACKENDS = {
+    "jsonl": JsonlResultsStore,
+    "sqlite": SqliteResultsStore,
+}
+
+
+def open_results_store(results_file_path: str, backend: str = "jsonl") -> Union[JsonlResultsStore, SqliteResultsStore]:
+    """
+        Open the results store of the given backend.
+
+        Args:
+            results_file_path (str): The path to the JSON results file the store belongs to.
+            backend (str): "jsonl" for the append-only JSON Lines store or "sqlite" for
+                        the SQLite database. Default is "jsonl".
+
+        Returns:
+            Union[JsonlResultsStore, SqliteResultsStore]: The opened results store.
+
+        Raises:
+            ValueError: If the backend is unknown.
+    """
+    if backend not in RESULTS_BACKENDS:
+        raise ValueError(f"Unknown results backend: {backend}")
+
+    return RESULTS_BACKENDS[backend](results_file_path)
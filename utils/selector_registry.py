@@ -0,0 +1,349 @@
+"""
+    selector_registry.py
+
+    This module learns which selectors find the product fields on which page template.
+
+    Amazon renders product pages from different templates (tools, books, grocery, ...),
+    and each template shows the price, seller and Best Sellers Rank (BSR) in different
+    places. The scraper keeps a list of XPath selectors per field, and the registry
+    records for every field, template and selector how often the selector matched and
+    how long it took. The template of a page is the first class of its `#dp` element.
+
+    Where all selectors of a field are evaluated at once (lxml parsing, or one script
+    call in the browser), the declared order of the selectors still decides which match
+    wins, and the registry records the selectors up to the first match as if they had
+    been tried one after another; the selectors after it count neither as hit nor as
+    miss. Where the live DOM has to be waited
+    for one selector at a time, the selectors are tried in descending order of their
+    hit rate on the template, so the usual location of a field is waited for first. The
+    statistics are saved to a JSON file for the next run, and selectors that never
+    matched are reported. With a MetricsRegistry, every miss is also counted per field
+    in `scraper_selector_misses_total`. Several processes that started from the same
+    statistics report only their own tries (`changes`), which one of them merges and
+    saves, so no process overwrites what the others learned.
+
+    Classes:
+        SelectorStats: Hit, miss and latency counters of one selector.
+        SelectorRegistry: Per field and template selector statistics with ranking and saved stats.
+
+    Functions:
+        template_from_class: The page template named by the class of the `#dp` element.
+
+    Usage:
+        >>> registry = SelectorRegistry('src/json/selector_stats.json')
+        >>> registry.record("price", "hardlines_tools", PRICE_XPATHS[2], True, 0.004)
+        >>> registry.record_until_hit("seller", "hardlines_tools", [(SELLER_XPATH, True, 0.002)])
+        >>> registry.ordered("price", "hardlines_tools", PRICE_XPATHS)
+        >>> registry.merge(worker_registry.changes())
+        >>> registry.save()
+"""
+
+import os
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.metrics import MetricsRegistry
+
+
+# The class of this element names the template of a product page
+TEMPLATE_XPATH = "//div[@id='dp']/@class"
+DEFAULT_TEMPLATE = "default"
+
+
+def template_from_class(dp_class: Optional[str]) -> str:
+    """
+        Return the page template named by the class of the `#dp` element.
+
+        Args:
+            dp_class (Optional[str]): The class attribute, for example "hardlines_tools en_US".
+
+        Returns:
+            str: The first class, or DEFAULT_TEMPLATE if there is none.
+    """
+    classes = (dp_class or "").split()
+    return classes[0] if classes else DEFAULT_TEMPLATE
+
+
+StatsTree = Dict[str, Dict[str, Dict[str, "SelectorStats"]]]
+
+
+@dataclass
+class SelectorStats:
+    """How often a selector matched a field on one template, and how long it took."""
+    hits: int = 0
+    misses: int = 0
+    seconds: float = 0.0
+
+    @property
+    def tries(self) -> int:
+        """The number of times the selector was tried."""
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """The smoothed share of tries that matched, 0.5 for an unused selector."""
+        return (self.hits + 1) / (self.tries + 2)
+
+    @property
+    def mean_seconds(self) -> float:
+        """The mean seconds per try, 0 for an unused selector."""
+        return self.seconds / self.tries if self.tries else 0.0
+
+
+class SelectorRegistry:
+    def __init__(self, stats_file_path: Optional[str] = None, metrics: Optional[MetricsRegistry] = None) -> None:
+        """
+            Initialize the registry and load the saved statistics.
+
+            Args:
+                stats_file_path (Optional[str]): The JSON file the statistics are saved to.
+                                                Default is None (statistics are not saved).
+                metrics (Optional[MetricsRegistry]): The registry the misses are counted in.
+                                        Default is None.
+        """
+        self.logger = logging.getLogger("default")
+        self.stats_file_path = stats_file_path
+        self.misses = metrics.counter(
+            "scraper_selector_misses_total", "Selector tries that found no usable value, per field."
+        ) if metrics is not None else None
+
+        # field -> template -> selector -> stats
+        self.stats: StatsTree = {}
+        self.load()
+
+        # The tries recorded in this process, in the same layout
+        self.recorded: StatsTree = {}
+
+    def load(self) -> None:
+        """
+            Load the saved statistics.
+
+            Returns:
+                None
+        """
+        if not self.stats_file_path or not os.path.exists(self.stats_file_path):
+            return
+
+        try:
+            with open(self.stats_file_path, 'r', encoding='utf-8') as stats_file:
+                saved = json.load(stats_file)
+        except json.JSONDecodeError:
+            self.logger.error(f"Selector stats file {self.stats_file_path} is damaged, starting fresh.")
+            return
+
+        self.stats = {}
+        self.merge(saved)
+
+    def save(self) -> None:
+        """
+            Atomically write the statistics to the stats file.
+
+            Returns:
+                None
+        """
+        if not self.stats_file_path:
+            return
+
+        directory = os.path.dirname(self.stats_file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        saved = self._to_json(self.stats)
+
+        temp_file_path = f"{self.stats_file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, 'w', encoding='utf-8') as stats_file:
+            json.dump(saved, stats_file, indent=4)
+        os.replace(temp_file_path, self.stats_file_path)
+
+    @staticmethod
+    def _to_json(tree: StatsTree) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """Return statistics in the layout of the stats file."""
+        return {
+            field: {
+                template: {selector: asdict(stats) for selector, stats in selectors.items()}
+                for template, selectors in templates.items()
+            }
+            for field, templates in tree.items()
+        }
+
+    @staticmethod
+    def _stats(tree: StatsTree, field: str, template: str, selector: str) -> SelectorStats:
+        """Return the statistics of a selector, creating them on first use."""
+        selectors = tree.setdefault(field, {}).setdefault(template, {})
+        if selector not in selectors:
+            selectors[selector] = SelectorStats()
+        return selectors[selector]
+
+    def changes(self) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """
+            Return the tries recorded in this process, in the layout of the stats file.
+
+            Returns:
+                Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]: The hits, misses and seconds
+                                        per field, template and selector.
+        """
+        return self._to_json(self.recorded)
+
+    def merge(self, changes: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]) -> None:
+        """
+            Add statistics in the layout of the stats file, for example the changes of another process.
+
+            Args:
+                changes (Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]): The hits, misses and
+                                        seconds per field, template and selector.
+
+            Returns:
+                None
+        """
+        for field, templates in changes.items():
+            for template, selectors in templates.items():
+                for selector, values in selectors.items():
+                    stats = self._stats(self.stats, field, template, selector)
+                    stats.hits += values.get("hits", 0)
+                    stats.misses += values.get("misses", 0)
+                    stats.seconds += values.get("seconds", 0.0)
+
+    def record(self, field: str, template: str, selector: str, hit: bool, seconds: float = 0.0) -> None:
+        """
+            Record one try of a selector.
+
+            Args:
+                field (str): The field the selector looks for: "price", "seller" or "bsr".
+                template (str): The page template.
+                selector (str): The XPath of the selector.
+                hit (bool): True if the selector found a usable value.
+                seconds (float): Seconds the try took. Default is 0.
+
+            Returns:
+                None
+        """
+        # The totals used for ranking, and the tries of this process for `changes`
+        selector_stats = (
+            self._stats(self.stats, field, template, selector),
+            self._stats(self.recorded, field, template, selector),
+        )
+        for stats in selector_stats:
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+            stats.seconds += seconds
+
+        if not hit and self.misses is not None:
+            self.misses.inc(field=field)
+
+    def record_until_hit(self, field: str, template: str, tries: Iterable[Tuple[str, bool, float]]) -> None:
+        """
+            Record the selectors of a field in their declared order, up to the first hit.
+
+            Used where all selectors were evaluated at once: the selectors after the
+            first hit would not have been tried, so they are not counted as misses.
+
+            Args:
+                field (str): The field the selectors look for.
+                template (str): The page template.
+                tries (Iterable[Tuple[str, bool, float]]): The XPath, hit and seconds of every
+                                        selector, in declared order.
+
+            Returns:
+                None
+        """
+        for selector, hit, seconds in tries:
+            self.record(field, template, selector, hit, seconds)
+            if hit:
+                return
+
+    def ordered(self, field: str, template: str, selectors: List[str], skip_unmatched_after: int = 0) -> List[str]:
+        """
+            Return the selectors of a field in descending order of their hit rate.
+
+            The statistics of the template are used; a template without
+            statistics uses those of all templates together. Selectors with
+            the same hit rate are ordered by their mean latency, then keep
+            their declared order.
+
+            Args:
+                field (str): The field the selectors look for.
+                template (str): The page template.
+                selectors (List[str]): The XPaths of the field in their declared order.
+                skip_unmatched_after (int): Leave out selectors that did not match in this
+                                            many tries; 0 keeps all. Default is 0.
+
+            Returns:
+                List[str]: The XPaths, most successful first.
+        """
+        templates = self.stats.get(field, {})
+        if template in templates:
+            stats = templates[template]
+        else:
+            stats = {}
+            for selectors_stats in templates.values():
+                for selector, selector_stats in selectors_stats.items():
+                    pooled = stats.setdefault(selector, SelectorStats())
+                    pooled.hits += selector_stats.hits
+                    pooled.misses += selector_stats.misses
+                    pooled.seconds += selector_stats.seconds
+
+        def rank(selector: str) -> tuple:
+            selector_stats = stats.get(selector, SelectorStats())
+            return -selector_stats.hit_rate, selector_stats.mean_seconds
+
+        if skip_unmatched_after:
+            selectors = [
+                selector for selector in selectors
+                if selector not in stats or stats[selector].hits or stats[selector].tries < skip_unmatched_after
+            ]
+
+        return sorted(selectors, key=rank)
+
+    def never_matched(self, min_tries: int = 20) -> Dict[str, List[str]]:
+        """
+            Return the selectors that never matched on any template.
+
+            Args:
+                min_tries (int): Tries over all templates before a selector is reported.
+                                Default is 20.
+
+            Returns:
+                Dict[str, List[str]]: For every field the XPaths without a single hit.
+        """
+        report = {}
+        for field, templates in self.stats.items():
+            totals: Dict[str, SelectorStats] = {}
+            for selectors in templates.values():
+                for selector, stats in selectors.items():
+                    total = totals.setdefault(selector, SelectorStats())
+                    total.hits += stats.hits
+                    total.misses += stats.misses
+
+            unmatched = [selector for selector, total in totals.items() if not total.hits and total.tries >= min_tries]
+            if unmatched:
+                report[field] = unmatched
+
+        return report
+
+    def summary(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+            Summarize the selectors of every field and template, most successful first.
+
+            Returns:
+                Dict[str, Dict[str, List[Dict[str, Any]]]]: For every field and template the
+                                        selectors with their hit rate, tries and mean latency.
+        """
+        return {
+            field: {
+                template: [
+                    {
+                        "selector": selector,
+                        "hit_rate": round(selectors[selector].hit_rate, 3),
+                        "tries": selectors[selector].tries,
+                        "mean_ms": round(selectors[selector].mean_seconds * 1000, 2),
+                    }
+                    for selector in self.ordered(field, template, list(selectors))
+                ]
+                for template, selectors in templates.items()
+            }
+            for field, templates in self.stats.items()
+        }
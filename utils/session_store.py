@@ -0,0 +1,175 @@
+"""
+    session_store.py
+
+    This module saves the Amazon session of a delivery ZIP code and restores it in new browsers.
+
+    Setting the ZIP code through the "Deliver to" popover loads the home page, clicks
+    through several dialogs and takes 15 to 20 seconds per browser. Amazon keeps the
+    chosen location in the session cookies, so once the ZIP code was set, the cookie jar
+    is saved to one JSON file per ZIP code. A new browser only loads the home page, gets
+    the saved cookies injected and checks that the header shows the ZIP code. The popover
+    flow runs only when no session is saved, the saved one is older than its TTL, or
+    Amazon does not accept it anymore.
+
+    Classes:
+        SessionStore: Per ZIP code cookie jars on disk, with a TTL.
+
+    Functions:
+        to_selenium_cookie: Reduce a saved cookie to the fields Selenium accepts.
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+
+# Returns the delivery location shown in the header, for example "New York 10001"
+LOCATION_SCRIPT = """
+    var element = document.getElementById('glow-ingress-line2');
+    return element ? element.textContent : '';
+"""
+
+# Cookie fields accepted by Selenium's add_cookie
+SELENIUM_COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+def to_selenium_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        Reduce a saved cookie to the fields Selenium accepts.
+
+        Args:
+            cookie (Dict[str, Any]): A cookie as returned by `driver.get_cookies()`.
+
+        Returns:
+            Dict[str, Any]: The cookie, with an integer expiry.
+    """
+    cookie = {field: cookie[field] for field in SELENIUM_COOKIE_FIELDS if field in cookie}
+    if "expiry" in cookie:
+        cookie["expiry"] = int(cookie["expiry"])
+    return cookie
+
+
+class SessionStore:
+    def __init__(self, session_dir: str, ttl_seconds: float = 24 * 3600) -> None:
+        """
+            Initialize the store in the given directory.
+
+            Args:
+                session_dir (str): The directory with one `<zip code>.json` file per ZIP code.
+                ttl_seconds (float): Seconds a saved session is reused. Default is 24 hours.
+        """
+        self.logger = logging.getLogger("default")
+        self.session_dir = session_dir
+        self.ttl_seconds = ttl_seconds
+
+        self.restored = 0
+        self.rejected = 0
+
+        os.makedirs(session_dir, exist_ok=True)
+
+    def _session_path(self, zip_code: str) -> str:
+        """Return the file path of the session of a ZIP code."""
+        return os.path.join(self.session_dir, f"{zip_code}.json")
+
+    def load(self, zip_code: str) -> Optional[List[Dict[str, Any]]]:
+        """
+            Return the saved cookies of a ZIP code if they are younger than the TTL.
+
+            Args:
+                zip_code (str): The delivery ZIP code.
+
+            Returns:
+                Optional[List[Dict[str, Any]]]: The cookies, or None if no valid session is saved.
+        """
+        session_path = self._session_path(zip_code)
+        if not os.path.exists(session_path):
+            return None
+
+        try:
+            with open(session_path, 'r', encoding='utf-8') as session_file:
+                session = json.load(session_file)
+        except json.JSONDecodeError:
+            self.logger.error(f"Session file {session_path} is damaged, ignoring it.")
+            return None
+
+        if time.time() - session.get("saved_at", 0) > self.ttl_seconds:
+            self.logger.info(f"The saved session of ZIP code {zip_code} has expired.")
+            return None
+
+        return session.get("cookies") or None
+
+    def save(self, zip_code: str, cookies: List[Dict[str, Any]]) -> None:
+        """
+            Atomically save the cookies of a ZIP code.
+
+            Args:
+                zip_code (str): The delivery ZIP code.
+                cookies (List[Dict[str, Any]]): The cookies of the browser session.
+
+            Returns:
+                None
+        """
+        session_path = self._session_path(zip_code)
+        temp_file_path = f"{session_path}.{os.getpid()}.tmp"
+
+        with open(temp_file_path, 'w', encoding='utf-8') as session_file:
+            json.dump({"zip_code": zip_code, "saved_at": time.time(), "cookies": cookies}, session_file, indent=4)
+        os.replace(temp_file_path, session_path)
+
+        self.logger.info(f"Saved the session of ZIP code {zip_code} ({len(cookies)} cookies).")
+
+    def invalidate(self, zip_code: str) -> None:
+        """
+            Delete the saved session of a ZIP code, for example after Amazon rejected it.
+
+            Args:
+                zip_code (str): The delivery ZIP code.
+
+            Returns:
+                None
+        """
+        self.rejected += 1
+        session_path = self._session_path(zip_code)
+        if os.path.exists(session_path):
+            os.remove(session_path)
+
+    def restore(self, driver: Any, base_url: str, zip_code: str) -> bool:
+        """
+            Inject the saved session of a ZIP code into a browser.
+
+            The browser has to be on the Amazon domain before cookies can be
+            set, so the home page is loaded first and reloaded after the
+            injection. The session counts as accepted when the header shows
+            the ZIP code afterwards; otherwise it is invalidated.
+
+            Args:
+                driver (Any): The Selenium driver.
+                base_url (str): The Amazon site.
+                zip_code (str): The delivery ZIP code.
+
+            Returns:
+                bool: True if the browser now uses the ZIP code.
+        """
+        cookies = self.load(zip_code)
+        if cookies is None:
+            return False
+
+        driver.get(base_url)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(to_selenium_cookie(cookie))
+            except Exception as e:
+                self.logger.error(f"Cookie {cookie.get('name')} could not be restored: {e}")
+        driver.refresh()
+
+        location = driver.execute_script(LOCATION_SCRIPT) or ""
+        if zip_code not in location:
+            self.logger.error(f"Amazon rejected the saved session of ZIP code {zip_code} (location: {location.strip()!r}).")
+            self.invalidate(zip_code)
+            return False
+
+        self.restored += 1
+        self.logger.info(f"Restored the saved session of ZIP code {zip_code}.")
+        return True
@@ -26,7 +26,7 @@ class LoggerSetup:
         """Initialize the LoggerSetup class."""
         self.logger = None
 
-    def setup_logger(self, level: int = logging.INFO) -> None:
+    def setup_logger(self, level: int = logging.INFO, log_file_name: str = 'amazon_upc_processor.log') -> None:
         """
             Set up the logger to log messages to a file.
 
@@ -38,6 +38,8 @@ class LoggerSetup:
             Parameters:
                 level (int): The logging level to set for the logger. 
                             Default is logging.INFO.
+                log_file_name (str): The name of the log file inside the log directory.
+                            Default is 'amazon_upc_processor.log'.
 
             Returns:
                 None: This method does not return any value.
@@ -47,7 +49,7 @@ class LoggerSetup:
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
 
-        log_file_path = os.path.join(log_dir, 'amazon_upc_processor.log')
+        log_file_path = os.path.join(log_dir, log_file_name)
 
         # Clear the log file before adding new logs
         with open(log_file_path, "w") as file:
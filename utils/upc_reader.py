@@ -0,0 +1,135 @@
+"""
+    upc_reader.py
+
+    This module streams the UPC rows of the input file instead of loading it at once.
+
+    Large input sheets are read lazily in chunks: xlsx files with openpyxl in read-only
+    mode, CSV files with pandas' chunked reader and Parquet files batch by batch with
+    pyarrow. Every chunk is normalized with vectorized pandas operations (UPC codes as
+    text padded to 12 digits, numeric sales prices) and yielded row by row, so the
+    first search can start right away no matter how big the input is.
+
+    Classes:
+        UpcRow: One typed input row.
+
+    Functions:
+        read_upc_rows: Lazily yield the typed UPC rows of an xlsx, CSV or Parquet file.
+"""
+
+import os
+import itertools
+from typing import Any, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+
+
+INPUT_COLUMNS = ['zoro_no', 'upc_code', 'sales_price']
+
+
+class UpcRow(NamedTuple):
+    """One row of the input file, with its position in the file as `row_id`."""
+    row_id: int
+    upc_code: str
+    upc_code_original: str
+    zoro_no: Optional[str]
+    sales_price: float
+
+
+def _normalize_chunk(chunk: pd.DataFrame, first_row_id: int) -> Iterator[UpcRow]:
+    """
+        Normalize a chunk of input rows and yield them as UpcRow.
+
+        UPC codes stored as numbers are turned into text without a decimal part
+        and padded to 12 digits; rows without a UPC code are skipped.
+
+        Args:
+            chunk (pd.DataFrame): The rows with the INPUT_COLUMNS.
+            first_row_id (int): The row ID of the first row of the chunk.
+
+        Returns:
+            Iterator[UpcRow]: The typed rows of the chunk.
+    """
+    upc = chunk['upc_code']
+    has_upc = upc.notna()
+
+    upc_original = upc.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+    upc_code = upc_original.str.zfill(12)
+    zoro_no = chunk['zoro_no'].astype(str).where(chunk['zoro_no'].notna(), None)
+    sales_price = pd.to_numeric(chunk['sales_price'], errors='coerce').astype(float)
+
+    row_ids = range(first_row_id, first_row_id + len(chunk))
+    for row_id, valid, code, original, zoro, price in zip(
+            row_ids, has_upc, upc_code, upc_original, zoro_no, sales_price):
+        if valid:
+            yield UpcRow(row_id, code, original, zoro, price)
+
+
+def _iter_xlsx_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the rows of the first sheet of an xlsx file in chunks, using openpyxl read-only mode."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else "" for name in next(rows, [])]
+        positions = [header.index(column) for column in INPUT_COLUMNS]
+
+        while True:
+            values: List[Any] = list(itertools.islice(rows, chunk_size))
+            if not values:
+                break
+            yield pd.DataFrame(
+                [[row[position] if position < len(row) else None for position in positions] for row in values],
+                columns=INPUT_COLUMNS
+            )
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a CSV file in chunks."""
+    for chunk in pd.read_csv(file_path, usecols=INPUT_COLUMNS, dtype={'upc_code': str}, chunksize=chunk_size):
+        yield chunk
+
+
+def _iter_parquet_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a Parquet file batch by batch."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=INPUT_COLUMNS):
+        yield batch.to_pandas()
+
+
+def read_upc_rows(file_path: str, chunk_size: int = 1000) -> Iterator[UpcRow]:
+    """
+        Lazily yield the typed UPC rows of an input file.
+
+        The file type is chosen by extension: `.xlsx`/`.xlsm`, `.csv` or `.parquet`.
+        The file needs the columns `zoro_no`, `upc_code` and `sales_price`.
+
+        Args:
+            file_path (str): The path of the input file.
+            chunk_size (int): Number of rows read and normalized at once. Default is 1000.
+
+        Returns:
+            Iterator[UpcRow]: The rows of the file, in file order.
+
+        Raises:
+            ValueError: If the file type is not supported or a column is missing.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension in ('.xlsx', '.xlsm'):
+        chunks = _iter_xlsx_chunks(file_path, chunk_size)
+    elif extension == '.csv':
+        chunks = _iter_csv_chunks(file_path, chunk_size)
+    elif extension == '.parquet':
+        chunks = _iter_parquet_chunks(file_path, chunk_size)
+    else:
+        raise ValueError(f"Unsupported input file type: {file_path}")
+
+    row_id = 0
+    for chunk in chunks:
+        yield from _normalize_chunk(chunk, row_id)
+        row_id += len(chunk)
@@ -0,0 +1,322 @@
+"""
+    worker_pool.py
+
+    This module runs several Chrome instances in parallel to process the UPC codes faster.
+
+    A single browser spends most of its time waiting on the network, so the WorkerPool
+    starts N worker processes. Every worker drives its own browser with its own user
+    agent, proxy and ZIP code session. The coordinator hands out the UPC rows from the
+    Excel file through a shared work queue, and the workers send the collected product
+    details back through a result queue, where they are merged into one results store.
+    The selector statistics and proxy scores the workers collect are sent back the same
+    way, merged and saved once by the coordinator.
+
+    Classes:
+        QueueResultsSink: Results store used by a worker, forwards records to the coordinator.
+        BrowserWorker: AmazonUPCProcessor that processes the rows it receives from the queue.
+        WorkerPool: Coordinator that starts the workers, distributes rows and merges results.
+
+    Usage:
+        >>> pool = WorkerPool(excel_file_path, results_file_path, proxies_file_path, workers=4)
+        >>> pool.run()
+"""
+
+import os
+import queue
+import itertools
+import threading
+import multiprocessing
+from typing import Any, Dict, Iterable, List, Optional
+
+from amazon_scraper import AmazonUPCProcessor
+
+
+class QueueResultsSink:
+    def __init__(self, result_queue: Any) -> None:
+        """
+            Initialize the sink that forwards product details to the coordinator.
+
+            Args:
+                result_queue (Any): The multiprocessing queue read by the coordinator.
+        """
+        self.result_queue = result_queue
+        self.records_file_path = "the coordinator"
+        self.last_upc = None
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+            Send the product details of one UPC to the coordinator.
+
+            Duplicate UPCs are filtered by the coordinator's results store.
+
+            Args:
+                records (Iterable[Dict[str, Any]]): The product details to send.
+
+            Returns:
+                int: The number of records sent.
+        """
+        records = list(records)
+        if records:
+            self.result_queue.put(("records", records))
+        return len(records)
+
+    def send_run_stats(self, stats: Dict[str, Any]) -> None:
+        """
+            Send the selector statistics and proxy scores collected by a worker to the coordinator.
+
+            Args:
+                stats (Dict[str, Any]): The "selectors" and "proxies" changes of the worker.
+
+            Returns:
+                None
+        """
+        self.result_queue.put(("stats", stats))
+
+    def flush(self) -> None:
+        """Nothing to flush, the records are sent right away."""
+
+    def close(self) -> None:
+        """Nothing to close, the queue belongs to the coordinator."""
+
+
+class BrowserWorker(AmazonUPCProcessor):
+    def __init__(self, proxy: Optional[str], *args, **kwargs) -> None:
+        """
+            Initialize a worker with its own proxy.
+
+            Args:
+                proxy (Optional[str]): The proxy ("host:port") of this worker, or None.
+                *args: Positional arguments of AmazonUPCProcessor.
+                **kwargs: Keyword arguments of AmazonUPCProcessor.
+        """
+        super().__init__(*args, **kwargs)
+        self.proxy = proxy
+
+    def start_driver(self) -> None:
+        """
+            Launch (or relaunch) the browser of this worker.
+
+            Unlike AmazonUPCProcessor, a worker does not read the Excel file
+            itself: the rows come from the coordinator's queue, so starting
+            the driver only launches the browser and its spares (and the 
+            metrics endpoint of the worker).
+
+            Returns:
+                None
+        """
+        self.start_metrics_server()
+        self.launch_driver(self.proxy)
+
+    def stop_driver(self) -> None:
+        """Quit the browser and its spares without starting a new one."""
+        self.close_driver()
+
+    def save_run_stats(self) -> None:
+        """
+            Send the selector statistics and proxy scores of this worker to the coordinator.
+
+            All workers loaded the same stats files, so saving them here would 
+            let the last worker overwrite what the others learned. The 
+            coordinator merges the changes of every worker and saves them once.
+
+            Returns:
+                None
+        """
+        self.results_store.send_run_stats({
+            "selectors": self.selector_registry.changes(),
+            "proxies": self.proxy_pool.changes() if self.proxy_pool is not None else {},
+        })
+
+
+def run_worker(
+        worker_id: int,
+        processor_args: List[str],
+        processor_kwargs: Dict[str, Any],
+        proxy: Optional[str],
+        task_queue: Any,
+        result_queue: Any
+        ) -> None:
+    """
+        Entry point of a worker process.
+
+        The worker launches its browser, then processes rows from the task queue
+        until it receives None. It always reports "finished" to the coordinator,
+        also when it fails.
+
+        Args:
+            worker_id (int): The number of the worker, used for its log file.
+            processor_args (List[str]): The Excel, results and proxies file paths.
+            processor_kwargs (Dict[str, Any]): Keyword arguments of AmazonUPCProcessor.
+            proxy (Optional[str]): The proxy of this worker, or None.
+            task_queue (Any): The queue with the UPC rows.
+            result_queue (Any): The queue the product details are sent to.
+
+        Returns:
+            None
+    """
+    # Every worker serves its own metrics on the port after the coordinator's and writes its own summary
+    metrics_port = processor_kwargs.get("metrics_port")
+    worker = BrowserWorker(
+        proxy,
+        *processor_args,
+        results_store=QueueResultsSink(result_queue),
+        log_file_name=f"amazon_upc_processor_worker_{worker_id}.log",
+        **{
+            **processor_kwargs,
+            "csv_file": None,
+            "metrics_port": metrics_port + 1 + worker_id if metrics_port is not None else None,
+            "metrics_file": f"{os.path.splitext(processor_args[1])[0]}.worker_{worker_id}.metrics.json",
+        }
+    )
+    try:
+        worker.start_driver()
+
+        while True:
+            row = task_queue.get()
+            if row is None:
+                break
+
+            row_id, upc_code, upc_code_original, zoro_no, sales_price = row
+            try:
+                if worker.process_row(upc_code, upc_code_original, zoro_no, sales_price):
+                    result_queue.put(("row_done", row_id))
+            except Exception as e:
+                worker.logger.error(f"Worker {worker_id} failed on UPC code {upc_code}: {e}")
+    finally:
+        worker.log_run_summary()
+        worker.stop_driver()
+        worker.stop_metrics_server()
+        result_queue.put(("finished", worker_id))
+
+
+class WorkerPool:
+    def __init__(
+            self,
+            excel_file_path: str,
+            results_file: str,
+            proxies_file_path: str,
+            workers: int = 4,
+            use_proxies: bool = False,
+            **processor_kwargs: Any
+            ) -> None:
+        """
+            Initialize the coordinator of the worker pool.
+
+            Args:
+                excel_file_path (str): The path to the Excel file containing product information.
+                results_file (str): The path to the results file where product details will be saved.
+                proxies_file_path (str): The path to the file containing proxy settings.
+                workers (int): Number of browser workers to start. Default is 4.
+                use_proxies (bool): Give every worker a proxy from the proxies file, the
+                                    healthiest first. Workers switch to another proxy
+                                    when theirs is blocked. Default is False.
+                **processor_kwargs (Any): Keyword arguments passed to every AmazonUPCProcessor.
+        """
+        self.processor_args = [excel_file_path, results_file, proxies_file_path]
+        self.processor_kwargs = {**processor_kwargs, "use_proxies": use_proxies}
+        self.workers = max(1, workers)
+        self.use_proxies = use_proxies
+
+        # The coordinator reads the rows and owns the results store, it never starts a browser
+        self.coordinator = AmazonUPCProcessor(*self.processor_args, **self.processor_kwargs)
+        self.logger = self.coordinator.logger
+
+    def _feed_rows(self, task_queue: Any, stop_event: threading.Event) -> None:
+        """
+            Put all pending rows on the task queue, followed by one None per worker.
+
+            Args:
+                task_queue (Any): The queue the workers read from.
+                stop_event (threading.Event): Set when all workers are gone.
+
+            Returns:
+                None
+        """
+        self.logger.info(f"Distributing the UPC codes over {self.workers} workers.")
+        items = itertools.chain(self.coordinator.iter_upc_rows(), [None] * self.workers)
+
+        for item in items:
+            while True:
+                if stop_event.is_set():
+                    return
+                try:
+                    task_queue.put(item, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+
+    def run(self) -> None:
+        """
+            Start the workers, distribute the UPC rows and merge the results.
+
+            The product details sent by the workers are appended to the
+            coordinator's results store and CSV file as they arrive, and
+            finished rows are marked in the coordinator's checkpoint. When all
+            workers are finished, the results are exported to JSON and the 
+            selector statistics and proxy scores the workers sent are saved. The
+            coordinator's metrics (bytes written) are summarized next to the
+            per worker summaries.
+
+            Returns:
+                None
+        """
+        self.coordinator.start_metrics_server()
+
+        context = multiprocessing.get_context("spawn")
+        task_queue = context.Queue(maxsize=self.workers * 2)
+        result_queue = context.Queue()
+
+        proxies = []
+        if self.coordinator.proxy_pool is not None:
+            proxy_pool = self.coordinator.proxy_pool
+            proxies = sorted(proxy_pool.health, key=proxy_pool.score, reverse=True)
+
+        processes = []
+        for worker_id in range(self.workers):
+            proxy = proxies[worker_id % len(proxies)] if proxies else None
+            process = context.Process(
+                target=run_worker,
+                args=(worker_id, self.processor_args, self.processor_kwargs, proxy, task_queue, result_queue),
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+
+        stop_event = threading.Event()
+        feeder = threading.Thread(target=self._feed_rows, args=(task_queue, stop_event), daemon=True)
+        feeder.start()
+
+        finished = 0
+        while finished < len(processes):
+            try:
+                message, payload = result_queue.get(timeout=5)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    self.logger.error("All workers stopped before finishing their rows.")
+                    break
+                continue
+
+            if message == "records":
+                written = self.coordinator.store_records(payload)
+                self.logger.info(f"{written} details merged into {self.coordinator.results_store.records_file_path}")
+            elif message == "stats":
+                self.coordinator.selector_registry.merge(payload["selectors"])
+                if self.coordinator.proxy_pool is not None:
+                    self.coordinator.proxy_pool.merge(payload["proxies"])
+            elif message == "row_done":
+                # The records of the row were sent before, so they are already merged
+                self.coordinator.complete_row(payload)
+            elif message == "finished":
+                finished += 1
+                self.logger.info(f"Worker {payload} finished.")
+
+        stop_event.set()
+        feeder.join()
+        for process in processes:
+            process.join()
+
+        self.coordinator.export_results()
+        self.coordinator.close_results()
+        self.coordinator.save_run_stats()
+        self.coordinator.metrics.write_summary(self.coordinator.metrics_file)
+        self.coordinator.stop_metrics_server()